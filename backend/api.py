@@ -1,15 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 from pathlib import Path
 from typing import List, Optional, Dict
 import math
+import os
+import threading
+import time
 
-from backend.data_processor import RaceDataProcessor
+import numpy as np
+
+from backend.data_processor import LOAD_ORDER, RaceDataProcessor
+from backend.race_projection import FieldProjection
+from backend.race_registry import RaceRegistry
 from backend.strategy_engine import StrategyEngine
+from backend.executor import ComputeExecutor
+from backend.live_ingest import LiveIngester
+from backend.telemetry_stream import ClientStream, StreamOptions, TelemetryHub, TelemetryReplay
+from backend.metrics import METRICS, SamplingProfiler, stage_timer
+from backend.response_encoding import (
+    NotAcceptable, column_values, columns_to_records, encode_arrow, encode_payload, negotiate, paginate, table_columns
+)
+from backend import compute_tasks
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that reports its serialization time as the api.json_render stage."""
 
+    def render(self, content) -> bytes:
+        with stage_timer("api.json_render"):
+            return super().render(content)
 
-app = FastAPI(title="PitGenius API", version="1.0.0")
+
+app = FastAPI(title="PitGenius API", version="1.0.0", default_response_class=TimedJSONResponse)
 
 # CORS setup
 app.add_middleware(
@@ -23,12 +49,142 @@ app.add_middleware(
 # Globals
 processor = None
 strategy_engine = StrategyEngine()
+executor: Optional[ComputeExecutor] = None
+live_ingester: Optional[LiveIngester] = None
+race_registry: Optional[RaceRegistry] = None
+telemetry_hub = TelemetryHub()
+# Off unless PITGENIUS_PROFILE_SLOW_MS is set; toggled at runtime via POST /debug/profiler
+profiler = SamplingProfiler.from_env()
+# starting -> indexing -> loading -> ready (or failed); see startup_event
+startup_state = {"state": "starting", "race": None, "error": None, "since": time.time()}
+RETRY_AFTER_SECONDS = "5"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency per route template (not per URL) and, when enabled, slow-request profiles."""
+    token = profiler.begin() if profiler.enabled else None
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        METRICS.observe_request(request.method, path, status, elapsed)
+        session = profiler.end(token, elapsed) if token is not None else None
+        if session is not None:
+            METRICS.observe_slow_request(request.method, path)
+            await run_in_threadpool(profiler.dump, session, f"{request.method} {path}", elapsed)
+
+
+async def run_light(fn, *args, **kwargs):
+    """Run processor/engine work on the thread pool, off the event loop."""
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await executor.run_light(fn, *args, **kwargs)
+
+
+async def run_heavy(fn, *args, **kwargs):
+    """Run a compute_tasks function in a worker process."""
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await executor.run_heavy(fn, *args, **kwargs)
+
+
+# ------------------------------------------------------------------------------
+# Readiness: the default race loads in the background (see startup_event) and
+# publishes its frames one by one. Endpoints declare the frames they read with
+# `dependencies=[requires(...)]` and answer 503 + load progress until then.
+# ------------------------------------------------------------------------------
+
+def _set_startup(state: str, **info):
+    startup_state.update(info, state=state, since=time.time())
+
+
+def _load_status() -> Dict:
+    status = dict(startup_state)
+    status["progress"] = processor.load_progress.describe() if processor is not None else None
+    return status
+
+
+def _not_ready(proc: Optional[RaceDataProcessor], frames) -> bool:
+    """No frames = only the processor has to exist (it may still be loading)."""
+    return proc is None or bool(frames) and not proc.is_loaded(*frames)
+
+
+def _unavailable(frames, message: str = "Race data is still loading", race_key: Optional[str] = None,
+                 proc: Optional[RaceDataProcessor] = None) -> HTTPException:
+    if race_key is None:
+        status = _load_status()
+    else:
+        status = {"race": race_key, "progress": proc.load_progress.describe() if proc is not None else None}
+    return HTTPException(
+        status_code=503,
+        detail={"message": message, "requires": list(frames), **status},
+        headers={"Retry-After": RETRY_AFTER_SECONDS}
+    )
+
+
+def _connection_processor(conn: HTTPConnection) -> Optional[RaceDataProcessor]:
+    """Processor picked for this request by the race router (the default race elsewhere)."""
+    return getattr(conn.state, "processor", processor)
+
+
+def requires(*frames: str):
+    """Route dependency: 503 until the request's race is created and has `frames` loaded."""
+    async def check(request: Request):
+        proc = _connection_processor(request)
+        if _not_ready(proc, frames):
+            race_key = getattr(request.state, "race_key", None)
+            message = f"Race {race_key} is still loading" if race_key else "Race data is still loading"
+            raise _unavailable(frames, message, race_key, proc)
+    return Depends(check)
 
 
 class StrategyRequest(BaseModel):
     vehicle_id: str
     current_lap: int
     total_laps: int = 17
+    mode: str = "fixed"  # "fixed" = laps 6/10/14, "sweep" = every feasible pit lap
+    top_k: int = 3
+
+
+class BatchStrategyRequest(BaseModel):
+    current_lap: int
+    total_laps: int = 17
+    vehicle_ids: Optional[List[str]] = None  # default = every car with lap data
+    mode: str = "fixed"
+    top_k: int = 3
+
+
+class StopScheduleRequest(BaseModel):
+    vehicle_id: str
+    current_lap: int = Field(ge=1)
+    # the DP is O(max_stops * laps^2 * top_n) array work, so all three are bounded
+    total_laps: int = Field(17, ge=1, le=200)
+    max_stops: int = Field(3, ge=0, le=3)
+    tire_life_laps: Optional[int] = Field(None, ge=1)
+    fuel_laps: Optional[int] = Field(None, ge=1)
+    current_fuel_laps: Optional[int] = Field(None, ge=0)
+    top_n: int = Field(5, ge=1, le=20)
+
+
+class SimulationRequest(BaseModel):
+    vehicle_id: str
+    current_lap: int
+    total_laps: int = 17
+    strategies: Optional[List[List[int]]] = None  # pit laps per candidate; default = best DP schedules
+    n_sims: int = 10000
+    seed: int = 42
+    time_budget_ms: Optional[int] = Field(2000, ge=0)  # None = no limit, 0 = a single batch
+
+
+class LiveRowsRequest(BaseModel):
+    rows: List[Dict]  # same columns as the CSV exports
 
 
 class PitDecisionRequest(BaseModel):
@@ -39,48 +195,85 @@ class PitDecisionRequest(BaseModel):
 
 
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    Auto-detect the Race1 dataset folder anywhere in the project.
-    Works locally and inside Docker/Render.
-    """
+def _publish_processor(proc: RaceDataProcessor):
+    """Expose the default race while it loads, so endpoints can use the frames already in."""
     global processor
+    compute_tasks.set_processor(proc)
+    proc.add_telemetry_listener(telemetry_hub.publish)
+    processor = proc
 
-    print("\n⚠️ Using LOCAL DATASETS only.\n")
 
-    # List all possible dataset folder names
-    possible_names = ["Race1", "Race 1"]
+def _load_default_race():
+    """
+    Index every <track>/RaceN dataset folder in the project (or under
+    PITGENIUS_DATA_ROOT) and load the default race (background thread).
+    """
+    global executor, live_ingester, race_registry
 
-    # Start search from project root (/app/)
-    project_root = Path(__file__).resolve().parents[1]
+    try:
+        _set_startup("indexing")
+        # Start search from project root (/app/); the folder index is kept in a manifest
+        project_root = Path(__file__).resolve().parents[1]
+        registry = RaceRegistry.from_env(project_root)
+        race_registry = registry
+
+        default_key = os.environ.get("PITGENIUS_DEFAULT_RACE") or registry.default_key()
+        if default_key is None:
+            raise Exception(
+                f"❌ No race folder found under {registry.root}.\n"
+                "Put your files inside ANY of these paths:\n"
+                "- race_data/COTA/Race1\n"
+                "- backend/race_data/COTA/Race1\n"
+                "- COTA/Race1\n"
+                "- ANYWHERE/<Track>/Race1 (auto-detected)\n"
+            )
+
+        race_folder = registry.entry(default_key).folder
+        print(f"✅ FOUND DATASET FOLDER: {race_folder} ({len(registry.keys())} race(s) indexed)")
+        _set_startup("loading", race=default_key)
+
+        # Spawned worker processes load the race's lap times and results once (from the
+        # columnar cache) at pool start; created now so light work already runs off the
+        # event loop during the load
+        executor = ComputeExecutor.from_env(
+            initializer=compute_tasks.init_worker,
+            initargs=(str(race_folder),)
+        )
 
-    print(f"🔍 Searching for Race1 folder under: {project_root}")
+        # The default race backs the un-prefixed endpoints, live ingest and workers: never evicted
+        proc = registry.get(default_key, pin=True, on_created=_publish_processor)
+        if processor is not proc:
+            _publish_processor(proc)
 
-    race_folder = None
+        # Optional: tail live CSVs (PITGENIUS_LIVE_TELEMETRY / PITGENIUS_LIVE_LAPS)
+        live_ingester = LiveIngester.from_env(proc)
+        if live_ingester is not None:
+            live_ingester.start()
 
-    # Walk entire project directory
-    for path in project_root.rglob("*"):
-        if path.is_dir() and path.name in possible_names:
-            race_folder = path
-            break
+        _set_startup("ready")
+        print("✅ Race data loaded successfully!\n")
+    except Exception as e:
+        _set_startup("failed", error=f"{type(e).__name__}: {e}")
+        print(f"❌ Race data failed to load: {e}")
 
-    if race_folder is None:
-        raise Exception(
-            "❌ Race1 folder NOT FOUND anywhere in the project.\n"
-            "Put your files inside ANY of these paths:\n"
-            "- race_data/COTA/Race1\n"
-            "- backend/race_data/COTA/Race1\n"
-            "- COTA/Race1\n"
-            "- ANYWHERE/Race1 (auto-detected)\n"
-        )
 
-    print(f"✅ FOUND DATASET FOLDER: {race_folder}")
+@app.on_event("startup")
+async def startup_event():
+    """
+    Start loading in the background and return, so the server accepts
+    connections (and answers /health/live) right away. Works locally and
+    inside Docker/Render.
+    """
+    print("\n⚠️ Using LOCAL DATASETS only.\n")
+    threading.Thread(target=_load_default_race, name="pitgenius-startup", daemon=True).start()
 
-    processor = RaceDataProcessor(str(race_folder))
-    processor.load_all_data()
 
-    print("✅ Race data loaded successfully!\n")
+@app.on_event("shutdown")
+async def shutdown_event():
+    if live_ingester is not None:
+        live_ingester.stop()
+    if executor is not None:
+        executor.shutdown()
 
 
 
@@ -90,166 +283,934 @@ async def root():
     return {"message": "PitGenius API Running", "version": "1.0.0"}
 
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving (200 even while the race data loads)."""
+    return {"status": "alive", "startup": startup_state["state"]}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 200 once the default race is fully loaded, else 503 with the load progress."""
+    status = _load_status()
+    if status["state"] == "ready":
+        return {"status": "ready", **status}
+    return JSONResponse(status_code=503, content={"status": status["state"], **status},
+                        headers={"Retry-After": RETRY_AFTER_SECONDS})
+
 
-@app.get("/drivers")
-async def get_drivers():
+
+# ------------------------------------------------------------------------------
+# Race data endpoints. Defined once on race_router, which is mounted twice: at
+# the root for the default race and under /races/{race_key} for any indexed
+# race. The mount's dependency puts the race's processor on request.state;
+# handlers get it through Depends(race_processor).
+# ------------------------------------------------------------------------------
+
+race_router = APIRouter()
+
+
+async def _use_default_race(conn: HTTPConnection):
+    conn.state.processor = processor
+    conn.state.race_key = None
+
+
+async def _use_keyed_race(conn: HTTPConnection, race_key: str):
+    """
+    Processor for `race_key` (first request loads it); 404 for unknown keys.
+    While a race is loading its partially loaded processor is used, and
+    requires(...) answers 503 until the frames a route reads are in.
+    """
+    registry = _registry()
+    try:
+        entry = registry.entry(race_key)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Race not found: {race_key}")
+    proc = entry.loading
+    if proc is None:
+        try:
+            proc = await run_light(registry.get, race_key)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Race not found: {race_key}")
+    conn.state.processor = proc
+    conn.state.race_key = race_key
+
+
+def race_processor(conn: HTTPConnection) -> RaceDataProcessor:
+    proc = _connection_processor(conn)
+    if proc is None:
+        raise _unavailable(())
+    return proc
+
+
+def _field_projection(proc: RaceDataProcessor) -> FieldProjection:
+    return FieldProjection(proc, strategy_engine)
+
+
+@race_router.get("/drivers", dependencies=[requires("lap_times", "results")])
+async def get_drivers(
+    current_lap: Optional[int] = None,
+    total_laps: int = 17,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """With current_lap, each driver also gets a projected estimated_time."""
     try:
-        drivers = processor.get_all_drivers()
+        if current_lap is None:
+            drivers = await run_light(proc.get_all_drivers)
+        else:
+            drivers = await run_light(_field_projection(proc).competitors, current_lap, total_laps)
         return {"drivers": drivers, "count": len(drivers)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
-@app.get("/driver/{vehicle_number}/performance")
-async def get_driver_performance(vehicle_number: int):
+def _driver_performance(proc: RaceDataProcessor, vehicle_number: int, layout: str = "records"):
+    if layout not in ("records", "columns"):
+        raise ValueError(f"Unknown layout: {layout}")
+    # Exact car number -> vehicle ID lookup (e.g. 2 -> "GR86-022-2")
+    matching_vehicle = proc.resolve_vehicle(vehicle_number)
+
+    if not matching_vehicle:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    lap_times = proc.get_driver_lap_times(matching_vehicle)
+    tire_deg = proc.get_tire_degradation(matching_vehicle)
+    sectors = proc.get_sector_performance(vehicle_number)
+
+    # Cleanup: NaN/inf -> None per column (array masks, no per-row dicts)
+    lap_columns = table_columns(lap_times)
+    sector_columns = table_columns(sectors.iloc[:10])
+
+    # Clean tire degradation
+    deg_rate = tire_deg["degradation_rate"]
+    if math.isnan(deg_rate) or math.isinf(deg_rate):
+        deg_rate = 0.0
+
+    tire_deg_clean = {
+        "degradation_rate": deg_rate,
+        "laps": _finite_or_zero(tire_deg.get("laps", [])),
+        "trend": _finite_or_zero(tire_deg.get("trend", []))
+    }
+
+    if layout == "records":
+        lap_columns = columns_to_records(lap_columns)
+        sector_columns = columns_to_records(sector_columns)
+
+    return {
+        "vehicle_id": matching_vehicle,
+        "vehicle_number": vehicle_number,
+        "layout": layout,
+        "lap_times": lap_columns,
+        "tire_degradation": tire_deg_clean,
+        "sector_performance": sector_columns,
+        "sector_analytics": proc.get_sector_analytics(vehicle_number)
+    }
+
+
+def _finite_or_zero(values) -> list:
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, 0.0).tolist()
+
+
+def _encoded(payload, encoding: str) -> Response:
+    """Payload encoded once (orjson / MessagePack), skipping FastAPI's per-value encoder."""
+    body, media_type = encode_payload(payload, encoding)
+    return Response(content=body, media_type=media_type)
+
+
+@race_router.get("/driver/{vehicle_number}/performance", dependencies=[requires("lap_times", "sectors")])
+async def get_driver_performance(
+    vehicle_number: int,
+    request: Request,
+    layout: str = "records",
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Laps, degradation and sectors; `layout=columns` returns {column: values} tables."""
     try:
-        # Try matching partial vehicle IDs (your CSV uses strings)
-        vehicle_ids = processor.lap_times_df["vehicle_id"].unique()
-        matching_vehicle = None
-
-        for vid in vehicle_ids:
-            if str(vehicle_number) in vid:
-                matching_vehicle = vid
-                break
-
-        if not matching_vehicle:
-            raise HTTPException(status_code=404, detail="Driver not found")
-
-        lap_times = processor.get_driver_lap_times(matching_vehicle)
-        tire_deg = processor.get_tire_degradation(matching_vehicle)
-        sectors = processor.get_sector_performance(vehicle_number)
-
-        # Cleanup
-        lap_times_clean = lap_times.replace({math.nan: None, math.inf: None, -math.inf: None})
-        sectors_clean = sectors.replace({math.nan: None, math.inf: None, -math.inf: None})
-
-        # Clean tire degradation
-        deg_rate = tire_deg["degradation_rate"]
-        if math.isnan(deg_rate) or math.isinf(deg_rate):
-            deg_rate = 0.0
-
-        tire_deg_clean = {
-            "degradation_rate": deg_rate,
-            "laps": [x if x == x and not math.isinf(x) else 0.0 for x in tire_deg.get("laps", [])],
-            "trend": [x if x == x and not math.isinf(x) else 0.0 for x in tire_deg.get("trend", [])]
-        }
+        encoding = negotiate(request.headers.get("accept"))
+        if encoding == "arrow":
+            raise NotAcceptable("Arrow is served per table: use /driver/{vehicle_number}/laps or /sectors")
+        payload = await run_light(_driver_performance, proc, vehicle_number, layout)
+        return _encoded(payload, encoding)
+    except HTTPException:
+        raise
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        return {
-            "vehicle_id": matching_vehicle,
-            "vehicle_number": vehicle_number,
-            "lap_times": lap_times_clean.to_dict("records"),
-            "tire_degradation": tire_deg_clean,
-            "sector_performance": sectors_clean.to_dict("records")[:10]
-        }
 
+DRIVER_TABLES = {"laps": "lap", "sectors": "LAP_NUMBER"}  # table -> lap column used for lap ranges
+
+
+def _driver_table(
+    proc: RaceDataProcessor,
+    table: str,
+    vehicle_number: int,
+    fields: Optional[str],
+    lap_start: Optional[int],
+    lap_end: Optional[int],
+    offset: int,
+    limit: Optional[int],
+    encoding: str
+) -> Response:
+    vehicle_id = proc.resolve_vehicle(vehicle_number)
+    if not vehicle_id:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    df = proc.get_driver_lap_times(vehicle_id) if table == "laps" else proc.get_sector_performance(vehicle_number)
+    rows, page = paginate(df, DRIVER_TABLES[table], lap_start, lap_end, offset, limit)
+    selected = [f for f in fields.split(",") if f] if fields else None
+
+    if encoding == "arrow":
+        body, media_type = encode_arrow(rows, selected)
+        headers = {"X-Total-Count": str(page["total"])}
+        if page["next_offset"] is not None:
+            headers["X-Next-Offset"] = str(page["next_offset"])
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    columns = table_columns(rows, selected)
+    return _encoded({
+        "vehicle_id": vehicle_id,
+        "vehicle_number": vehicle_number,
+        "table": table,
+        "fields": list(columns),
+        "columns": columns,
+        "page": page
+    }, encoding)
+
+
+async def _driver_table_response(
+    proc: RaceDataProcessor, table: str, vehicle_number: int, request: Request, **query
+) -> Response:
+    try:
+        encoding = negotiate(request.headers.get("accept"))
+        return await run_light(_driver_table, proc, table, vehicle_number, encoding=encoding, **query)
+    except HTTPException:
+        raise
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@race_router.get("/driver/{vehicle_number}/laps", dependencies=[requires("lap_times")])
+async def get_driver_laps(
+    vehicle_number: int,
+    request: Request,
+    fields: Optional[str] = None,
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """
+    Lap table as columns, with field selection and lap-range pagination.
+    Accept: application/json (default), application/msgpack or
+    application/vnd.apache.arrow.stream (page info in X-Total-Count / X-Next-Offset).
+    """
+    return await _driver_table_response(
+        proc, "laps", vehicle_number, request,
+        fields=fields, lap_start=lap_start, lap_end=lap_end, offset=offset, limit=limit
+    )
+
+
+@race_router.get("/driver/{vehicle_number}/sectors", dependencies=[requires("lap_times", "sectors")])
+async def get_driver_sectors(
+    vehicle_number: int,
+    request: Request,
+    fields: Optional[str] = None,
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Sector table as columns; same fields / paging / Accept options as /laps."""
+    return await _driver_table_response(
+        proc, "sectors", vehicle_number, request,
+        fields=fields, lap_start=lap_start, lap_end=lap_end, offset=offset, limit=limit
+    )
+
+
+
+def _sector_analytics(proc: RaceDataProcessor, fields: Optional[str], encoding: str) -> Response:
+    summary = proc.get_sector_analytics().reset_index()
+    selected = [f for f in fields.split(",") if f] if fields else None
+    if encoding == "arrow":
+        body, media_type = encode_arrow(summary, selected)
+        return Response(content=body, media_type=media_type)
+    columns = table_columns(summary, selected)
+    return _encoded({"fields": list(columns), "columns": columns, "count": len(summary)}, encoding)
+
+
+@race_router.get("/sectors/analytics", dependencies=[requires("sectors")])
+async def get_sector_analytics(
+    request: Request,
+    fields: Optional[str] = None,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Best sectors, theoretical best lap and field rank per sector for every car (columns)."""
+    try:
+        return await run_light(_sector_analytics, proc, fields, negotiate(request.headers.get("accept")))
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+def _lap_series(proc: RaceDataProcessor, vehicle_number: int, points: int, method: str):
+    vehicle_id = proc.resolve_vehicle(vehicle_number)
+    if not vehicle_id:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    series = proc.get_downsampled_lap_series(vehicle_id, points, method)
+    return {
+        "vehicle_id": vehicle_id,
+        "method": method,
+        "source_points": series["source_points"],
+        "lap": series["lap"].astype(int).tolist(),
+        "lap_time_seconds": column_values(series["lap_time_seconds"], 3)
+    }
+
+
+@race_router.get("/driver/{vehicle_number}/lap-series", dependencies=[requires("lap_times")])
+async def get_lap_series(
+    vehicle_number: int,
+    points: int = 200,
+    method: str = "lttb",
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Lap-time series reduced to about `points` laps for charting."""
+    try:
+        return await run_light(_lap_series, proc, vehicle_number, points, method)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
-@app.post("/strategy/calculate")
-async def calculate_strategy(request: StrategyRequest):
+def _telemetry_series(proc: RaceDataProcessor, vehicle_id, channels, points, method, lap_start, lap_end):
+    result = {"vehicle_id": vehicle_id, "method": method, "channels": {}}
+    for channel in channels:
+        series = proc.get_downsampled_channel(vehicle_id, channel, points, method, lap_start, lap_end)
+        if series is None:
+            raise HTTPException(status_code=404, detail="No telemetry for vehicle")
+        t = series["t"]
+        t0 = float(t[0]) if len(t) else 0.0
+        result["level"] = series["level"]
+        result["channels"][channel] = {
+            "source_points": series["source_points"],
+            "t0": t0,
+            "t": (t - t0).round(3).tolist(),
+            "v": column_values(series["v"], 4)
+        }
+    return result
+
+
+@race_router.get("/telemetry/{vehicle_id}/series", dependencies=[requires("telemetry")])
+async def get_telemetry_series(
+    vehicle_id: str,
+    channels: str = "vcar_can",
+    points: int = 1000,
+    method: str = "lttb",
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Downsampled channel traces (LTTB or min/max) for a vehicle and lap range."""
     try:
-        lap_times_df = processor.get_driver_lap_times(request.vehicle_id)
-        lap_times = lap_times_df["lap_time_seconds"].tolist()
+        return await run_light(
+            _telemetry_series, proc, vehicle_id, [c for c in channels.split(",") if c],
+            points, method, lap_start, lap_end
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        tire_deg = processor.get_tire_degradation(request.vehicle_id)
-        weather = processor.get_weather_at_time("")
 
-        all_drivers = processor.get_all_drivers()
 
+def _pit_window_dict(w) -> Dict:
+    return {
+        "lap_start": w.lap_start,
+        "lap_end": w.lap_end,
+        "time_loss": w.time_loss,
+        "predicted_position": w.predicted_position,
+        "confidence": w.confidence,
+        "reason": w.reason
+    }
+
+
+def _calculate_strategy(proc: RaceDataProcessor, request: StrategyRequest):
+    lap_times_df = proc.get_driver_lap_times(request.vehicle_id)
+    lap_times = lap_times_df["lap_time_seconds"].tolist()
+
+    tire_deg = proc.get_tire_degradation(request.vehicle_id)
+    weather = proc.get_weather_for_lap(request.vehicle_id, request.current_lap)
+
+    # Rank candidate strategies against the rest of the field's projections
+    projection = _field_projection(proc)
+    competitors = projection.competitors(
+        request.current_lap, request.total_laps, exclude_vehicle=request.vehicle_id
+    )
+    elapsed = projection.elapsed_time(request.vehicle_id, request.current_lap, request.total_laps)
+
+    if request.mode not in ("fixed", "sweep"):
+        raise HTTPException(status_code=400, detail=f"Unknown mode: {request.mode}")
+
+    curve = None
+    if request.mode == "sweep":
+        sweep = strategy_engine.sweep_pit_laps(
+            current_lap=request.current_lap,
+            total_laps=request.total_laps,
+            lap_times=lap_times,
+            degradation_rate=tire_deg["degradation_rate"],
+            competitors=competitors,
+            top_k=request.top_k,
+            elapsed_time=elapsed
+        )
+        windows = sweep.windows
+        curve = {
+            "pit_laps": sweep.pit_laps.tolist(),
+            "race_times": [round(float(t), 3) for t in sweep.race_times]
+        }
+    else:
         windows = strategy_engine.calculate_optimal_pit_window(
             current_lap=request.current_lap,
             total_laps=request.total_laps,
             lap_times=lap_times,
             degradation_rate=tire_deg["degradation_rate"],
-            competitors=all_drivers,
-            weather=weather
+            competitors=competitors,
+            weather=weather,
+            elapsed_time=elapsed
         )
 
-        return {
-            "vehicle_id": request.vehicle_id,
-            "current_lap": request.current_lap,
-            "pit_windows": [
-                {
-                    "lap_start": w.lap_start,
-                    "lap_end": w.lap_end,
-                    "time_loss": w.time_loss,
-                    "predicted_position": w.predicted_position,
-                    "confidence": w.confidence,
-                    "reason": w.reason
-                }
-                for w in windows
-            ]
-        }
+    response = {
+        "vehicle_id": request.vehicle_id,
+        "current_lap": request.current_lap,
+        "pit_windows": [_pit_window_dict(w) for w in windows]
+    }
+    if curve is not None:
+        response["curve"] = curve
+    return response
 
+
+@race_router.post("/strategy/calculate", dependencies=[requires("lap_times", "weather", "results")])
+async def calculate_strategy(request: StrategyRequest, proc: RaceDataProcessor = Depends(race_processor)):
+    try:
+        return await run_light(_calculate_strategy, proc, request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
-@app.post("/strategy/pit-now")
-async def should_pit_now(request: PitDecisionRequest):
+def _own_estimates(competitors: List[Dict], cars: List[str]) -> List[Optional[float]]:
+    """Each car's estimated_time as it appears in the competitor list (None if it isn't listed)."""
+    listed = {c["vehicle_id"]: c["estimated_time"] for c in competitors if c["vehicle_id"] is not None}
+    return [listed.get(vid) for vid in cars]
+
+
+def _calculate_strategy_batch(proc: RaceDataProcessor, request: BatchStrategyRequest):
+    if request.mode not in ("fixed", "sweep"):
+        raise HTTPException(status_code=400, detail=f"Unknown mode: {request.mode}")
+
+    # Shared across the field: one degradation table, one projected competitor list
+    deg_table = proc.get_all_tire_degradation()
+    projection = _field_projection(proc)
+    field = projection.project_field(request.current_lap, request.total_laps)
+    competitors = projection.competitors(request.current_lap, request.total_laps)
+    vehicle_ids = request.vehicle_ids or list(deg_table.index)
+
+    cars, histories, rates, errors = [], [], [], {}
+    for vid in vehicle_ids:
+        try:
+            if vid not in deg_table.index:
+                raise LookupError("Vehicle not found")
+            histories.append(proc.get_driver_lap_times(vid)["lap_time_seconds"].tolist())
+            rates.append(float(deg_table.at[vid, "degradation_rate"]))
+            cars.append(vid)
+        except Exception as e:
+            errors[vid] = str(e)
+
+    windows = strategy_engine.calculate_pit_windows_batch(
+        current_lap=request.current_lap,
+        total_laps=request.total_laps,
+        lap_histories=histories,
+        degradation_rates=rates,
+        competitors=competitors,
+        mode=request.mode,
+        top_k=request.top_k,
+        elapsed_times=[float(field.at[vid, "elapsed"]) for vid in cars],
+        own_estimates=_own_estimates(competitors, cars)
+    )
+
+    results = []
+    for vid, car_windows in zip(cars, windows):
+        if car_windows is None:
+            errors[vid] = "Lap history or degradation is not finite"
+            continue
+        results.append({"vehicle_id": vid, "pit_windows": [_pit_window_dict(w) for w in car_windows]})
+
+    return {
+        "current_lap": request.current_lap,
+        "total_laps": request.total_laps,
+        "mode": request.mode,
+        "results": results,
+        "errors": [{"vehicle_id": vid, "error": msg} for vid, msg in errors.items()]
+    }
+
+
+@race_router.post("/strategy/calculate-batch", dependencies=[requires("lap_times", "weather", "results")])
+async def calculate_strategy_batch(request: BatchStrategyRequest, proc: RaceDataProcessor = Depends(race_processor)):
+    """Pit windows for every car (or `vehicle_ids`) in one call; failing cars are listed under `errors`."""
     try:
-        lap_times_df = processor.get_driver_lap_times(request.vehicle_id)
-        lap_times = lap_times_df["lap_time_seconds"].tolist()
+        return await run_light(_calculate_strategy_batch, proc, request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        tire_deg = processor.get_tire_degradation(request.vehicle_id)
 
-        should_pit, reason = strategy_engine.should_pit_now(
-            current_lap=request.current_lap,
-            lap_times=lap_times,
-            degradation_rate=tire_deg["degradation_rate"],
-            gap_to_car_behind=request.gap_to_behind,
-            weather_changing=request.weather_changing
-        )
 
-        return {
-            "should_pit": should_pit,
-            "reason": reason,
-            "degradation_rate": tire_deg["degradation_rate"]
-        }
+def _optimize_stops(proc: RaceDataProcessor, request: StopScheduleRequest):
+    lap_times_df = proc.get_driver_lap_times(request.vehicle_id)
+    lap_times = lap_times_df["lap_time_seconds"].tolist()
+
+    tire_deg = proc.get_tire_degradation(request.vehicle_id)
+
+    schedules = strategy_engine.optimize_stop_schedule(
+        current_lap=request.current_lap,
+        total_laps=request.total_laps,
+        lap_times=lap_times,
+        degradation_rate=tire_deg["degradation_rate"],
+        max_stops=request.max_stops,
+        tire_life_laps=request.tire_life_laps,
+        fuel_laps=request.fuel_laps,
+        current_fuel_laps=request.current_fuel_laps,
+        top_n=request.top_n
+    )
+
+    return {
+        "vehicle_id": request.vehicle_id,
+        "current_lap": request.current_lap,
+        "schedules": [
+            {
+                "stops": sched.stops,
+                "pit_laps": sched.pit_laps,
+                "stint_lengths": sched.stint_lengths,
+                "expected_race_time": round(sched.race_time, 3)
+            }
+            for sched in schedules
+        ]
+    }
+
+
+@race_router.post("/strategy/optimize-stops", dependencies=[requires("lap_times")])
+async def optimize_stops(request: StopScheduleRequest, proc: RaceDataProcessor = Depends(race_processor)):
+    try:
+        return await run_light(_optimize_stops, proc, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@race_router.post("/strategy/simulate", dependencies=[requires("lap_times")])
+async def simulate_strategies(request: SimulationRequest, proc: RaceDataProcessor = Depends(race_processor)):
+    try:
+        # Runs in a worker process that already holds the default race; worker
+        # snapshots don't see live-appended rows and workers never hold other
+        # races, so those runs stay in-process on the request's processor
+        if proc is processor and not proc.has_live_data():
+            result = await run_heavy(compute_tasks.simulate_strategies, **request.model_dump())
+        else:
+            result = await run_light(compute_tasks.simulate_strategies, **request.model_dump(), processor=proc)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Vehicle not found")
+        return result
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+def _should_pit_now(proc: RaceDataProcessor, request: PitDecisionRequest):
+    lap_times_df = proc.get_driver_lap_times(request.vehicle_id)
+    lap_times = lap_times_df["lap_time_seconds"].tolist()
+
+    tire_deg = proc.get_tire_degradation(request.vehicle_id)
+
+    should_pit, reason = strategy_engine.should_pit_now(
+        current_lap=request.current_lap,
+        lap_times=lap_times,
+        degradation_rate=tire_deg["degradation_rate"],
+        gap_to_car_behind=request.gap_to_behind,
+        weather_changing=request.weather_changing
+    )
+
+    return {
+        "should_pit": should_pit,
+        "reason": reason,
+        "degradation_rate": tire_deg["degradation_rate"]
+    }
+
+
+@race_router.post("/strategy/pit-now", dependencies=[requires("lap_times")])
+async def should_pit_now(request: PitDecisionRequest, proc: RaceDataProcessor = Depends(race_processor)):
+    try:
+        return await run_light(_should_pit_now, proc, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@race_router.get("/weather/current", dependencies=[requires("weather")])
+async def get_current_weather(timestamp: str = "", proc: RaceDataProcessor = Depends(race_processor)):
+    """Latest weather, or the conditions in effect at `timestamp` (ISO or epoch seconds)."""
+    try:
+        return await run_light(proc.get_weather_at_time, timestamp)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+def _race_summary(proc: RaceDataProcessor):
+    drivers = proc.get_all_drivers()
+    weather = proc.get_weather_at_time("")
+
+    # One grouped fit for the whole field instead of a polyfit per driver
+    deg_table = proc.get_all_tire_degradation()
+
+    rates = []
+    for d in drivers:
+        vid = proc.resolve_vehicle(d["number"])
+        if vid is None:
+            continue
+        rate = deg_table["degradation_rate"].get(vid, 0)
+        if rate > 0:
+            rates.append(float(rate))
+
+    avg_deg = sum(rates) / len(rates) if rates else 0
+
+    return {
+        "total_drivers": len(drivers),
+        "weather": weather,
+        "average_tire_degradation": avg_deg
+    }
+
+
+@race_router.get("/race/summary", dependencies=[requires("lap_times", "weather", "results")])
+async def get_race_summary(proc: RaceDataProcessor = Depends(race_processor)):
+    try:
+        return await run_light(_race_summary, proc)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+
+def _registry() -> RaceRegistry:
+    if race_registry is None:
+        raise _unavailable((), "Race folders are still being indexed")
+    return race_registry
+
+
+@app.get("/races")
+async def list_races():
+    """Indexed track/race folders, which are loaded, and the memory budget."""
+    if race_registry is None:
+        return {"races": [], "loaded": []}
+    return race_registry.stats()
+
+
+@app.post("/races/refresh")
+async def refresh_races():
+    """Re-walk the data root (e.g. after copying in a new race folder)."""
+    registry = _registry()
+    try:
+        keys = await run_light(registry.index, True)
+        return {"races": keys, "count": len(keys)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.delete("/races/{race_key}")
+async def unload_race(race_key: str):
+    """Drop a loaded race's frames now (the default race stays loaded)."""
+    registry = _registry()
+    try:
+        return {"race": race_key, "unloaded": registry.evict(race_key)}
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Race not found: {race_key}")
+
+
 
-@app.get("/weather/current")
-async def get_current_weather():
+@app.post("/live/laps", dependencies=[requires(*LOAD_ORDER)])
+async def append_live_laps(request: LiveRowsRequest):
+    """Append lap-time rows (vehicle_id, lap, value in ms) to the running session."""
     try:
-        return processor.get_weather_at_time("")
+        added = await run_light(processor.append_lap_times, request.rows)
+        return {"appended": added, "data_version": processor.data_version}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
-@app.get("/race/summary")
-async def get_race_summary():
+@app.post("/live/telemetry", dependencies=[requires(*LOAD_ORDER)])
+async def append_live_telemetry(request: LiveRowsRequest):
+    """Append telemetry rows (vehicle_id, lap, telemetry_name, telemetry_value)."""
     try:
-        drivers = processor.get_all_drivers()
-        weather = processor.get_weather_at_time("")
+        added = await run_light(processor.append_telemetry, request.rows)
+        return {"appended": added, "data_version": processor.data_version}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        rates = []
-        for d in drivers:
-            for vid in processor.lap_times_df["vehicle_id"].unique():
-                if str(d["number"]) in vid:
-                    deg = processor.get_tire_degradation(vid)
-                    if deg["degradation_rate"] > 0:
-                        rates.append(deg["degradation_rate"])
-                    break
 
-        avg_deg = sum(rates) / len(rates) if rates else 0
 
+@app.get("/live/status", dependencies=[requires(*LOAD_ORDER)])
+async def live_status():
+    try:
         return {
-            "total_drivers": len(drivers),
-            "weather": weather,
-            "average_tire_degradation": avg_deg
+            **processor.get_live_stats(),
+            "ingester": live_ingester.stats() if live_ingester is not None else None,
+            "stream_subscribers": len(telemetry_hub)
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+def _stream_options(channels, speed, max_hz, batch_ms, fmt, lap_start, lap_end) -> StreamOptions:
+    return StreamOptions(
+        channels=[c for c in channels.split(",") if c] if channels else None,
+        speed=speed,
+        max_hz=max_hz,
+        batch_ms=batch_ms,
+        fmt=fmt,
+        lap_start=lap_start,
+        lap_end=lap_end
+    )
+
+
+async def _open_stream(proc: RaceDataProcessor, vehicle_id: str, options: StreamOptions, live: bool):
+    """Client queue fed by a replay task, or by the live hub when `live`."""
+    options.validate()
+    if live and proc is not processor:
+        raise ValueError("Live streams are only available for the default race")
+    client = ClientStream(options)
+    if live:
+        return client, telemetry_hub.subscribe(client, vehicle_id)
+
+    replay = await run_light(TelemetryReplay.from_processor, proc, vehicle_id, options)
+    if replay is None:
+        raise LookupError(f"No telemetry for {vehicle_id}")
+    client.start_replay(replay)
+    return client, None
+
+
+def _close_stream(client: ClientStream, subscription):
+    client.close()
+    if subscription is not None:
+        telemetry_hub.unsubscribe(subscription)
+
+
+@race_router.websocket("/ws/telemetry/{vehicle_id}")
+async def telemetry_socket(
+    websocket: WebSocket,
+    vehicle_id: str,
+    channels: Optional[str] = None,
+    speed: float = 1.0,
+    max_hz: float = 10.0,
+    batch_ms: int = 200,
+    fmt: str = "json",
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    live: bool = False,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Replay (or with live=true, push) a vehicle's telemetry as JSON or binary frames."""
+    await websocket.accept()
+    if _not_ready(proc, ("telemetry",)):
+        # 1013 = try again later
+        await websocket.close(code=1013, reason="Telemetry is still loading")
+        return
+    options = _stream_options(channels, speed, max_hz, batch_ms, fmt, lap_start, lap_end)
+    try:
+        client, subscription = await _open_stream(proc, vehicle_id, options, live)
+    except (ValueError, LookupError) as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    try:
+        async for frame in client.frames():
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _close_stream(client, subscription)
+
+
+
+@race_router.get("/stream/telemetry/{vehicle_id}", dependencies=[requires("telemetry")])
+async def telemetry_events(
+    vehicle_id: str,
+    channels: Optional[str] = None,
+    speed: float = 1.0,
+    max_hz: float = 10.0,
+    batch_ms: int = 200,
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    live: bool = False,
+    proc: RaceDataProcessor = Depends(race_processor)
+):
+    """Server-sent events version of /ws/telemetry (JSON frames only)."""
+    options = _stream_options(channels, speed, max_hz, batch_ms, "json", lap_start, lap_end)
+    try:
+        client, subscription = await _open_stream(proc, vehicle_id, options, live)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        try:
+            async for frame in client.frames():
+                yield f"data: {frame}\n\n"
+            yield "event: end\ndata: {}\n\n"
+        finally:
+            _close_stream(client, subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+app.include_router(race_router, dependencies=[Depends(_use_default_race)])
+app.include_router(race_router, prefix="/races/{race_key}", dependencies=[Depends(_use_keyed_race)])
+# /races/{race_key}/summary predates the race router; it stays as an alias of .../race/summary
+app.add_api_route(
+    "/races/{race_key}/summary",
+    get_race_summary,
+    methods=["GET"],
+    dependencies=[Depends(_use_keyed_race), requires("lap_times", "weather", "results")]
+)
+
+
+
+@app.get("/debug/memory", dependencies=[requires()])
+async def debug_memory():
+    """Bytes per loaded frame with default dtypes (estimated) vs the compact schema."""
+    try:
+        return processor.get_memory_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.get("/debug/cache", dependencies=[requires()])
+async def debug_cache():
+    """Hit/miss counters of the derived-results cache."""
+    try:
+        return processor.get_cache_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.get("/debug/executor")
+async def debug_executor():
+    """Queue depth and wait/run times of the compute pools."""
+    if executor is None:
+        return {"light": None, "heavy": None}
+    return executor.stats()
+
+
 
+def _metric_gauges() -> List:
+    """Point-in-time samples (pools, result cache, races) appended to the /metrics histograms."""
+    gauges = []
+    if executor is not None:
+        for pool, snap in executor.stats().items():
+            for key in ("workers", "in_flight", "queue_depth", "submitted", "completed", "failed"):
+                gauges.append((f"pitgenius_executor_{key}", f"Compute pool {key.replace('_', ' ')}.", {"pool": pool}, snap[key]))
+    gauges.append(("pitgenius_ready", "1 once the default race is fully loaded.", {}, int(startup_state["state"] == "ready")))
+    if processor is not None:
+        progress = processor.load_progress.describe()
+        gauges.append(("pitgenius_load_progress_percent", "Default race load progress (by file size).", {}, progress["percent"]))
+        stats = processor.get_cache_stats()
+        for key in ("entries", "bytes", "hits", "misses", "evictions"):
+            gauges.append((f"pitgenius_result_cache_{key}", f"Derived-results cache {key}.", {}, stats[key]))
+    if race_registry is not None:
+        stats = race_registry.stats()
+        gauges.append(("pitgenius_races_loaded", "Races with frames in memory.", {}, len(stats["loaded"])))
+        gauges.append(("pitgenius_races_loaded_bytes", "Bytes of loaded race frames.", {}, stats["loaded_bytes"]))
+    gauges.append(("pitgenius_profiles_written", "Slow-request profiles written.", {}, profiler.dumped))
+    return gauges
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format: route latency and stage histograms, load phases, pool/cache gauges."""
+    return PlainTextResponse(METRICS.render(_metric_gauges()), media_type="text/plain; version=0.0.4")
+
+
+
+@app.get("/debug/load")
+async def debug_load():
+    """Startup state, load progress and seconds / rows per load_all_data phase of the default race."""
+    try:
+        timings = processor.get_load_timings() if processor is not None else {}
+        return {**timings, **_load_status()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.get("/debug/profiler")
+async def debug_profiler():
+    return {**profiler.stats(), "stages": METRICS.stage_summary()}
+
+
+@app.post("/debug/profiler")
+async def toggle_profiler(enabled: bool = True, slow_ms: Optional[float] = None, interval_ms: Optional[float] = None):
+    """Switch slow-request profiling on/off; profiles go to PITGENIUS_PROFILE_DIR (default ./profiles)."""
+    if slow_ms is not None and slow_ms < 0 or interval_ms is not None and interval_ms <= 0:
+        raise HTTPException(status_code=400, detail="slow_ms must be >= 0 and interval_ms > 0")
+    profiler.configure(enabled, slow_ms, interval_ms / 1000 if interval_ms else None)
+    return profiler.stats()
+
+
+
 @app.get("/debug/files")
 async def debug_files():
     import os
@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.telemetry_stream import to_epoch_seconds
+
+
+# Bump when the on-disk layout changes
+CHANNEL_STORE_VERSION = 1
+STORE_MANIFEST = "store.json"
+
+
+@dataclass
+class ChannelSlice:
+    """Timestamp-aligned channel columns for one vehicle (views on the memory map)."""
+    time: np.ndarray  # epoch seconds, ascending
+    lap: np.ndarray
+    columns: Dict[str, np.ndarray]  # channel -> float32, NaN where the channel has no sample
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"time": self.time, "lap": self.lap, **self.columns})
+
+
+class ChannelStore:
+    """
+    Wide telemetry layout: per vehicle, one sorted timestamp axis and one
+    contiguous float32 column per channel, stored as .npy files and opened
+    memory-mapped. Pivoted once from the long-format telemetry frame (rows
+    sharing a timestamp become one row), so reading k channels for a lap
+    range is k slices instead of a filter over telemetry_name.
+
+    Values are stored channel-major, shape (channels, samples), which keeps
+    every channel contiguous on disk.
+    """
+
+    def __init__(self, directory: Path, manifest: Dict):
+        self.directory = Path(directory)
+        self.channels: List[str] = manifest["channels"]
+        self._channel_index = {c: i for i, c in enumerate(self.channels)}
+        self._files: Dict[str, str] = {v: e["file"] for v, e in manifest["vehicles"].items()}
+        self._arrays: Dict[str, tuple] = {}
+
+    # ------------------------------
+    # BUILD / OPEN
+    # ------------------------------
+    @classmethod
+    def open(cls, directory) -> Optional["ChannelStore"]:
+        """Open a finished store; None if it was never built (or the layout changed)."""
+        try:
+            with open(Path(directory) / STORE_MANIFEST, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != CHANNEL_STORE_VERSION:
+            return None
+        return cls(directory, manifest)
+
+    @classmethod
+    def build(cls, telemetry_df: pd.DataFrame, vehicle_offsets: Dict[str, tuple], directory) -> "ChannelStore":
+        """
+        Pivot a (vehicle_id, lap)-sorted long frame into the wide layout.
+        `vehicle_offsets` are the processor's per-vehicle row ranges.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        names = telemetry_df["telemetry_name"]
+        if not isinstance(names.dtype, pd.CategoricalDtype):
+            names = names.astype("category")
+        channels = [str(c) for c in names.cat.categories]
+        channel_codes = names.cat.codes.to_numpy()
+        values = telemetry_df["telemetry_value"].to_numpy(dtype=np.float32)
+        laps = telemetry_df["lap"].to_numpy()
+
+        vehicles = {}
+        for i, (vid, (start, stop)) in enumerate(vehicle_offsets.items()):
+            rows = telemetry_df.iloc[start:stop]
+            t = to_epoch_seconds(rows)
+            codes = channel_codes[start:stop]
+            ok = ~np.isnan(t) & (codes >= 0)
+
+            time_axis, first, slot = np.unique(t[ok], return_index=True, return_inverse=True)
+            name = f"v{i:03d}"
+            wide = np.lib.format.open_memmap(
+                directory / f"{name}.npy", mode="w+", dtype=np.float32,
+                shape=(len(channels), len(time_axis))
+            )
+            wide[:] = np.nan
+            wide[codes[ok], slot] = values[start:stop][ok]
+            wide.flush()
+            del wide
+
+            np.save(directory / f"{name}.time.npy", time_axis)
+            np.save(directory / f"{name}.lap.npy", laps[start:stop][ok][first])
+            vehicles[vid] = {"file": name, "samples": int(len(time_axis))}
+
+        manifest = {"version": CHANNEL_STORE_VERSION, "channels": channels, "vehicles": vehicles}
+        # written last: a store without a manifest is an interrupted build
+        tmp = directory / (STORE_MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, directory / STORE_MANIFEST)
+        return cls(directory, manifest)
+
+    @staticmethod
+    def remove_stale(parent, keep: str):
+        """Delete sibling stores built from older telemetry files."""
+        parent = Path(parent)
+        if not parent.exists():
+            return
+        for path in parent.iterdir():
+            if path.is_dir() and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    # ------------------------------
+    # READ
+    # ------------------------------
+    def vehicles(self) -> List[str]:
+        return list(self._files)
+
+    def _vehicle_arrays(self, vehicle_id: str):
+        arrays = self._arrays.get(vehicle_id)
+        if arrays is None:
+            name = self._files[vehicle_id]
+            arrays = (
+                np.load(self.directory / f"{name}.npy", mmap_mode="r"),
+                np.load(self.directory / f"{name}.time.npy", mmap_mode="r"),
+                np.load(self.directory / f"{name}.lap.npy", mmap_mode="r"),
+            )
+            self._arrays[vehicle_id] = arrays
+        return arrays
+
+    def read(
+        self,
+        vehicle_id: str,
+        channels: Optional[List[str]] = None,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> Optional[ChannelSlice]:
+        """Channel columns for a lap range; None for an unknown vehicle. Unknown channels are skipped."""
+        if vehicle_id not in self._files:
+            return None
+        wide, time_axis, laps = self._vehicle_arrays(vehicle_id)
+
+        rows = slice(None)
+        if lap_start is not None or lap_end is not None:
+            mask = np.ones(len(laps), dtype=bool)
+            if lap_start is not None:
+                mask &= laps >= lap_start
+            if lap_end is not None:
+                mask &= laps <= lap_end
+            hits = np.flatnonzero(mask)
+            if len(hits) == 0:
+                rows = slice(0, 0)
+            elif hits[-1] - hits[0] + 1 == len(hits):
+                rows = slice(int(hits[0]), int(hits[-1]) + 1)  # contiguous: stay a view
+            else:
+                rows = hits
+
+        wanted = channels if channels else self.channels
+        columns = {c: wide[self._channel_index[c], rows] for c in wanted if c in self._channel_index}
+        return ChannelSlice(time=time_axis[rows], lap=laps[rows], columns=columns)
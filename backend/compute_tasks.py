@@ -0,0 +1,123 @@
+from typing import Dict, List, Optional
+
+from backend.data_processor import RaceDataProcessor
+from backend.strategy_engine import StrategyEngine
+from backend.race_simulator import RaceSimulator, SimCar
+
+
+# ------------------------------------------------------------------------------
+# Heavy computations run by ComputeExecutor.run_heavy.
+# Each worker process holds its own processor, loaded once by init_worker (from
+# the columnar cache), so tasks only ship small request dicts across the
+# process boundary. Workers load only the frames simulations read.
+# ------------------------------------------------------------------------------
+
+MAX_SIMULATIONS = 100000
+WORKER_FRAMES = ("lap_times", "results")
+
+_processor: Optional[RaceDataProcessor] = None
+_engine = StrategyEngine()
+_simulator = RaceSimulator(_engine)
+
+
+def set_processor(processor: RaceDataProcessor):
+    """Share the API process's processor (used when tasks run in-process)."""
+    global _processor
+    _processor = processor
+
+
+def init_worker(race_folder: str):
+    """Process-pool initializer: load the race's WORKER_FRAMES once per worker (no telemetry)."""
+    global _processor
+    _processor = RaceDataProcessor(race_folder).load_all_data(WORKER_FRAMES)
+
+
+def _simulation_car(
+    proc: RaceDataProcessor, vehicle_id: str, current_lap: int, total_laps: int, deg_table
+) -> Optional[SimCar]:
+    """Base pace, degradation, elapsed time and a one-stop plan for a car."""
+    laps = proc.get_driver_lap_times(vehicle_id)
+    if len(laps) == 0:
+        return None
+
+    done = laps[laps["lap"] < current_lap]
+    history = (done if len(done) else laps)["lap_time_seconds"].dropna().tolist()
+    rate = float(deg_table["degradation_rate"].get(vehicle_id, 0.0))
+
+    plan = _engine.sweep_pit_laps(current_lap, total_laps, history, rate, [], top_k=1)
+    pit_laps = [int(plan.pit_laps[plan.race_times.argmin()])] if len(plan.pit_laps) else []
+
+    return SimCar(
+        name=vehicle_id,
+        base_lap_time=_engine.base_lap_time(history),
+        degradation_rate=rate,
+        pit_laps=pit_laps,
+        gap=float(done["lap_time_seconds"].sum()) if len(done) else 0.0
+    )
+
+
+def simulate_strategies(
+    vehicle_id: str,
+    current_lap: int,
+    total_laps: int,
+    strategies: Optional[List[List[int]]] = None,
+    n_sims: int = 10000,
+    seed: int = 42,
+    time_budget_ms: Optional[int] = None,
+    processor: Optional[RaceDataProcessor] = None
+) -> Optional[Dict]:
+    """
+    Monte Carlo comparison of pit strategies for one car; None if the car is
+    unknown. Workers use the race loaded by init_worker; in-process callers
+    may pass another race's `processor`.
+    """
+    if time_budget_ms is not None and time_budget_ms < 0:
+        raise ValueError("time_budget_ms must be >= 0")
+    proc = processor or _processor
+    deg_table = proc.get_all_tire_degradation()
+
+    cars = {}
+    for vid in deg_table.index:
+        car = _simulation_car(proc, vid, current_lap, total_laps, deg_table)
+        if car is not None:
+            cars[vid] = car
+
+    target = cars.pop(vehicle_id, None)
+    if target is None:
+        return None
+
+    leader = min([target.gap] + [c.gap for c in cars.values()])
+    for car in [target, *cars.values()]:
+        car.gap -= leader
+
+    if not strategies:
+        lap_times = proc.get_driver_lap_times(vehicle_id)["lap_time_seconds"].tolist()
+        schedules = _engine.optimize_stop_schedule(
+            current_lap=current_lap,
+            total_laps=total_laps,
+            lap_times=lap_times,
+            degradation_rate=target.degradation_rate,
+            max_stops=2,
+            top_n=3
+        )
+        strategies = [s.pit_laps for s in schedules]
+
+    result = _simulator.simulate(
+        target=target,
+        strategies=strategies,
+        field_cars=list(cars.values()),
+        current_lap=current_lap,
+        total_laps=total_laps,
+        n_sims=max(1, min(n_sims, MAX_SIMULATIONS)),
+        seed=seed,
+        time_budget_s=time_budget_ms / 1000 if time_budget_ms is not None else None
+    )
+
+    return {
+        "vehicle_id": vehicle_id,
+        "current_lap": current_lap,
+        "sims": result["sims"],
+        "truncated": result["truncated"],
+        "elapsed_ms": result.get("elapsed_ms", 0.0),
+        "strategies": [vars(o) for o in result["strategies"]]
+    }
@@ -0,0 +1,368 @@
+import argparse
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for feather/parquet)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+CACHE_DIR_NAME = ".pitgenius_cache"
+MANIFEST_NAME = "manifest.json"
+SUPPORTED_FORMATS = ("feather", "parquet")
+
+
+class ColumnarCache:
+    """
+    On-disk columnar copy of the race CSVs.
+
+    Each source file is converted to Feather (default) or Parquet the first
+    time it is read. Entries are keyed by resolved source path + mtime + size,
+    so touching or replacing a CSV invalidates its cached copy automatically.
+    Without pyarrow installed every read falls back to plain CSV parsing.
+
+    Entries can also be imported from a stream (e.g. a zip member) with no
+    CSV on disk; those are keyed by the fingerprint the caller supplies and
+    serve `load_csv` for their source path until a real file appears there.
+    An import that records its origin (archive + member) is re-parsed from
+    that archive when its frame is missing, unreadable or out of date.
+    """
+
+    def __init__(self, cache_dir, fmt: str = "feather"):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported cache format: {fmt}")
+
+        self.cache_dir = Path(cache_dir)
+        self.fmt = fmt
+        self.enabled = HAS_PYARROW
+        self.hits = 0
+        self.misses = 0
+
+        if not self.enabled:
+            print("⚠️ pyarrow not installed, columnar cache disabled (reading CSV directly)")
+
+    # ------------------------------
+    # KEYS / MANIFEST
+    # ------------------------------
+    @staticmethod
+    def source_key(source: Path, tag: str = "") -> str:
+        """Fingerprint of a source file: path + mtime + size (+ parse tag)."""
+        stat = source.stat()
+        raw = f"{source.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{tag}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / MANIFEST_NAME
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict):
+        tmp = self._manifest_path().with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._manifest_path())
+
+    @staticmethod
+    def import_key(source: Path, fingerprint: str, tag: str = "") -> str:
+        """Key of an imported entry: path + caller fingerprint (e.g. zip CRC and size) + parse tag."""
+        raw = f"{source.resolve()}|import:{fingerprint}|{tag}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def entry_key(self, source: Path, tag: str = "") -> str:
+        """source_key for files on disk; for imported sources, derived from the imported entry."""
+        if source.exists():
+            return self.source_key(source, tag)
+        entry = self._read_manifest().get(str(source.resolve()), {})
+        raw = f"{entry.get('key')}|{tag}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def cached_file(self, source, tag: str = "") -> Optional[Path]:
+        """Existing entry for the current version of `source` (or its import); None on a miss."""
+        if not self.enabled:
+            return None
+        source = Path(source)
+        if source.exists():
+            path = self._entry_file(source, self.source_key(source, tag))
+            return path if path.exists() else None
+        entry = self._read_manifest().get(str(source.resolve()), {})
+        if entry.get("imported") and entry.get("tag") == tag and entry.get("format") == self.fmt:
+            path = self.cache_dir / entry["file"]
+            return path if path.exists() else None
+        return None
+
+    def _entry_file(self, source: Path, key: str) -> Path:
+        return self.cache_dir / f"{source.stem}-{key}.{self.fmt}"
+
+    # ------------------------------
+    # READ / WRITE
+    # ------------------------------
+    def _read_frame(self, path: Path) -> pd.DataFrame:
+        if self.fmt == "parquet":
+            return pd.read_parquet(path)
+        return pd.read_feather(path)
+
+    def _write_frame(self, df: pd.DataFrame, path: Path):
+        tmp = path.with_name(path.name + ".tmp")
+        if self.fmt == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, path)
+
+    def load_csv(
+        self,
+        source,
+        tag: str = "",
+        force: bool = False,
+        postprocess: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        **read_csv_kwargs
+    ) -> pd.DataFrame:
+        """
+        Load `source` from the cache, parsing and caching the CSV on a miss.
+
+        `postprocess` runs on the freshly parsed frame before it is cached.
+        `tag` must change whenever `read_csv_kwargs` or `postprocess` change
+        the parsed result (e.g. a dtype schema), so copies never collide.
+        """
+        source = Path(source)
+
+        def parse():
+            df = pd.read_csv(source, **read_csv_kwargs)
+            return postprocess(df) if postprocess else df
+
+        if not self.enabled:
+            return parse()
+
+        if not source.exists():
+            return self._load_imported(source, tag, postprocess, read_csv_kwargs)
+
+        key = self.source_key(source, tag)
+        cached = self._entry_file(source, key)
+
+        if cached.exists() and not force:
+            try:
+                df = self._read_frame(cached)
+                self.hits += 1
+                return df
+            except Exception as e:
+                print(f"⚠️ Cache entry unreadable, re-parsing {source.name}: {e}")
+
+        self.misses += 1
+        df = parse()
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_frame(df, cached)
+            self._record(source, key, cached)
+        except Exception as e:
+            print(f"⚠️ Could not cache {source.name}: {e}")
+
+        return df
+
+    def import_csv(
+        self,
+        source,
+        stream,
+        fingerprint: str,
+        tag: str = "",
+        postprocess: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        origin: Optional[Dict] = None,
+        **read_csv_kwargs
+    ) -> int:
+        """
+        Parse CSV text from `stream` straight into the cache entry for
+        `source` (which doesn't have to exist). An entry with the same
+        fingerprint is kept as is. `origin` ({"archive": zip path,
+        "member": name}) lets the entry be rebuilt later; without it the
+        cache holds the only copy. Returns the number of rows stored.
+        """
+        if not self.enabled:
+            raise RuntimeError("Columnar cache is disabled (pyarrow not installed)")
+
+        source = Path(source)
+        key = self.import_key(source, fingerprint, tag)
+        cached = self._entry_file(source, key)
+        entry = self._read_manifest().get(str(source.resolve()))
+        if entry and entry.get("key") == key and cached.exists():
+            self.hits += 1
+            if origin and entry.get("origin") != origin:
+                kept = {k: entry.get(k) for k in ("fingerprint", "tag", "rows")}
+                self._record(source, key, cached, imported={**kept, "origin": origin})
+            return int(entry.get("rows", 0))
+
+        self.misses += 1
+        return len(self._import_frame(source, stream, fingerprint, tag, postprocess, origin, read_csv_kwargs))
+
+    def _import_frame(self, source: Path, stream, fingerprint, tag, postprocess, origin, read_csv_kwargs) -> pd.DataFrame:
+        df = pd.read_csv(stream, **read_csv_kwargs)
+        if postprocess:
+            df = postprocess(df)
+
+        key = self.import_key(source, fingerprint, tag)
+        cached = self._entry_file(source, key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._write_frame(df, cached)
+        imported = {"fingerprint": fingerprint, "tag": tag, "rows": len(df)}
+        if origin:
+            imported["origin"] = origin
+        self._record(source, key, cached, imported=imported)
+        return df
+
+    @staticmethod
+    def _origin_available(entry: Dict) -> bool:
+        archive = (entry.get("origin") or {}).get("archive")
+        return bool(archive) and Path(archive).is_file()
+
+    def _load_imported(self, source: Path, tag: str, postprocess, read_csv_kwargs: Dict) -> pd.DataFrame:
+        """
+        Frame of an imported entry; re-parsed from its origin archive when the
+        frame is missing, unreadable or was built with another tag or format.
+        """
+        entry = self._read_manifest().get(str(source.resolve()))
+        if not entry or not entry.get("imported"):
+            raise FileNotFoundError(f"{source} not found on disk or in the cache")
+
+        path = self.cache_dir / entry["file"]
+        if entry.get("tag") == tag and entry.get("format") == self.fmt and path.exists():
+            try:
+                df = self._read_frame(path)
+                self.hits += 1
+                return df
+            except Exception as e:
+                print(f"⚠️ Imported cache entry unreadable for {source.name}: {e}")
+
+        if not self._origin_available(entry):
+            raise FileNotFoundError(f"{source} is only in the cache and its entry can't be used; re-download the dataset")
+
+        origin = entry["origin"]
+        print(f"🧱 Re-importing {source.name} from {origin['archive']}")
+        self.misses += 1
+        with zipfile.ZipFile(origin["archive"]) as zf, zf.open(origin["member"]) as stream:
+            return self._import_frame(source, stream, entry["fingerprint"], tag, postprocess, origin, read_csv_kwargs)
+
+    def usable_import(self, source, tag: str = "") -> bool:
+        """False when `source` is only an imported entry that can be neither read nor rebuilt."""
+        source = Path(source)
+        if source.exists():
+            return True
+        entry = self._read_manifest().get(str(source.resolve()), {})
+        if self._origin_available(entry):
+            return True
+        cached = self.cached_file(source, tag)
+        return cached is not None and self._frame_readable(cached)
+
+    def _frame_readable(self, path: Path) -> bool:
+        """Cheap integrity check: the file footer/metadata parses (no column data is read)."""
+        try:
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                pq.read_metadata(path)
+            else:
+                import pyarrow as pa
+                with pa.memory_map(str(path)) as source:
+                    pa.ipc.open_file(source).schema
+            return True
+        except Exception:
+            return False
+
+    def imported_sources(self) -> List[Path]:
+        """Source paths served only by imported entries (no file on disk)."""
+        return [
+            Path(name) for name, entry in self._read_manifest().items()
+            if entry.get("imported") and not Path(name).exists()
+        ]
+
+    def _record(self, source: Path, key: str, cached: Path, imported: Optional[Dict] = None):
+        """Store the entry in the manifest and drop the stale copy it replaces."""
+        manifest = self._read_manifest()
+        name = str(source.resolve())
+
+        old = manifest.get(name)
+        if old and old.get("file") != cached.name:
+            stale = self.cache_dir / old["file"]
+            if stale.exists():
+                stale.unlink()
+
+        if imported is not None:
+            manifest[name] = {"key": key, "file": cached.name, "format": self.fmt, "imported": True, **imported}
+        else:
+            stat = source.stat()
+            manifest[name] = {
+                "key": key,
+                "file": cached.name,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "format": self.fmt,
+            }
+        self._write_manifest(manifest)
+
+    def clear(self):
+        """
+        Remove every cached frame and the manifest, except imported entries:
+        those are the only copy of their CSV unless their origin archive is
+        still there, so their manifest records stay (and their frames too when
+        the archive is gone). The next load re-imports from the archive.
+        """
+        if not self.cache_dir.exists():
+            return
+        imported = {name: entry for name, entry in self._read_manifest().items() if entry.get("imported")}
+        keep = {entry["file"] for entry in imported.values() if not self._origin_available(entry)}
+        for path in self.cache_dir.iterdir():
+            if path.is_file() and path.name not in keep:
+                path.unlink()
+        if imported:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_manifest(imported)
+
+
+def default_cache_dir(race_folder) -> Path:
+    """Cache location for a race folder (PITGENIUS_CACHE_DIR overrides it)."""
+    override = os.environ.get("PITGENIUS_CACHE_DIR")
+    if override:
+        # track + race folder name: every track has its own "Race1"
+        race_folder = Path(race_folder)
+        return Path(override) / f"{race_folder.parent.name}_{race_folder.name}".replace(" ", "_")
+    return Path(race_folder) / CACHE_DIR_NAME
+
+
+def main(argv: Optional[list] = None):
+    """Prebuild the columnar cache for a race folder."""
+    from backend.data_processor import RaceDataProcessor
+
+    parser = argparse.ArgumentParser(description="Prebuild the PitGenius columnar cache for a race folder")
+    parser.add_argument("race_folder", help="Folder holding the race CSVs, e.g. COTA/Race1")
+    parser.add_argument("--cache-dir", default=None, help="Cache directory (default: <race_folder>/.pitgenius_cache)")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, default="feather")
+    parser.add_argument("--rebuild", action="store_true", help="Drop existing entries before building (imported entries are re-imported from their archive, or kept)")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.cache_dir or default_cache_dir(args.race_folder)
+    cache = ColumnarCache(cache_dir, fmt=args.format)
+    if not cache.enabled:
+        return 1
+
+    if args.rebuild:
+        cache.clear()
+
+    processor = RaceDataProcessor(args.race_folder, cache=cache)
+    processor.load_all_data()
+
+    print(f"✅ Cache ready in {cache.cache_dir} ({cache.misses} built, {cache.hits} already up to date)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,33 +1,258 @@
+import hashlib
+import json
 import os
+import shutil
+import threading
+import time
 import requests
 import zipfile
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Optional, Set
+
+from backend.data_processor import RaceDataProcessor
 
 FILE_URL = "https://pixeldrain.com/u/9EqAZsMc"
 ZIP_NAME = "COTA_lap_end_time_R1"
 EXTRACT_DIR = "Race1"
 
+# sha256 of the dataset zip (PITGENIUS_DATASET_SHA256 overrides it; None = not checked)
+DATASET_SHA256: Optional[str] = None
+# Range size per request, parallel requests, and the read size inside a request
+CHUNK_BYTES = 8 * 1024 * 1024
+DOWNLOAD_WORKERS = 4
+STREAM_BYTES = 1024 * 1024
+
+
+class ChecksumError(Exception):
+    pass
+
+
+@dataclass
+class TransferStats:
+    bytes: int = 0  # transferred (or parsed) in this run
+    reused_bytes: int = 0  # already on disk (interrupted download, previously imported member)
+    seconds: float = 0.0
+    files: int = 0
+    imported: int = 0  # members stored only in the columnar cache (the zip is their source)
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+    def describe(self) -> str:
+        text = f"{self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s ({self.mb_per_s:.1f} MB/s)"
+        if self.reused_bytes:
+            text += f", {self.reused_bytes / 1e6:.1f} MB already done"
+        return text
+
+
+# ------------------------------
+# RANGED / RESUMABLE DOWNLOAD
+# ------------------------------
+_sessions = threading.local()
+
+
+def _session() -> requests.Session:
+    """One connection pool per download thread."""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def _probe(url: str, timeout: float):
+    """(size, supports ranges) from a one-byte ranged GET (HEAD isn't served everywhere)."""
+    with _session().get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        if r.status_code == 206 and "/" in r.headers.get("Content-Range", ""):
+            total = r.headers["Content-Range"].rsplit("/", 1)[1]
+            if total.isdigit():
+                return int(total), True
+        length = r.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False
+
+
+def _load_state(path: Path, url: str, size: int, chunk_bytes: int) -> Set[int]:
+    """Chunks finished by an earlier run of the same download."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if state.get("url") != url or state.get("size") != size or state.get("chunk_bytes") != chunk_bytes:
+        return set()
+    return set(state.get("done", []))
+
+
+def _save_state(path: Path, url: str, size: int, chunk_bytes: int, done: Set[int]):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "size": size, "chunk_bytes": chunk_bytes, "done": sorted(done)}, f)
+    os.replace(tmp, path)
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(STREAM_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _download_single(url: str, part: Path, timeout: float) -> int:
+    """Whole file in one request, for servers without Range support (no resume)."""
+    written = 0
+    with _session().get(url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        with open(part, "wb") as f:
+            for block in r.iter_content(chunk_size=STREAM_BYTES):
+                f.write(block)
+                written += len(block)
+    return written
+
+
+def download_file(
+    url: str,
+    dest,
+    workers: int = DOWNLOAD_WORKERS,
+    chunk_bytes: int = CHUNK_BYTES,
+    sha256: Optional[str] = None,
+    timeout: float = 15
+) -> TransferStats:
+    """
+    Download `url` to `dest` as parallel byte-range requests.
+
+    Chunks are written in place into `<dest>.part`; finished chunk numbers
+    go to `<dest>.part.json`, so a rerun after a failure only fetches what
+    is missing. With `sha256` the finished file is verified before it is
+    renamed to `dest` (a mismatch deletes it and raises ChecksumError).
+    Servers without Range support get a plain single-stream download.
+    """
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    state_path = dest.with_name(dest.name + ".part.json")
+    stats = TransferStats(files=1)
+    started = time.perf_counter()
+
+    size, ranged = _probe(url, timeout)
+    if not ranged or size is None:
+        stats.bytes = _download_single(url, part, timeout)
+    else:
+        chunks = [(i, lo, min(lo + chunk_bytes, size) - 1) for i, lo in enumerate(range(0, size, chunk_bytes))]
+        done = _load_state(state_path, url, size, chunk_bytes)
+        if not part.exists() or part.stat().st_size != size:
+            done = set()
+            with open(part, "wb") as f:
+                f.truncate(size)
+        todo = [c for c in chunks if c[0] not in done]
+        stats.reused_bytes = sum(hi - lo + 1 for i, lo, hi in chunks if i in done)
+        lock = threading.Lock()
+
+        def fetch(chunk) -> int:
+            i, lo, hi = chunk
+            written = 0
+            with _session().get(url, headers={"Range": f"bytes={lo}-{hi}"}, stream=True, timeout=timeout) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise IOError("Server stopped honouring Range requests")
+                with open(part, "r+b") as f:
+                    f.seek(lo)
+                    for block in r.iter_content(chunk_size=STREAM_BYTES):
+                        f.write(block)
+                        written += len(block)
+            if written != hi - lo + 1:
+                raise IOError(f"Chunk {i}: got {written} bytes, expected {hi - lo + 1}")
+            with lock:
+                done.add(i)
+                _save_state(state_path, url, size, chunk_bytes, done)
+            return written
+
+        if todo:
+            print(f"⬇️ {len(todo)}/{len(chunks)} chunks to fetch with {min(workers, len(todo))} workers")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            stats.bytes = sum(pool.map(fetch, todo))
+
+    if sha256:
+        actual = file_sha256(part)
+        if actual != sha256.lower():
+            part.unlink()
+            if state_path.exists():
+                state_path.unlink()
+            raise ChecksumError(f"sha256 mismatch for {dest.name}: expected {sha256}, got {actual}")
+
+    os.replace(part, dest)
+    if state_path.exists():
+        state_path.unlink()
+    stats.seconds = time.perf_counter() - started
+    return stats
+
 
 def download_dataset():
     print("📥 Downloading dataset...")
 
     try:
-        response = requests.get(FILE_URL, stream=True, timeout=15)
-        response.raise_for_status()
+        sha256 = os.environ.get("PITGENIUS_DATASET_SHA256") or DATASET_SHA256
+        stats = download_file(FILE_URL, ZIP_NAME, sha256=sha256)
+        print(f"✅ Downloaded dataset: {stats.describe()}")
+        return True
     except Exception as e:
         print("❌ Dataset download failed:", e)
         print("⚠️ Skipping download. Using local dataset if available.")
         return False
 
-    try:
-        with open(ZIP_NAME, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        print("✅ Downloaded dataset")
-        return True
-    except Exception as e:
-        print("❌ Failed to save dataset ZIP:", e)
-        return False
+
+# ------------------------------
+# EXTRACT (zip members -> columnar cache)
+# ------------------------------
+def extract_to_cache(zip_path, extract_dir=EXTRACT_DIR) -> TransferStats:
+    """
+    Parse every CSV member of the zip straight into its race folder's
+    columnar cache (RaceDataProcessor.import_csv_stream), so no CSV is
+    written to disk. Each entry records the zip and member it came from,
+    so the zip has to be kept: it is what the cache is rebuilt from.
+    Folders are still created, and other members are extracted as usual.
+    Without pyarrow CSVs are extracted normally.
+    """
+    stats = TransferStats()
+    started = time.perf_counter()
+    processors = {}
+    archive = str(Path(zip_path).resolve())
+
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        for info in zf.infolist():
+            member = PurePosixPath(info.filename)
+            if info.is_dir() or member.parts[0] == "__MACOSX":
+                continue
+            if member.is_absolute() or ".." in member.parts:
+                print(f"⚠️ Skipping unsafe zip member: {info.filename}")
+                continue
+
+            folder = Path(extract_dir).joinpath(*member.parts[:-1])
+            folder.mkdir(parents=True, exist_ok=True)
+            if folder not in processors:
+                processors[folder] = RaceDataProcessor(str(folder))
+            processor = processors[folder]
+
+            stats.files += 1
+            if member.suffix.lower() == ".csv" and processor.cache is not None and processor.cache.enabled:
+                misses = processor.cache.misses
+                origin = {"archive": archive, "member": info.filename}
+                with zf.open(info) as src:
+                    rows = processor.import_csv_stream(member.name, src, f"{info.CRC:08x}-{info.file_size}", origin)
+                stats.imported += 1
+                if processor.cache.misses == misses:
+                    stats.reused_bytes += info.file_size  # same member already imported
+                    continue
+                print(f"🧱 {info.filename}: {rows} rows -> {processor.cache.cache_dir}")
+            else:
+                with zf.open(info) as src, open(folder / member.name, "wb") as dst:
+                    shutil.copyfileobj(src, dst, STREAM_BYTES)
+            stats.bytes += info.file_size
+
+    stats.seconds = time.perf_counter() - started
+    return stats
 
 
 def extract_dataset():
@@ -35,10 +260,13 @@ def extract_dataset():
 
     try:
         Path(EXTRACT_DIR).mkdir(exist_ok=True)
-        with zipfile.ZipFile(ZIP_NAME, "r") as zip_ref:
-            zip_ref.extractall(EXTRACT_DIR)
-        os.remove(ZIP_NAME)
-        print("🗑️ Removed ZIP file")
+        stats = extract_to_cache(ZIP_NAME, EXTRACT_DIR)
+        print(f"✅ Extracted {stats.files} files: {stats.describe()}")
+        if stats.imported:
+            print(f"📦 Keeping {ZIP_NAME}: {stats.imported} files are only in the cache and are rebuilt from it")
+        else:
+            os.remove(ZIP_NAME)
+            print("🗑️ Removed ZIP file")
         return True
     except Exception as e:
         print("❌ Failed to extract ZIP:", e)
@@ -71,6 +299,11 @@ def verify_dataset():
 
     if race1:
         print("✅ Found Race1 folder:", race1)
+        missing = RaceDataProcessor(str(race1)).missing_imports()
+        if missing:
+            # Imported into the cache only, with neither a readable entry nor the zip to rebuild it
+            print(f"❌ {len(missing)} dataset file(s) can't be loaded from the cache:", ", ".join(p.name for p in missing))
+            return False
         return True
 
     print("❌ Race1 NOT found inside extracted folder")
@@ -102,7 +335,3 @@ def download_race_data():
         return False
 
     return True
-
-
-
-
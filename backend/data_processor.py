@@ -1,152 +1,1091 @@
 import pandas as pd
 import numpy as np
+import fnmatch
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from backend.data_cache import ColumnarCache, default_cache_dir
+from backend.vehicle_resolver import VehicleResolver
+from backend.result_cache import ResultCache, cached_result
+from backend.live_aggregates import (
+    AGG_WIDTH, DegradationAccumulator, merge_aggregate, reduce_lap_aggregates, summarize_aggregate
+)
+from backend.downsampling import downsample, resolution_level
+from backend.telemetry_stream import to_epoch_seconds
+from backend.channel_store import ChannelSlice, ChannelStore, CHANNEL_STORE_VERSION
+from backend.metrics import METRICS, stage_timer, timed_stage
+from backend.sector_analytics import SectorTables, build_sector_tables, sector_summary_row
+from backend.load_progress import LoadProgress
+from backend.telemetry_reader import (
+    ChunkedTelemetryReader, DEFAULT_CHUNK_ROWS, DEFAULT_SPILL_BUDGET, LAP_AGGREGATES_SUFFIX, ReadStats,
+    TelemetryQuery, remove_stale_spills, spill_path, spills_over_budget
+)
+
+
+# ------------------------------------------------------------------------------
+# Parse-time dtype schema per dataset file.
+# String keys repeated on every row load as categoricals, numerics are downcast.
+# Integer columns are narrowed right after parsing (not via read_csv's dtype=)
+# because a single NaN or out-of-range value (the TRD exports contain a 32768
+# lap-counter glitch) must widen the column instead of failing the load.
+# Lap-time `value` stays float64: it is summed into race times and the frame is tiny.
+# ------------------------------------------------------------------------------
+FILE_SCHEMAS = {
+    "telemetry": {
+        "vehicle_id": "category",
+        "original_vehicle_id": "category",
+        "telemetry_name": "category",
+        "meta_event": "category",
+        "meta_session": "category",
+        "meta_source": "category",
+        "telemetry_value": "float32",
+        "lap": "int16",
+        "vehicle_number": "int16",
+        "outing": "int16",
+    },
+    "lap_times": {
+        "vehicle_id": "category",
+        "original_vehicle_id": "category",
+        "meta_event": "category",
+        "meta_session": "category",
+        "meta_source": "category",
+        "lap": "int16",
+        "vehicle_number": "int16",
+        "outing": "int16",
+    },
+}
+
+INT_DTYPES = ("int8", "int16", "int32", "int64")
+
+# File name patterns per dataset file, most specific first (glob syntax)
+FILE_PATTERNS = {
+    "telemetry": ["R1_cota_telemetry_data.csv", "*telemetry*.csv"],
+    "lap_times": ["COTA_lap_time_R1.csv", "*lap_time*.csv", "*lap*.csv"],
+    "weather": ["26_Weather_Race 1_Anonymized.CSV", "*Weather*.CSV", "*weather*.csv"],
+    "sectors": ["23_AnalysisEnduranceWithSections_Race 1_Anonymized.CSV", "*AnalysisEndurance*.CSV", "*Analysis*.csv"],
+    "results": ["99_Best 10 Laps By Driver_Race 1_Anonymized.CSV", "*Best 10 Laps*.CSV", "*Best*.csv"],
+}
+
+# Order load_all_data reads the files in: the small frames most endpoints need
+# first, the telemetry file (by far the largest) last.
+LOAD_ORDER = ("lap_times", "weather", "sectors", "results", "telemetry")
+
+# Frames stored sorted by (vehicle_id, lap) so per-vehicle / per-lap lookups are slices.
+KEYED_FRAMES = ("telemetry", "lap_times")
+# Bump when the on-disk row order or derived columns change.
+FRAME_LAYOUT_VERSION = 1
+
+# Tire degradation fit: laps outside [0.8, 1.2] x the median lap are ignored
+# (pit laps, yellows), and a fit needs enough laps to mean anything.
+DEGRADATION_BAND = (0.8, 1.2)
+DEGRADATION_MIN_LAPS = 5
+DEGRADATION_MIN_FILTERED = 3
+
+# Integer channel classes for telemetry_name, precomputed once at load
+CHANNEL_OTHER = 0
+CHANNEL_SPEED = 1
+CHANNEL_BRAKE = 2
+CHANNEL_ACCEL = 3
+
+# Weather columns reported by get_weather_at_time / joined onto laps, with defaults
+WEATHER_FIELDS = {
+    'AIR_TEMP': ('air_temp', 25),
+    'TRACK_TEMP': ('track_temp', 35),
+    'HUMIDITY': ('humidity', 50),
+    'WIND_SPEED': ('wind_speed', 10),
+}
+WEATHER_TIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+# Columns a live batch must carry (same names as the CSV exports)
+LIVE_LAP_COLUMNS = ("vehicle_id", "lap", "value")
+LIVE_TELEMETRY_COLUMNS = ("vehicle_id", "lap", "telemetry_name", "telemetry_value")
+
+
+def _schema_tag(schema: Optional[Dict]) -> str:
+    """Cache tag for a schema so a schema change invalidates cached frames."""
+    if not schema:
+        return ""
+    raw = json.dumps(schema, sort_keys=True) + f"|layout{FRAME_LAYOUT_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
+
+
+def classify_channel(name: str) -> int:
+    """Map a telemetry channel name to its CHANNEL_* class."""
+    if name == "vcar_can":
+        return CHANNEL_SPEED
+    if name == "accx_can":
+        return CHANNEL_ACCEL
+    if "brake" in name:
+        return CHANNEL_BRAKE
+    return CHANNEL_OTHER
+
+
+def _key_codes(col: pd.Series) -> np.ndarray:
+    """Integer codes for a (categorical) key column; missing values are -1."""
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype("category")
+    return col.cat.codes.to_numpy()
+
+
+def _sort_by_vehicle_lap(df: pd.DataFrame) -> pd.DataFrame:
+    """Stable sort by (vehicle_id, lap) unless the frame is already in that order."""
+    if "vehicle_id" not in df.columns or "lap" not in df.columns or len(df) < 2:
+        return df
+    codes = _key_codes(df["vehicle_id"]).astype(np.int64)
+    laps = df["lap"].to_numpy()
+    same_vehicle = codes[1:] == codes[:-1]
+    if np.all((codes[1:] > codes[:-1]) | (same_vehicle & (laps[1:] >= laps[:-1]))):
+        return df
+    order = np.lexsort((laps, codes))
+    return df.take(order).reset_index(drop=True)
+
+
+def _group_bounds(*keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start/stop offsets of each run of equal keys in already-sorted arrays."""
+    n = len(keys[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    change = np.zeros(n - 1, dtype=bool)
+    for key in keys:
+        change |= key[1:] != key[:-1]
+    starts = np.concatenate(([0], np.flatnonzero(change) + 1))
+    stops = np.append(starts[1:], n)
+    return starts, stops
+
+
+def _narrow_int(col: pd.Series, dtype: str) -> pd.Series:
+    """Cast to `dtype` when every value fits, otherwise the smallest safe type."""
+    if col.isna().any():
+        return col.astype("float32") if col.dtype.kind == "f" else col
+    info = np.iinfo(dtype)
+    if len(col) == 0 or (col.min() >= info.min and col.max() <= info.max):
+        return col.astype(dtype)
+    return pd.to_numeric(col, downcast="integer")
+
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict]) -> pd.DataFrame:
+    """Apply the integer part of a file schema after read_csv has parsed it."""
+    if not schema:
+        return df
+    for col, dtype in schema.items():
+        if dtype in INT_DTYPES and col in df.columns and df[col].dtype != dtype:
+            df[col] = _narrow_int(df[col], dtype)
+    return df
+
+
+def classify_file(name: str) -> Optional[str]:
+    """FILE_PATTERNS kind a file name would be loaded as (None if no pattern matches)."""
+    for kind, patterns in FILE_PATTERNS.items():
+        if any(fnmatch.fnmatchcase(name, p) for p in patterns):
+            return kind
+    return None
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Epoch seconds from an ISO string / epoch number; None if empty or unparseable."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value) if value == value else None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    ts = pd.to_datetime(value, utc=True, errors="coerce")
+    return None if pd.isna(ts) else ts.value / 1e9
+
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """Resident size of a frame, including string payloads."""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def default_dtype_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """
+    Estimated size of `df` as plain read_csv would have built it: categoricals
+    as one Python str object per row, numerics as 64-bit.
+    """
+    if df is None:
+        return 0
+    total = int(df.index.memory_usage())
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            cats = series.cat.categories
+            sizes = np.array([sys.getsizeof(str(c)) for c in cats] + [0], dtype=np.int64)
+            total += 8 * len(series) + int(sizes[series.cat.codes.to_numpy()].sum())
+        elif series.dtype.kind in "iufb":
+            total += 8 * len(series)
+        else:
+            total += int(series.memory_usage(index=False, deep=True))
+    return total
+
 
 class RaceDataProcessor:
-    def __init__(self, race_folder: str):
+    def __init__(
+        self,
+        race_folder: str,
+        use_cache: bool = True,
+        cache: Optional[ColumnarCache] = None,
+        wide_telemetry: bool = False,
+        stream_telemetry: bool = False,
+        telemetry_chunk_rows: int = DEFAULT_CHUNK_ROWS
+    ):
         # race_folder MUST be:  COTA_extracted/COTA/Race1
         self.race_folder = Path(race_folder)
+        # Columnar copy of the CSVs so restarts skip re-parsing (see data_cache.py)
+        if cache is None and use_cache:
+            cache = ColumnarCache(default_cache_dir(self.race_folder))
+        self.cache = cache
+        # Optional wide, memory-mapped copy of the telemetry (see channel_store.py)
+        self.wide_telemetry = wide_telemetry
+        # Telemetry left on disk and read in bounded chunks (see telemetry_reader.py)
+        self.stream_telemetry = stream_telemetry
+        self.telemetry_chunk_rows = telemetry_chunk_rows
+        self.telemetry_reader: Optional[ChunkedTelemetryReader] = None
+        self._streamed_vehicles: set = set()
+        self.spill_budget = DEFAULT_SPILL_BUDGET
+        # one lock per spill file (a miss scans the whole file; other queries
+        # shouldn't wait for it), handed out under _spill_lock; weak values, so
+        # a lock goes away with its last user instead of outliving its file
+        self._spill_lock = threading.Lock()
+        self._spill_locks: "weakref.WeakValueDictionary[Path, threading.Lock]" = weakref.WeakValueDictionary()
+        self.channel_store: Optional[ChannelStore] = None
+        self._telemetry_file: Optional[Path] = None
         self.telemetry_df = None
         self.lap_times_df = None
         self.weather_df = None
         self.sectors_df = None
         self.results_df = None
+        # bytes per frame with the compact schema vs default read_csv dtypes
+        self.memory_report: Dict[str, Dict] = {}
+        # seconds / rows per load_all_data phase (also exported on /metrics)
+        self.load_timings: Dict[str, Dict] = {}
+        # Lookup tables built once by _build_indexes()
+        self._lap_offsets: Dict[str, Tuple[int, int]] = {}
+        self._weather_times: Optional[np.ndarray] = None
+        self._telemetry_vehicle_offsets: Dict[str, Tuple[int, int]] = {}
+        self._telemetry_lap_offsets: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._telemetry_values = None
+        self._channel_codes = None
+        # Sector splits normalized once + per-driver analytics (see sector_analytics.py)
+        self.sector_tables: Optional[SectorTables] = None
+        # Running aggregates, seeded at load and updated by append_* (see live_aggregates.py)
+        self._degradation: Dict[str, DegradationAccumulator] = {}
+        self._lap_aggregates: Dict[Tuple[str, int], np.ndarray] = {}
+        # Live lap rows per vehicle, merged lap tables and the laps already seen
+        self._live_laps: Dict[str, List[Dict]] = {}
+        self._lap_tables: Dict[str, pd.DataFrame] = {}
+        self._seen_laps: Dict[str, set] = {}
+        self._ingest_lock = threading.Lock()
+        # called with every accepted live telemetry batch (e.g. the streaming hub)
+        self._telemetry_listeners: List[Callable[[pd.DataFrame], None]] = []
+        self.live_stats = {"lap_rows": 0, "telemetry_rows": 0, "duplicates": 0}
+        self.vehicles = VehicleResolver()
+        # Memoized derived results; data_version bumps on every (re)load
+        self.result_cache = ResultCache()
+        self.data_version = 0
+        # Which frames are loaded so far (see load_progress.py)
+        self.load_progress = LoadProgress(LOAD_ORDER)
         
     def _find_file(self, patterns: List[str]):
-        """Search for first matching file safely."""
+        """Search for first matching file safely (files imported straight into the cache count too)."""
+        imported = self.cache.imported_sources() if self.cache is not None and self.cache.enabled else []
         for p in patterns:
             files = list(self.race_folder.glob(p))
             if files:
                 return files[0]
+            for source in imported:
+                if source.parent == self.race_folder.resolve() and fnmatch.fnmatchcase(source.name, p):
+                    return source
         print(f"❌ File not found for patterns: {patterns}")
         return None
 
-    def load_all_data(self):
+    @staticmethod
+    def _parse_options(kind: Optional[str]):
+        """(cache tag, read_csv dtypes, postprocess) for a dataset file kind."""
+        schema = FILE_SCHEMAS.get(kind)
+        read_dtypes = {c: t for c, t in (schema or {}).items() if t not in INT_DTYPES}
+
+        def postprocess(df):
+            df = apply_schema(df, schema)
+            if kind in KEYED_FRAMES:
+                df = _sort_by_vehicle_lap(df)
+            return df
+
+        return _schema_tag(schema), read_dtypes, postprocess
+
+    def _read_csv(self, path: Path, kind: Optional[str] = None) -> pd.DataFrame:
+        """Read a dataset file (with its FILE_SCHEMAS entry) through the columnar cache."""
+        tag, read_dtypes, postprocess = self._parse_options(kind)
+
+        with stage_timer(f"load.read_csv[{kind or 'other'}]") as timer:
+            if self.cache is None:
+                df = postprocess(pd.read_csv(path, dtype=read_dtypes or None))
+            else:
+                df = self.cache.load_csv(
+                    path,
+                    tag=tag,
+                    postprocess=postprocess,
+                    dtype=read_dtypes or None,
+                )
+
+        if kind:
+            self._record_load_phase(kind, path.name, timer.seconds, len(df))
+            self._record_memory(kind, df)
+        return df
+
+    def _record_load_phase(self, phase: str, source: str, seconds: float, rows: int = 0):
+        self.load_timings[phase] = {"file": source, "seconds": round(seconds, 4), "rows": rows}
+        METRICS.set_load_phase(phase, source, seconds, rows)
+
+    def import_csv_stream(self, name: str, stream, fingerprint: str, origin: Optional[Dict] = None) -> int:
+        """
+        Parse a CSV stream (e.g. a zip member) into this race's columnar cache
+        as if `name` had been extracted into the race folder, without writing
+        the CSV. load_all_data then finds and reads it like any cached file.
+        `origin` ({"archive", "member"}) is where it can be re-imported from.
+        Returns the rows stored.
+        """
+        if self.cache is None or not self.cache.enabled:
+            raise RuntimeError("Importing needs the columnar cache (pyarrow)")
+        tag, read_dtypes, postprocess = self._parse_options(classify_file(name))
+        return self.cache.import_csv(
+            self.race_folder / name,
+            stream,
+            fingerprint,
+            tag=tag,
+            postprocess=postprocess,
+            origin=origin,
+            dtype=read_dtypes or None,
+        )
+
+    def missing_imports(self) -> List[Path]:
+        """Dataset files of this race that exist only as cache imports that can't be read or rebuilt."""
+        if self.cache is None or not self.cache.enabled:
+            return []
+        race_folder = self.race_folder.resolve()
+        return [
+            source for source in self.cache.imported_sources()
+            if source.parent == race_folder
+            and not self.cache.usable_import(source, self._parse_options(classify_file(source.name))[0])
+        ]
+
+    def _record_memory(self, kind: str, df: pd.DataFrame):
+        before = default_dtype_nbytes(df)
+        after = frame_nbytes(df)
+        self.memory_report[kind] = {
+            "rows": len(df),
+            "bytes_default": before,
+            "bytes_compact": after,
+            "ratio": round(before / after, 2) if after else 0.0,
+        }
+        if kind in FILE_SCHEMAS:
+            print(f"💾 {kind}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+    def get_load_timings(self) -> Dict:
+        """Per-phase timings of the last load_all_data (file read per kind, index build)."""
+        return {
+            "phases": dict(self.load_timings),
+            "total_seconds": round(sum(p["seconds"] for p in self.load_timings.values()), 4),
+        }
+
+    def get_memory_report(self) -> Dict:
+        """Bytes per frame before (default dtypes, estimated) and after the schema."""
+        report = dict(self.memory_report)
+        report["total"] = {
+            "bytes_default": sum(r["bytes_default"] for r in self.memory_report.values()),
+            "bytes_compact": sum(r["bytes_compact"] for r in self.memory_report.values()),
+        }
+        return report
+
+    def load_all_data(self, frames: Optional[Iterable[str]] = None):
+        """
+        Read every dataset file and build its lookup indexes, in LOAD_ORDER.
+        Each frame is published (load_progress) as soon as it is indexed, so
+        callers on other threads can serve the small frames while the
+        telemetry file is still being read. `frames` limits the load to a
+        subset (e.g. lap_times/results for simulation workers); the others
+        are treated like missing files and stay empty.
+        """
         print("🔍 Scanning dataset folder:", self.race_folder)
 
-        # ------------------------------
-        # TELEMETRY 
-        # ------------------------------
-        telemetry_file = self._find_file([
-            "R1_cota_telemetry_data.csv",
-            "*telemetry*.csv"
-        ])
-
-        if telemetry_file:
-            self.telemetry_df = pd.read_csv(telemetry_file)
-            print(f"✅ Telemetry loaded: {len(self.telemetry_df)} rows")
-
-        # ------------------------------
-        # LAP TIMES
-        # ------------------------------
-        lap_time_file = self._find_file([
-            "COTA_lap_time_R1.csv",
-            "*lap_time*.csv",
-            "*lap*.csv"
-        ])
-
-        if lap_time_file:
-            self.lap_times_df = pd.read_csv(lap_time_file)
-            print(f"✅ Lap times loaded: {len(self.lap_times_df)} rows")
-
-        # ------------------------------
-        # WEATHER
-        # ------------------------------
-        weather_file = self._find_file([
-            "26_Weather_Race 1_Anonymized.CSV",
-            "*Weather*.CSV",
-            "*weather*.csv"
-        ])
-
-        if weather_file:
-            self.weather_df = pd.read_csv(weather_file)
-            print(f"✅ Weather loaded: {len(self.weather_df)} rows")
-
-        # ------------------------------
-        # SECTOR / ANALYSIS
-        # ------------------------------
-        sectors_file = self._find_file([
-            "23_AnalysisEnduranceWithSections_Race 1_Anonymized.CSV",
-            "*AnalysisEndurance*.CSV",
-            "*Analysis*.csv"
-        ])
-
-        if sectors_file:
-            self.sectors_df = pd.read_csv(sectors_file)
-            print(f"✅ Sector analysis loaded: {len(self.sectors_df)} rows")
-
-        # ------------------------------
-        # RESULTS / BEST 10 LAPS
-        # ------------------------------
-        results_file = self._find_file([
-            "99_Best 10 Laps By Driver_Race 1_Anonymized.CSV",
-            "*Best 10 Laps*.CSV",
-            "*Best*.csv"
-        ])
-
-        if results_file:
-            self.results_df = pd.read_csv(results_file)
-            print(f"✅ Best laps loaded: {len(self.results_df)} rows")
+        wanted = set(LOAD_ORDER if frames is None else frames)
+        files = {kind: self._find_file(FILE_PATTERNS[kind]) if kind in wanted else None for kind in LOAD_ORDER}
+        # progress is weighted by file size (files imported into the cache only have no size here)
+        self.load_progress.start({kind: path.stat().st_size if path and path.exists() else 0 for kind, path in files.items()})
+        try:
+            # ------------------------------
+            # LAP TIMES
+            # ------------------------------
+            self.load_progress.begin_frame("lap_times")
+            lap_time_file = files["lap_times"]
+
+            if lap_time_file:
+                self.lap_times_df = self._read_csv(lap_time_file, "lap_times")
+                print(f"✅ Lap times loaded: {len(self.lap_times_df)} rows")
+            self._build_phase("index_lap_times", self._build_lap_indexes)
+            self._frame_ready("lap_times")
+
+            # ------------------------------
+            # WEATHER
+            # ------------------------------
+            self.load_progress.begin_frame("weather")
+            weather_file = files["weather"]
 
+            if weather_file:
+                self.weather_df = self._read_csv(weather_file, "weather")
+                print(f"✅ Weather loaded: {len(self.weather_df)} rows")
+            self._build_phase("index_weather", self._build_weather_index)
+            self._frame_ready("weather")
+
+            # ------------------------------
+            # SECTOR / ANALYSIS
+            # ------------------------------
+            self.load_progress.begin_frame("sectors")
+            sectors_file = files["sectors"]
+
+            if sectors_file:
+                self.sectors_df = self._read_csv(sectors_file, "sectors")
+                print(f"✅ Sector analysis loaded: {len(self.sectors_df)} rows")
+            self._build_phase("index_sectors", self._build_sector_tables)
+            self._frame_ready("sectors")
+
+            # ------------------------------
+            # RESULTS / BEST 10 LAPS
+            # ------------------------------
+            self.load_progress.begin_frame("results")
+            results_file = files["results"]
+
+            if results_file:
+                self.results_df = self._read_csv(results_file, "results")
+                print(f"✅ Best laps loaded: {len(self.results_df)} rows")
+            self._frame_ready("results")
+
+            # ------------------------------
+            # TELEMETRY (largest file, loaded last)
+            # ------------------------------
+            self.load_progress.begin_frame("telemetry")
+            telemetry_file = files["telemetry"]
+
+            self._telemetry_file = telemetry_file
+            self.telemetry_reader = None
+            if telemetry_file and self.stream_telemetry:
+                tag = self._parse_options("telemetry")[0]
+                cached = self.cache.cached_file(telemetry_file, tag) if self.cache is not None else None
+                self.telemetry_reader = ChunkedTelemetryReader(telemetry_file, self.telemetry_chunk_rows, cached)
+                print(f"🌊 Telemetry left on disk, read in chunks of {self.telemetry_chunk_rows} rows")
+            elif telemetry_file:
+                self.telemetry_df = self._read_csv(telemetry_file, "telemetry")
+                print(f"✅ Telemetry loaded: {len(self.telemetry_df)} rows")
+            self._build_phase("index_telemetry", self._build_telemetry_indexes)
+            if self.wide_telemetry:
+                self._build_phase("channel_store", self._load_channel_store)
+            self._frame_ready("telemetry")
+        except Exception as e:
+            self.load_progress.fail(e)
+            raise
+
+        self.load_progress.finish()
         print("📦 All dataset files loaded successfully (or skipped if missing).")
         return self
 
+    def _build_phase(self, phase: str, build: Callable[[], None]):
+        with stage_timer(f"load.{phase}") as timer:
+            build()
+        self._record_load_phase(phase, "", timer.seconds)
+
+    def _frame_ready(self, kind: str):
+        """Drop results memoized before `kind` was loaded, then let readers use it."""
+        self.bump_data_version()
+        self.load_progress.frame_ready(kind)
+
+    def is_loaded(self, *frames: str) -> bool:
+        """True when the given frames (default: all of them) are loaded and indexed."""
+        return self.load_progress.is_ready(*frames)
+
+    # --------------------------------------------------------------------------------------
+    # Lookup indexes (built once, turn per-request masks into slices)
+    # --------------------------------------------------------------------------------------
+
+    def bump_data_version(self):
+        """Mark every memoized result stale after the frames changed."""
+        self.data_version += 1
+        self.result_cache.clear()
+
+    def get_cache_stats(self) -> Dict:
+        return {"data_version": self.data_version, **self.result_cache.stats()}
+
+    def _build_indexes(self):
+        """Sort keyed frames by (vehicle_id, lap) and record group offsets."""
+        self._build_lap_indexes()
+        self._build_weather_index()
+        self._build_sector_tables()
+        self._build_telemetry_indexes()
+
+    def _build_lap_indexes(self):
+        # a (re)load replaces anything appended live
+        self._live_laps, self._lap_tables, self._seen_laps = {}, {}, {}
+
+        if self.lap_times_df is not None:
+            self.lap_times_df = _sort_by_vehicle_lap(self.lap_times_df)
+            if 'value' in self.lap_times_df.columns:
+                self.lap_times_df['lap_time_seconds'] = self.lap_times_df['value'] / 1000
+
+            self._lap_offsets = {}
+            if 'vehicle_id' in self.lap_times_df.columns:
+                vehicles = self.lap_times_df['vehicle_id']
+                codes = _key_codes(vehicles)
+                for start, stop in zip(*_group_bounds(codes)):
+                    if codes[start] >= 0:
+                        self._lap_offsets[str(vehicles.iat[start])] = (int(start), int(stop))
+
+        self._seed_degradation()
+        self._build_vehicle_resolver()
+
+    def _build_telemetry_indexes(self):
+        self._lap_aggregates = {}
+        self._streamed_vehicles = set()
+        if self.telemetry_df is not None:
+            self._build_telemetry_index()
+        elif self.telemetry_reader is not None:
+            self._stream_lap_aggregates()
+        # cars seen only in telemetry
+        self._build_vehicle_resolver()
+
+    def _build_vehicle_resolver(self):
+        lap_counts = {v: stop - start for v, (start, stop) in self._lap_offsets.items()}
+        fallback_numbers = {}
+        if self.lap_times_df is not None and 'vehicle_number' in self.lap_times_df.columns:
+            numbers = self.lap_times_df['vehicle_number']
+            for vid, (start, _) in self._lap_offsets.items():
+                if numbers.iat[start] == numbers.iat[start]:  # skip NaN
+                    fallback_numbers[vid] = int(numbers.iat[start])
+
+        vehicle_ids = list(self._lap_offsets)
+        vehicle_ids += [v for v in self._telemetry_vehicle_offsets if v not in self._lap_offsets]
+        vehicle_ids += sorted(v for v in self._streamed_vehicles if v not in self._lap_offsets)
+        self.vehicles = VehicleResolver.from_ids(vehicle_ids, lap_counts, fallback_numbers)
+
+    def _build_sector_tables(self):
+        """Numeric, (NUMBER, LAP_NUMBER)-sorted sector frame plus the field-wide analytics."""
+        self.sector_tables = None
+        if self.sectors_df is None:
+            return
+        try:
+            self.sector_tables = build_sector_tables(self.sectors_df)
+        except ValueError as e:
+            print(f"⚠️ Sector analytics skipped: {e}")
+            return
+        self.sectors_df = self.sector_tables.laps
+
+    def _build_weather_index(self):
+        """Sort weather by observation time and keep the times as epoch seconds."""
+        self._weather_times = None
+        if self.weather_df is None or len(self.weather_df) == 0:
+            return
+
+        df = self.weather_df
+        if 'TIME_UTC_SECONDS' in df.columns:
+            times = pd.to_numeric(df['TIME_UTC_SECONDS'], errors='coerce').to_numpy(dtype=np.float64)
+        elif 'TIME_UTC_STR' in df.columns:
+            parsed = pd.to_datetime(df['TIME_UTC_STR'], format=WEATHER_TIME_FORMAT, utc=True, errors='coerce')
+            times = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+            times[parsed.isna().to_numpy()] = np.nan
+        else:
+            return  # no clock: lookups fall back to the last row
+
+        # rows without a time sort last and are never matched
+        order = np.argsort(np.where(np.isnan(times), np.inf, times), kind='stable')
+        self.weather_df = df.take(order).reset_index(drop=True)
+        times = times[order]
+        self._weather_times = times[:int((~np.isnan(times)).sum())]
+
+    def _weather_rows_at(self, seconds: np.ndarray) -> np.ndarray:
+        """
+        As-of match: index of the last observation at or before each time
+        (the first observation for times before it, the last row for NaN).
+        """
+        last = len(self.weather_df) - 1
+        if self._weather_times is None or len(self._weather_times) == 0:
+            return np.full(len(seconds), last, dtype=np.int64)
+        rows = np.searchsorted(self._weather_times, seconds, side='right') - 1
+        rows = np.clip(rows, 0, None)
+        return np.where(np.isnan(seconds), last, rows)
+
+    def resolve_vehicle(self, vehicle_number: int) -> Optional[str]:
+        """Vehicle ID for a car number (exact match), or None."""
+        return self.vehicles.vehicle_for(vehicle_number)
+
+    def _build_telemetry_index(self):
+        df = _sort_by_vehicle_lap(self.telemetry_df)
+        self.telemetry_df = df
+
+        names = df['telemetry_name']
+        if not isinstance(names.dtype, pd.CategoricalDtype):
+            names = names.astype('category')
+        # trailing entry maps missing names (code -1) to CHANNEL_OTHER
+        lookup = np.array([classify_channel(str(c)) for c in names.cat.categories] + [CHANNEL_OTHER], dtype=np.int8)
+        df['channel_code'] = lookup[names.cat.codes.to_numpy()]
+
+        self._channel_codes = df['channel_code'].to_numpy()
+        self._telemetry_values = df['telemetry_value'].to_numpy()
+
+        vehicle_codes = _key_codes(df['vehicle_id'])
+        laps = df['lap'].to_numpy()
+        vehicles = df['vehicle_id']
+
+        self._telemetry_vehicle_offsets = {}
+        for start, stop in zip(*_group_bounds(vehicle_codes)):
+            if vehicle_codes[start] >= 0:
+                self._telemetry_vehicle_offsets[str(vehicles.iat[start])] = (int(start), int(stop))
+
+        self._telemetry_lap_offsets = {}
+        starts, stops = _group_bounds(vehicle_codes, laps)
+        aggregates = reduce_lap_aggregates(
+            self._channel_codes, self._telemetry_values, starts,
+            CHANNEL_SPEED, CHANNEL_BRAKE, CHANNEL_ACCEL
+        )
+        for i, (start, stop) in enumerate(zip(starts, stops)):
+            lap = laps[start]
+            if vehicle_codes[start] < 0 or lap != lap:  # missing vehicle or NaN lap
+                continue
+            key = (str(vehicles.iat[start]), int(lap))
+            self._telemetry_lap_offsets[key] = (int(start), int(stop))
+            self._lap_aggregates[key] = aggregates[i]
+
+    def _spill_dir(self) -> Optional[Path]:
+        return self.cache.cache_dir / "telemetry_queries" if self.cache is not None and self.cache.enabled else None
+
+    def _stream_lap_aggregates(self):
+        """
+        Per-lap summary aggregates from one chunked pass over the telemetry
+        file (streaming mode). The result is a small (vehicle, lap) table,
+        stored next to the query spills so later loads skip the pass.
+        """
+        spill_dir = self._spill_dir()
+        source_key = self.cache.entry_key(self._telemetry_file) if spill_dir is not None else None
+        cached = spill_dir / f"{self._telemetry_file.stem}-{source_key}{LAP_AGGREGATES_SUFFIX}" if spill_dir else None
+
+        with stage_timer("load.telemetry_stream") as timer:
+            if cached is not None and cached.exists():
+                table = pd.read_feather(cached)
+                aggs = table[[f"agg{i}" for i in range(AGG_WIDTH)]].to_numpy(dtype=np.float64)
+                for vid, lap, agg in zip(table["vehicle_id"], table["lap"], aggs):
+                    self._lap_aggregates[(vid, int(lap))] = agg
+                source = "cache"
+            else:
+                for chunk in self.telemetry_reader.chunks():
+                    keys, aggs = self._lap_aggregate_batch(chunk)
+                    for key, agg in zip(keys, aggs):
+                        self._lap_aggregates[key] = merge_aggregate(self._lap_aggregates.get(key), agg)
+                source = self.telemetry_reader.last_stats.describe()
+                if cached is not None:
+                    self._write_lap_aggregates(cached, spill_dir, source_key)
+
+        self._streamed_vehicles = {vid for vid, _ in self._lap_aggregates}
+        rows = self.telemetry_reader.last_stats.rows_read
+        self._record_load_phase("telemetry_stream", self._telemetry_file.name, timer.seconds, rows)
+        print(f"🌊 Telemetry lap aggregates: {len(self._lap_aggregates)} laps ({source})")
+
+    def _write_lap_aggregates(self, path: Path, spill_dir: Path, source_key: str):
+        keys = list(self._lap_aggregates)
+        table = pd.DataFrame(np.array([self._lap_aggregates[k] for k in keys]).reshape(-1, AGG_WIDTH),
+                             columns=[f"agg{i}" for i in range(AGG_WIDTH)])
+        table.insert(0, "vehicle_id", [k[0] for k in keys])
+        table.insert(1, "lap", np.array([k[1] for k in keys], dtype=np.int64))
+        try:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            remove_stale_spills(spill_dir, self._telemetry_file, source_key)
+            table.to_feather(path)
+        except Exception as e:
+            print(f"⚠️ Could not store telemetry aggregates: {e}")
+
+    @timed_stage()
+    def query_telemetry(
+        self,
+        vehicles: Optional[List[str]] = None,
+        channels: Optional[List[str]] = None,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Telemetry rows matching vehicle / channel / lap-range filters. From
+        the loaded frame when telemetry is in memory; otherwise the filters
+        are applied while the file is read in chunks and the matches are
+        spilled to the columnar cache, so the same query later reads only them.
+        """
+        query = TelemetryQuery.build(vehicles, channels, lap_start, lap_end)
+        if self.telemetry_df is not None:
+            keep = query.mask(self.telemetry_df)
+            return self.telemetry_df if keep is None else self.telemetry_df[keep]
+        if self.telemetry_reader is None:
+            return pd.DataFrame()
+
+        spill_dir = self._spill_dir()
+        if spill_dir is None:
+            df = self.telemetry_reader.read(query)
+        else:
+            path = spill_path(spill_dir, self._telemetry_file, self.cache.entry_key(self._telemetry_file), query)
+            # held while reading too, so pruning never removes a file in use
+            with self._spill_path_lock(path):
+                if path.exists():
+                    os.utime(path)  # mtime = last use, for the LRU pruning
+                else:
+                    stats = ReadStats()
+                    rows = self.telemetry_reader.spill(query, path, stats)
+                    print(f"🧱 Telemetry query spilled: {rows} rows ({stats.describe()})")
+                    self._prune_spills(spill_dir)
+                df = pd.read_feather(path)
+        return _sort_by_vehicle_lap(apply_schema(df, FILE_SCHEMAS["telemetry"]))
+
+    def _spill_path_lock(self, path: Path) -> threading.Lock:
+        """Lock shared by everyone currently using `path` (callers keep a reference while they do)."""
+        with self._spill_lock:
+            lock = self._spill_locks.get(path)
+            if lock is None:
+                lock = self._spill_locks[path] = threading.Lock()
+            return lock
+
+    def _prune_spills(self, spill_dir: Path):
+        """Drop least recently used query spills over spill_budget (skipping files in use)."""
+        for path in spills_over_budget(spill_dir, self.spill_budget):
+            lock = self._spill_path_lock(path)
+            if not lock.acquire(blocking=False):
+                continue  # being read or written (including the caller's own file)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            finally:
+                lock.release()
+
+    def _load_channel_store(self):
+        """Open (or build once) the wide channel store next to the columnar cache."""
+        if self.telemetry_df is None or self._telemetry_file is None:
+            if self.telemetry_reader is not None:
+                print("⚠️ Wide telemetry store needs telemetry in memory, skipped while streaming")
+            return
+        if self.cache is None:
+            print("⚠️ Wide telemetry store needs the columnar cache directory, skipped")
+            return
+
+        parent = self.cache.cache_dir / "channels"
+        key = self.cache.entry_key(self._telemetry_file, f"wide{CHANNEL_STORE_VERSION}")
+        store = ChannelStore.open(parent / key)
+        if store is None:
+            store = ChannelStore.build(self.telemetry_df, self._telemetry_vehicle_offsets, parent / key)
+            ChannelStore.remove_stale(parent, keep=key)
+            print(f"🧱 Wide telemetry store built: {len(store.vehicles())} vehicles x {len(store.channels)} channels")
+        self.channel_store = store
+
+    def _new_degradation_accumulator(self) -> DegradationAccumulator:
+        return DegradationAccumulator(DEGRADATION_BAND, DEGRADATION_MIN_LAPS, DEGRADATION_MIN_FILTERED)
+
+    def _seed_degradation(self):
+        """
+        Degradation sums for every vehicle in one grouped pass.
+
+        Same median-band filter and linear fit as a per-vehicle np.polyfit, but
+        the least squares is kept as per-vehicle sums (one accumulator per car)
+        that append_lap_times extends lap by lap.
+        """
+        self._degradation = {}
+        if not self._lap_offsets or 'lap_time_seconds' not in self.lap_times_df.columns:
+            return
+
+        vehicles = list(self._lap_offsets.keys())
+        bounds = np.array([self._lap_offsets[v] for v in vehicles], dtype=np.int64)
+        starts, stops = bounds[:, 0], bounds[:, 1]
+        counts = stops - starts
+
+        # rows of all indexed vehicles, in (vehicle, lap) order, with their group id
+        rows = np.concatenate([np.arange(a, b) for a, b in bounds])
+        group = np.repeat(np.arange(len(vehicles)), counts)
+        y = self.lap_times_df['lap_time_seconds'].to_numpy(dtype=np.float64)[rows]
+
+        # np.median propagates NaN, so a vehicle with any NaN lap keeps no laps
+        median = pd.Series(y).groupby(group).median().reindex(range(len(vehicles))).to_numpy(copy=True)
+        has_nan = np.bincount(group, weights=np.isnan(y), minlength=len(vehicles)) > 0
+        median[has_nan] = np.nan
+
+        low, high = DEGRADATION_BAND
+        m = median[group]
+        keep = (y < m * high) & (y > m * low)
+
+        # x = position among the vehicle's kept laps (0, 1, 2, ...)
+        kept_before = np.concatenate(([0], np.cumsum(keep)))
+        group_offset = kept_before[np.concatenate(([0], np.cumsum(counts)[:-1]))]
+        x = (kept_before[1:] - group_offset[group] - 1).astype(np.float64)
+
+        g = group[keep]
+        # centre on the median so the sums stay well conditioned
+        yc = y[keep] - median[g]
+        k = np.bincount(g, minlength=len(vehicles))
+        sy = np.bincount(g, weights=yc, minlength=len(vehicles))
+        sxy = np.bincount(g, weights=x[keep] * yc, minlength=len(vehicles))
+
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        for i, vid in enumerate(vehicles):
+            acc = self._new_degradation_accumulator()
+            acc.seed(y[offsets[i]:offsets[i + 1]], median[i], k[i], sy[i], sxy[i])
+            self._degradation[vid] = acc
+
+    # --------------------------------------------------------------------------------------
+    # Live ingest: append new rows without rebuilding any frame-wide structure
+    # --------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _live_frame(rows: Union[pd.DataFrame, Iterable[Dict]], required: Tuple[str, ...]) -> pd.DataFrame:
+        df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        missing = [c for c in required if c not in df.columns]
+        if len(df) and missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        return df
+
+    def _register_live_vehicle(self, vehicle_id: str, number=None):
+        if vehicle_id not in self._degradation:
+            self._degradation[vehicle_id] = self._new_degradation_accumulator()
+        fallback = int(number) if number is not None and number == number else None
+        self.vehicles.add(vehicle_id, fallback)
+
+    @timed_stage()
+    def append_lap_times(self, rows: Union[pd.DataFrame, Iterable[Dict]]) -> int:
+        """
+        Append lap rows (vehicle_id, lap, value in ms; other CSV columns are
+        kept) and extend the per-vehicle lap tables and degradation sums.
+        Laps already known for a vehicle are skipped. Returns rows added.
+        """
+        df = self._live_frame(rows, LIVE_LAP_COLUMNS)
+        if len(df) == 0:
+            return 0
+
+        df = df.assign(
+            lap=pd.to_numeric(df["lap"], errors="coerce"),
+            lap_time_seconds=pd.to_numeric(df["value"], errors="coerce") / 1000,
+        )
+        df = df[df["vehicle_id"].notna() & df["lap"].notna()]
+
+        loaded_laps = self.lap_times_df['lap'].to_numpy() if self.lap_times_df is not None else None
+        added = 0
+        with self._ingest_lock:
+            for row in df.to_dict("records"):
+                vid, lap = str(row["vehicle_id"]), int(row["lap"])
+
+                seen = self._seen_laps.get(vid)
+                if seen is None:
+                    seen = set()
+                    if vid in self._lap_offsets:
+                        start, stop = self._lap_offsets[vid]
+                        loaded = loaded_laps[start:stop]
+                        seen = set(loaded[loaded == loaded].astype(np.int64).tolist())
+                    self._seen_laps[vid] = seen
+                if lap in seen:
+                    self.live_stats["duplicates"] += 1
+                    continue
+                seen.add(lap)
+
+                row["vehicle_id"], row["lap"] = vid, lap
+
+                self._register_live_vehicle(vid, row.get("vehicle_number"))
+                self._degradation[vid].add(float(row["lap_time_seconds"]))
+                self._live_laps.setdefault(vid, []).append(row)
+                self._lap_tables.pop(vid, None)
+                added += 1
+
+            self.live_stats["lap_rows"] += added
+            if added:
+                self.bump_data_version()
+        return added
+
+    @timed_stage()
+    def append_telemetry(self, rows: Union[pd.DataFrame, Iterable[Dict]]) -> int:
+        """
+        Fold telemetry rows (vehicle_id, lap, telemetry_name, telemetry_value)
+        into the per-lap summary aggregates. Returns rows used.
+        """
+        df = self._live_frame(rows, LIVE_TELEMETRY_COLUMNS)
+        if len(df) == 0:
+            return 0
+
+        laps = pd.to_numeric(df["lap"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = df["vehicle_id"].notna().to_numpy() & ~np.isnan(laps)
+        df = df[valid]
+        if len(df) == 0:
+            return 0
+
+        keys, aggregates = self._lap_aggregate_batch(df)
+
+        with self._ingest_lock:
+            for key, agg in zip(keys, aggregates):
+                self._lap_aggregates[key] = merge_aggregate(self._lap_aggregates.get(key), agg)
+            for vid in {k[0] for k in keys}:
+                self.vehicles.add(vid)
+            self.live_stats["telemetry_rows"] += len(df)
+            self.bump_data_version()
+
+            for listener in self._telemetry_listeners:
+                try:
+                    listener(df)
+                except Exception as e:
+                    print(f"⚠️ Telemetry listener failed: {e}")
+        return len(df)
+
+    @staticmethod
+    def _lap_aggregate_batch(df: pd.DataFrame) -> Tuple[List[Tuple[str, int]], np.ndarray]:
+        """(vehicle_id, lap) keys and summary aggregates of a telemetry batch (rows without both are skipped)."""
+        laps = pd.to_numeric(df["lap"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = df["vehicle_id"].notna().to_numpy() & ~np.isnan(laps)
+        if not valid.all():
+            df, laps = df[valid], laps[valid]
+        if len(df) == 0:
+            return [], np.zeros((0, AGG_WIDTH))
+
+        # classify each distinct channel name once, then map the batch by code
+        names, name_idx = np.unique(df["telemetry_name"].astype(str).to_numpy(), return_inverse=True)
+        codes = np.array([classify_channel(n) for n in names], dtype=np.int8)[name_idx]
+        values = pd.to_numeric(df["telemetry_value"], errors="coerce").to_numpy(dtype=np.float64)
+
+        vids, vid_idx = np.unique(df["vehicle_id"].astype(str).to_numpy(), return_inverse=True)
+        order = np.lexsort((laps, vid_idx))
+        vid_idx, laps = vid_idx[order], laps[order]
+        starts, _ = _group_bounds(vid_idx, laps)
+        aggregates = reduce_lap_aggregates(
+            codes[order], values[order], starts, CHANNEL_SPEED, CHANNEL_BRAKE, CHANNEL_ACCEL
+        )
+        keys = [(str(vids[vid_idx[start]]), int(laps[start])) for start in starts]
+        return keys, aggregates
+
+    def add_telemetry_listener(self, listener: Callable[[pd.DataFrame], None]):
+        self._telemetry_listeners.append(listener)
+
+    def remove_telemetry_listener(self, listener: Callable[[pd.DataFrame], None]):
+        if listener in self._telemetry_listeners:
+            self._telemetry_listeners.remove(listener)
+
+    def has_live_data(self) -> bool:
+        return bool(self.live_stats["lap_rows"] or self.live_stats["telemetry_rows"])
+
+    def get_live_stats(self) -> Dict:
+        return {
+            **self.live_stats,
+            "live_vehicles": sorted(self._live_laps),
+            "data_version": self.data_version,
+        }
+
     # --------------------------------------------------------------------------------------
     # Below = SAME FUNCTIONS YOU ALREADY HAVE (unchanged)
     # --------------------------------------------------------------------------------------
     
+    @timed_stage()
     def get_driver_lap_times(self, vehicle_id: str) -> pd.DataFrame:
-        if self.lap_times_df is None:
+        if self.lap_times_df is None and vehicle_id not in self._live_laps:
             return pd.DataFrame()
 
-        driver_laps = self.lap_times_df[
-            self.lap_times_df['vehicle_id'] == vehicle_id
-        ].copy()
+        # Slice of the (vehicle_id, lap)-sorted frame; treat it as read-only
+        start, stop = self._lap_offsets.get(vehicle_id, (0, 0))
+        loaded = self.lap_times_df.iloc[start:stop] if self.lap_times_df is not None else pd.DataFrame()
+        if vehicle_id not in self._live_laps:
+            return loaded
 
-        if 'value' in driver_laps.columns:
-            driver_laps['lap_time_seconds'] = driver_laps['value'] / 1000
-        
-        return driver_laps.sort_values('lap')
+        # Loaded slice + live laps in lap order, rebuilt only after this vehicle
+        # got new laps. Built under the ingest lock: an append landing mid-build
+        # would otherwise be invalidated before this (stale) table is stored.
+        with self._ingest_lock:
+            table = self._lap_tables.get(vehicle_id)
+            if table is None:
+                live = pd.DataFrame(self._live_laps[vehicle_id])
+                table = pd.concat([loaded, live], ignore_index=True) if len(loaded) else live
+                table = table.sort_values("lap", kind="stable", ignore_index=True)
+                self._lap_tables[vehicle_id] = table
+        return table
 
+    @timed_stage()
+    @cached_result
     def get_tire_degradation(self, vehicle_id: str) -> Dict:
         laps = self.get_driver_lap_times(vehicle_id)
-        if len(laps) < 5:
+        if len(laps) < DEGRADATION_MIN_LAPS:
             return {'degradation_rate': 0, 'laps': []}
 
         lap_times = laps['lap_time_seconds'].values
-        median = np.median(lap_times)
-        filtered = lap_times[(lap_times < median * 1.2) & (lap_times > median * 0.8)]
+        acc = self._degradation.get(vehicle_id)
+        rate, intercept, kept = acc.fit() if acc is not None else (0.0, math.nan, 0)
 
-        if len(filtered) < 3:
+        if kept < DEGRADATION_MIN_FILTERED or intercept != intercept:
             return {'degradation_rate': 0, 'laps': lap_times.tolist()}
 
-        x = np.arange(len(filtered))
-        coeffs = np.polyfit(x, filtered, 1)
-
         return {
-            'degradation_rate': float(coeffs[0]),
+            'degradation_rate': float(rate),
             'laps': lap_times.tolist(),
-            'trend': coeffs.tolist()
+            'trend': [float(rate), float(intercept)]
         }
 
-    def get_sector_performance(self, vehicle_number: int) -> pd.DataFrame:
-        if self.sectors_df is None:
-            return pd.DataFrame()
+    @timed_stage()
+    @cached_result
+    def get_all_tire_degradation(self) -> pd.DataFrame:
+        """
+        Degradation fit for every vehicle, read off the running sums.
 
-        driver = self.sectors_df[self.sectors_df['NUMBER'] == vehicle_number].copy()
+        Returns a frame indexed by vehicle_id with degradation_rate, intercept
+        and filtered_laps; vehicles without enough laps get a rate of 0 and a
+        NaN intercept, as in the per-vehicle call.
+        """
+        columns = ['degradation_rate', 'intercept', 'filtered_laps']
+        if not self._degradation:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='vehicle_id'))
 
-        for col in ['S1_SECONDS', 'S2_SECONDS', 'S3_SECONDS']:
-            if col in driver.columns:
-                driver[col] = pd.to_numeric(driver[col], errors='coerce')
+        fits = [acc.fit() for acc in self._degradation.values()]
+        return pd.DataFrame(
+            {
+                'degradation_rate': np.array([f[0] for f in fits], dtype=np.float64),
+                'intercept': np.array([f[1] for f in fits], dtype=np.float64),
+                'filtered_laps': np.array([f[2] for f in fits], dtype=np.int64),
+            },
+            index=pd.Index(list(self._degradation), name='vehicle_id'),
+        )
 
-        return driver.fillna('')
+    @timed_stage()
+    def get_sector_performance(self, vehicle_number: int) -> pd.DataFrame:
+        """
+        One car's sector rows (numeric splits, missing ones NaN) with the
+        precomputed per-lap deltas, rolling deltas and lap ranks; a read-only slice.
+        """
+        if self.sector_tables is None:
+            return pd.DataFrame()
+        start, stop = self.sector_tables.offsets.get(int(vehicle_number), (0, 0))
+        return self.sectors_df.iloc[start:stop]
+
+    @timed_stage()
+    def get_sector_analytics(self, vehicle_number: Optional[int] = None):
+        """
+        Per-car best sectors, theoretical best, best lap and field ranks:
+        the whole field as a frame (ordered by theoretical best), or one car
+        as a dict (None if it has no sector data).
+        """
+        if vehicle_number is not None:
+            return sector_summary_row(self.sector_tables, int(vehicle_number))
+        if self.sector_tables is None:
+            return pd.DataFrame()
+        return self.sector_tables.summary
 
+    @timed_stage()
     def get_weather_at_time(self, timestamp: str) -> Dict:
+        """Weather in effect at `timestamp` (ISO or epoch seconds); latest when empty."""
         if self.weather_df is None or len(self.weather_df) == 0:
             return {}
 
-        latest = self.weather_df.iloc[-1]
+        seconds = parse_timestamp(timestamp)
+        row = self._weather_rows_at(np.array([np.nan if seconds is None else seconds]))[0]
+        latest = self.weather_df.iloc[row]
 
         def safe_float(val, default=0.0):
             try:
@@ -156,12 +1095,62 @@ class RaceDataProcessor:
                 return default
 
         return {
-            'air_temp': safe_float(latest.get('AIR_TEMP', 25)),
-            'track_temp': safe_float(latest.get('TRACK_TEMP', 35)),
-            'humidity': safe_float(latest.get('HUMIDITY', 50)),
-            'wind_speed': safe_float(latest.get('WIND_SPEED', 10)),
+            key: safe_float(latest.get(col, default))
+            for col, (key, default) in WEATHER_FIELDS.items()
         }
 
+    @timed_stage()
+    def get_weather_for_lap(self, vehicle_id: str, lap: int) -> Dict:
+        """Weather when `vehicle_id` completed `lap` (latest if the lap has no timestamp)."""
+        laps = self.get_driver_lap_times(vehicle_id)
+        timestamp = ""
+        if len(laps) and 'timestamp' in laps.columns:
+            match = laps['timestamp'][(laps['lap'] == lap).to_numpy()]
+            if len(match):
+                timestamp = match.iloc[0]
+        return self.get_weather_at_time(timestamp)
+
+    @timed_stage()
+    def join_weather(self, df: pd.DataFrame, time_column: str = 'timestamp') -> pd.DataFrame:
+        """
+        Copy of `df` with the weather in effect at each row's `time_column`
+        attached (air_temp, track_temp, humidity, wind_speed; NaN where the
+        reading is missing). One timestamp parse and one searchsorted for the
+        whole frame.
+        """
+        out = df.copy()
+        if self.weather_df is None or len(self.weather_df) == 0 or len(df) == 0:
+            return out
+
+        if time_column in df.columns:
+            parsed = pd.to_datetime(df[time_column].astype(str), utc=True, format='ISO8601', errors='coerce')
+            seconds = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+            seconds[parsed.isna().to_numpy()] = np.nan
+        else:
+            seconds = np.full(len(df), np.nan)
+
+        rows = self._weather_rows_at(seconds)
+        for col, (key, default) in WEATHER_FIELDS.items():
+            if col in self.weather_df.columns:
+                values = pd.to_numeric(self.weather_df[col], errors='coerce').to_numpy(dtype=np.float64)
+                out[key] = values[rows]
+            else:
+                out[key] = float(default)
+        return out
+
+    @timed_stage()
+    @cached_result
+    def get_laps_with_weather(self) -> pd.DataFrame:
+        """Every lap row (loaded and live) with the weather in effect when it was completed."""
+        frames = [self.lap_times_df] if self.lap_times_df is not None else []
+        frames += [pd.DataFrame(rows) for rows in self._live_laps.values()]
+        if not frames:
+            return pd.DataFrame()
+        laps = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        return self.join_weather(laps)
+
+    @timed_stage()
+    @cached_result
     def get_all_drivers(self) -> List[Dict]:
         if self.results_df is None:
             return []
@@ -188,25 +1177,114 @@ class RaceDataProcessor:
                 })
         return drivers
 
-    def get_telemetry_summary(self, vehicle_id: str, lap: int) -> Dict:
-        if self.telemetry_df is None:
-            return {}
+    @timed_stage()
+    def get_vehicle_telemetry(
+        self,
+        vehicle_id: str,
+        channels: Optional[List[str]] = None,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> Optional[pd.DataFrame]:
+        """Loaded telemetry rows of one vehicle, optionally by channel and lap range; None if unknown."""
+        if self.telemetry_df is None and vehicle_id in self._streamed_vehicles:
+            return self.query_telemetry([vehicle_id], channels, lap_start, lap_end)
+        if self.telemetry_df is None or vehicle_id not in self._telemetry_vehicle_offsets:
+            return None
 
-        df = self.telemetry_df[
-            (self.telemetry_df['vehicle_id'] == vehicle_id) & 
-            (self.telemetry_df['lap'] == lap)
-        ]
+        base, end = self._telemetry_vehicle_offsets[vehicle_id]
+        # rows are lap-sorted within the vehicle, so the lap range is a sub-slice
+        laps = self.telemetry_df['lap'].to_numpy()[base:end]
+        lo = int(np.searchsorted(laps, lap_start, side='left')) if lap_start is not None else 0
+        hi = int(np.searchsorted(laps, lap_end, side='right')) if lap_end is not None else len(laps)
 
-        if len(df) == 0:
-            return {}
+        df = self.telemetry_df.iloc[base + lo:base + max(lo, hi)]
+        if channels:
+            df = df[df['telemetry_name'].isin(channels).to_numpy()]
+        return df
 
-        speed = df[df['telemetry_name'] == 'vcar_can']
-        brake = df[df['telemetry_name'].str.contains("brake", na=False)]
-        accel = df[df['telemetry_name'] == 'accx_can']
+    @timed_stage()
+    def get_channels(
+        self,
+        vehicle_id: str,
+        channels: Optional[List[str]] = None,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> Optional[ChannelSlice]:
+        """
+        Timestamp-aligned float32 columns (channel x lap range) from the wide
+        store; None if the store isn't loaded or the vehicle is unknown.
+        """
+        if self.channel_store is None:
+            return None
+        return self.channel_store.read(vehicle_id, channels, lap_start, lap_end)
 
-        return {
-            'avg_speed': float(speed['telemetry_value'].mean()) if len(speed) else 0,
-            'max_speed': float(speed['telemetry_value'].max()) if len(speed) else 0,
-            'brake_applications': int(len(brake)),
-            'avg_accel': float(accel['telemetry_value'].mean()) if len(accel) else 0
-        }
+    @timed_stage()
+    @cached_result
+    def get_channel_series(
+        self,
+        vehicle_id: str,
+        channel: str,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Time-sorted (epoch seconds, value) arrays of one channel; None if the vehicle is unknown."""
+        wide = self.get_channels(vehicle_id, [channel], lap_start, lap_end)
+        if wide is not None:
+            column = wide.columns.get(channel, np.empty(0, dtype=np.float32))
+            has_value = ~np.isnan(column)
+            return np.asarray(wide.time)[has_value], column[has_value].astype(np.float64)
+
+        df = self.get_vehicle_telemetry(vehicle_id, [channel], lap_start, lap_end)
+        if df is None:
+            return None
+        t = to_epoch_seconds(df)
+        v = df['telemetry_value'].to_numpy(dtype=np.float64)
+        order = np.argsort(t, kind='stable')
+        return t[order], v[order]
+
+    @timed_stage()
+    def get_downsampled_channel(
+        self,
+        vehicle_id: str,
+        channel: str,
+        points: int,
+        method: str = "lttb",
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Chart-ready trace of one channel with about `points` samples. The
+        target is snapped to a resolution level (see downsampling.py) and each
+        level is cached, so repeated zooms don't recompute.
+        """
+        return self._downsampled_channel_level(
+            vehicle_id, channel, resolution_level(points), method, lap_start, lap_end
+        )
+
+    @cached_result
+    def _downsampled_channel_level(self, vehicle_id, channel, level, method, lap_start, lap_end) -> Optional[Dict]:
+        series = self.get_channel_series(vehicle_id, channel, lap_start, lap_end)
+        if series is None:
+            return None
+        t, v = downsample(*series, level, method)
+        return {'level': level, 'source_points': len(series[0]), 't': t, 'v': v}
+
+    @timed_stage()
+    @cached_result
+    def get_downsampled_lap_series(self, vehicle_id: str, points: int, method: str = "lttb") -> Dict:
+        """Lap number vs lap time for one vehicle, reduced like get_downsampled_channel."""
+        laps = self.get_driver_lap_times(vehicle_id)
+        if len(laps) == 0:
+            return {'source_points': 0, 'lap': np.empty(0), 'lap_time_seconds': np.empty(0)}
+        x = laps['lap'].to_numpy(dtype=np.float64)
+        y = laps['lap_time_seconds'].to_numpy(dtype=np.float64)
+        x, y = downsample(x, y, max(int(points), 3), method)
+        return {'source_points': len(laps), 'lap': x, 'lap_time_seconds': y}
+
+    @timed_stage()
+    def get_telemetry_summary(self, vehicle_id: str, lap: int) -> Dict:
+        # Per-lap sums/counts/max kept by _build_telemetry_index and append_telemetry
+        agg = self._lap_aggregates.get((vehicle_id, lap))
+        if agg is None:
+            return {}
+        return summarize_aggregate(agg)
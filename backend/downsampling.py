@@ -0,0 +1,111 @@
+from typing import Tuple
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# Chart downsampling for telemetry traces and lap series.
+# Both methods return indices into the input (always including the first and
+# last point), so callers can pick any aligned columns with them.
+# ------------------------------------------------------------------------------
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+# Requested point counts are rounded up to a power of two in this range, so
+# nearby zoom levels share one cached result.
+MIN_LEVEL_POINTS = 64
+MAX_LEVEL_POINTS = 16384
+
+
+def resolution_level(points: int) -> int:
+    """Cache level for a requested point count (next power of two, clamped)."""
+    points = max(int(points), MIN_LEVEL_POINTS)
+    return min(1 << (points - 1).bit_length(), MAX_LEVEL_POINTS)
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    """Edges splitting range(n) into `buckets` runs whose sizes differ by at most one."""
+    return np.linspace(0, n, buckets + 1).astype(np.int64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets. Inner points are split into n_out - 2
+    buckets; from each the point forming the largest triangle with the point
+    kept in the previous bucket and the mean of the next bucket is kept.
+
+    The area against the previous point a is |ax*A + ay*B + C| with A, B, C
+    per point precomputed in one vectorized pass, so the sequential part is a
+    single dot product per bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = 1 + _bucket_edges(n - 2, n_out - 2)
+    starts, stops = edges[:-1], edges[1:]
+
+    # mean of each bucket (the last bucket looks ahead to the final point)
+    sums_x = np.add.reduceat(x[1:-1], starts - 1)
+    sums_y = np.add.reduceat(y[1:-1], starts - 1)
+    sizes = stops - starts
+    next_x = np.append((sums_x / sizes)[1:], x[-1])
+    next_y = np.append((sums_y / sizes)[1:], y[-1])
+
+    bucket = np.repeat(np.arange(n_out - 2), sizes)
+    cx, cy = next_x[bucket], next_y[bucket]
+    px, py = x[1:-1], y[1:-1]
+    coef_a = py - cy
+    coef_b = cx - px
+    coef_c = px * cy - cx * py
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    ax, ay = x[0], y[0]
+    for i in range(n_out - 2):
+        lo, hi = starts[i] - 1, stops[i] - 1
+        area = np.abs(ax * coef_a[lo:hi] + ay * coef_b[lo:hi] + coef_c[lo:hi])
+        pick = lo + int(area.argmax()) + 1
+        out[i + 1] = pick
+        ax, ay = x[pick], y[pick]
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min and max of each of n_out // 2 equal-count buckets (plus both ends),
+    fully vectorized by padding buckets into a 2-D array. Keeps every spike,
+    which LTTB can smooth away on very dense traces.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    buckets = (n_out - 2) // 2
+    edges = _bucket_edges(n, buckets)
+    sizes = np.diff(edges)
+    width = int(sizes.max())
+
+    # row i holds bucket i, padded with NaN (ignored by nanargmin/nanargmax)
+    col = np.arange(n) - np.repeat(edges[:-1], sizes)
+    grid = np.full((buckets, width), np.nan)
+    grid[np.repeat(np.arange(buckets), sizes), col] = y
+
+    lows = edges[:-1] + np.nanargmin(grid, axis=1)
+    highs = edges[:-1] + np.nanargmax(grid, axis=1)
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int, method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) reduced to about n_out points; NaN samples are dropped first."""
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if not valid.all():
+        x, y = x[valid], y[valid]
+
+    idx = lttb_indices(x, y, n_out) if method == "lttb" else minmax_indices(y, n_out)
+    return x[idx], y[idx]
@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Runs inside the worker; reports when the task actually started."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class PoolStats:
+    """Queue depth and wait/run times for one pool (thread-safe)."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    def on_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def on_done(self, wait: float, run: float, failed: bool = False):
+        with self._lock:
+            self.completed += 1
+            self.failed += int(failed)
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.run_total += run
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            in_flight = self.submitted - self.completed
+            done = max(self.completed, 1)
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "in_flight": in_flight,
+                # tasks beyond the worker count are waiting for a free worker
+                "queue_depth": max(0, in_flight - self.workers),
+                "avg_wait_ms": round(self.wait_total / done * 1000, 2),
+                "max_wait_ms": round(self.wait_max * 1000, 2),
+                "avg_run_ms": round(self.run_total / done * 1000, 2),
+            }
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-heavy processor/engine work off the asyncio event loop.
+
+    `run_light` uses a thread pool (pandas/NumPy release the GIL for most of
+    their work, and the callable can close over the shared processor).
+    `run_heavy` uses a process pool for long NumPy jobs such as simulations;
+    its callables must be module-level functions, and workers get their data
+    once through `initializer` (see backend.compute_tasks) instead of having
+    it pickled into every task. Workers are spawned, not forked: the pool is
+    created while the API process already runs loader and pool threads, and
+    a fork would copy their locks (and the parent's frames) mid-flight. With
+    heavy_workers=0 heavy calls fall back to the thread pool.
+    """
+
+    def __init__(
+        self,
+        light_workers: int = 4,
+        heavy_workers: int = 2,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = ()
+    ):
+        self._light = ThreadPoolExecutor(max_workers=light_workers, thread_name_prefix="pitgenius-light")
+        self.light_stats = PoolStats("light", light_workers)
+
+        self._heavy: Optional[Executor] = None
+        self.heavy_stats = PoolStats("heavy", heavy_workers)
+        if heavy_workers > 0:
+            self._heavy = ProcessPoolExecutor(
+                max_workers=heavy_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs
+            )
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable] = None, initargs: tuple = ()) -> "ComputeExecutor":
+        """Pool sizes from PITGENIUS_THREAD_WORKERS / PITGENIUS_PROCESS_WORKERS."""
+        cpus = os.cpu_count() or 1
+        light = int(os.environ.get("PITGENIUS_THREAD_WORKERS", min(8, cpus + 2)))
+        heavy = int(os.environ.get("PITGENIUS_PROCESS_WORKERS", min(2, cpus)))
+        return cls(light_workers=light, heavy_workers=heavy, initializer=initializer, initargs=initargs)
+
+    async def _run(self, pool: Executor, stats: PoolStats, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        stats.on_submit()
+        submitted = time.time()
+        try:
+            started, result = await loop.run_in_executor(pool, partial(_timed_call, fn, args, kwargs))
+        except BaseException:
+            elapsed = time.time() - submitted
+            stats.on_done(wait=0.0, run=elapsed, failed=True)
+            raise
+        stats.on_done(wait=max(0.0, started - submitted), run=time.time() - started)
+        return result
+
+    async def run_light(self, fn: Callable, *args, **kwargs):
+        """Run a short processor/engine call on the thread pool."""
+        return await self._run(self._light, self.light_stats, fn, *args, **kwargs)
+
+    async def run_heavy(self, fn: Callable, *args, **kwargs):
+        """Run a long computation in a worker process (thread pool if disabled)."""
+        if self._heavy is None:
+            return await self._run(self._light, self.heavy_stats, fn, *args, **kwargs)
+        return await self._run(self._heavy, self.heavy_stats, fn, *args, **kwargs)
+
+    def stats(self) -> Dict:
+        return {
+            "light": self.light_stats.snapshot(),
+            "heavy": {**self.heavy_stats.snapshot(), "process_pool": self._heavy is not None},
+        }
+
+    def shutdown(self):
+        self._light.shutdown(wait=False, cancel_futures=True)
+        if self._heavy is not None:
+            self._heavy.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+import bisect
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class DegradationAccumulator:
+    """
+    Running least-squares sums for one vehicle's tire degradation fit.
+
+    Matches RaceDataProcessor's batch fit: laps outside `band` x the median
+    are skipped and the kept laps are regressed against their index
+    (0, 1, 2, ...). x runs over consecutive integers, so sum(x) and
+    sum(x^2) follow from the kept count and only sum(y) and sum(x*y) are
+    stored, centred on `ref` to keep them well conditioned.
+
+    Seeded from the grouped load-time pass, the fit is exact. Appended laps
+    are checked against the running median when they arrive and are not
+    re-checked later if the median moves. An update is a bisect.insort into
+    the sorted lap list (O(log n) search, O(n) list insert; a few hundred
+    laps at most) plus O(1) sum updates.
+
+    Live laps take x in arrival order, not lap order, so laps that arrive
+    out of order make the live fit differ from a batch fit of the same laps.
+    As in the batch fit, a NaN lap time poisons the median: once one is
+    added the vehicle reports no fit (rate 0) until the next reload.
+    """
+
+    __slots__ = ("band", "min_laps", "min_kept", "ref", "sorted_laps",
+                 "has_nan", "k", "sy", "sxy")
+
+    def __init__(self, band: Tuple[float, float], min_laps: int, min_kept: int):
+        self.band = band
+        self.min_laps = min_laps
+        self.min_kept = min_kept
+        self.ref: Optional[float] = None
+        self.sorted_laps: List[float] = []
+        self.has_nan = False
+        self.k = 0
+        self.sy = 0.0
+        self.sxy = 0.0
+
+    @property
+    def n_laps(self) -> int:
+        return len(self.sorted_laps) + int(self.has_nan)
+
+    def median(self) -> float:
+        laps = self.sorted_laps
+        if self.has_nan or not laps:
+            return math.nan  # np.median semantics: any NaN poisons the median
+        mid = len(laps) // 2
+        return laps[mid] if len(laps) % 2 else (laps[mid - 1] + laps[mid]) / 2
+
+    def seed(self, laps: np.ndarray, ref: float, k: int, sy: float, sxy: float):
+        """Load exact sums computed by the grouped batch pass."""
+        laps = np.asarray(laps, dtype=np.float64)
+        self.has_nan = bool(np.isnan(laps).any())
+        self.sorted_laps = np.sort(laps[~np.isnan(laps)]).tolist()
+        self.ref = ref if ref == ref else None
+        self.k, self.sy, self.sxy = int(k), float(sy), float(sxy)
+
+    def add(self, lap_time: float):
+        if lap_time != lap_time:
+            self.has_nan = True
+            return
+        bisect.insort(self.sorted_laps, float(lap_time))
+
+        median = self.median()
+        low, high = self.band
+        if not (median * low < lap_time < median * high):
+            return
+        if self.ref is None:
+            self.ref = median
+        y = lap_time - self.ref
+        self.sy += y
+        self.sxy += self.k * y  # this lap's x is the number kept before it
+        self.k += 1
+
+    def fit(self) -> Tuple[float, float, int]:
+        """(rate, intercept, kept laps); rate 0 and NaN intercept when not fitted."""
+        k = self.k
+        if self.n_laps < self.min_laps or k < self.min_kept or self.has_nan:
+            return 0.0, math.nan, k
+        sx = (k - 1) * k / 2
+        sxx = (k - 1) * k * (2 * k - 1) / 6
+        rate = (k * self.sxy - sx * self.sy) / (k * sxx - sx * sx)
+        intercept = (self.sy - rate * sx) / k + self.ref
+        return rate, intercept, k
+
+
+# Per-(vehicle, lap) telemetry aggregate layout
+SPEED_SUM, SPEED_N, SPEED_MAX, BRAKE_N, ACCEL_SUM, ACCEL_N = range(6)
+AGG_WIDTH = 6
+
+
+def reduce_lap_aggregates(
+    codes: np.ndarray,
+    values: np.ndarray,
+    starts: np.ndarray,
+    speed: int,
+    brake: int,
+    accel: int
+) -> np.ndarray:
+    """
+    Aggregates for contiguous row groups (one per lap, given by their start
+    offsets), as a (groups, AGG_WIDTH) float64 array. Works one column at a
+    time so the temporaries stay at one row-length array each.
+    """
+    out = np.zeros((len(starts), AGG_WIDTH))
+    if len(starts) == 0:
+        return out
+
+    valid = ~np.isnan(values)
+    is_speed = (codes == speed) & valid
+    is_accel = (codes == accel) & valid
+
+    out[:, SPEED_SUM] = np.add.reduceat(np.where(is_speed, values, 0), starts, dtype=np.float64)
+    out[:, SPEED_N] = np.add.reduceat(is_speed, starts, dtype=np.int64)
+    out[:, SPEED_MAX] = np.maximum.reduceat(np.where(is_speed, values, -np.inf), starts)
+    out[:, BRAKE_N] = np.add.reduceat(codes == brake, starts, dtype=np.int64)
+    out[:, ACCEL_SUM] = np.add.reduceat(np.where(is_accel, values, 0), starts, dtype=np.float64)
+    out[:, ACCEL_N] = np.add.reduceat(is_accel, starts, dtype=np.int64)
+    return out
+
+
+def merge_aggregate(current: Optional[np.ndarray], new: np.ndarray) -> np.ndarray:
+    if current is None:
+        return new.copy()
+    merged = current + new
+    merged[SPEED_MAX] = max(current[SPEED_MAX], new[SPEED_MAX])
+    return merged
+
+
+def summarize_aggregate(agg: np.ndarray) -> Dict:
+    """Same shape as RaceDataProcessor.get_telemetry_summary."""
+    return {
+        'avg_speed': float(agg[SPEED_SUM] / agg[SPEED_N]) if agg[SPEED_N] else 0,
+        'max_speed': float(agg[SPEED_MAX]) if agg[SPEED_N] else 0,
+        'brake_applications': int(agg[BRAKE_N]),
+        'avg_accel': float(agg[ACCEL_SUM] / agg[ACCEL_N]) if agg[ACCEL_N] else 0
+    }
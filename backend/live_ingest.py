@@ -0,0 +1,144 @@
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class CsvTailer:
+    """
+    Reads rows appended to a growing CSV since the previous call.
+
+    Only complete lines are parsed; a trailing partial line waits for the
+    next read. If the file shrinks (rotated or rewritten) it is re-read from
+    the top, header included.
+    """
+
+    def __init__(self, path: str, dtype: Optional[Dict] = None):
+        self.path = Path(path)
+        self.dtype = dtype
+        self.offset = 0
+        self.header: Optional[bytes] = None
+        self._partial = b""
+
+    def read_new(self) -> Optional[pd.DataFrame]:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+        if size < self.offset:
+            self.offset, self.header, self._partial = 0, None, b""
+        if size == self.offset:
+            return None
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = self._partial + f.read(size - self.offset)
+        self.offset = size
+
+        cut = data.rfind(b"\n") + 1
+        data, self._partial = data[:cut], data[cut:]
+
+        if self.header is None:
+            newline = data.find(b"\n") + 1
+            if newline == 0:
+                self._partial = data + self._partial
+                return None
+            self.header, data = data[:newline], data[newline:]
+
+        if not data.strip():
+            return None
+        return pd.read_csv(io.BytesIO(self.header + data), dtype=self.dtype)
+
+
+class LiveIngester:
+    """
+    Background thread that tails live telemetry / lap-time CSVs and feeds the
+    new rows to RaceDataProcessor.append_telemetry / append_lap_times.
+    """
+
+    def __init__(
+        self,
+        processor,
+        telemetry_path: Optional[str] = None,
+        lap_times_path: Optional[str] = None,
+        interval: float = 1.0
+    ):
+        self.processor = processor
+        self.interval = interval
+        self.telemetry = CsvTailer(telemetry_path, dtype={"vehicle_id": str}) if telemetry_path else None
+        self.lap_times = CsvTailer(lap_times_path, dtype={"vehicle_id": str}) if lap_times_path else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_poll_ms = 0.0
+
+    @classmethod
+    def from_env(cls, processor) -> Optional["LiveIngester"]:
+        """Files from PITGENIUS_LIVE_TELEMETRY / PITGENIUS_LIVE_LAPS; None if neither is set."""
+        telemetry = os.environ.get("PITGENIUS_LIVE_TELEMETRY")
+        laps = os.environ.get("PITGENIUS_LIVE_LAPS")
+        if not telemetry and not laps:
+            return None
+        interval = float(os.environ.get("PITGENIUS_LIVE_INTERVAL", 1.0))
+        return cls(processor, telemetry, laps, interval)
+
+    def poll(self) -> Dict[str, int]:
+        """Ingest whatever was appended since the last poll."""
+        started = time.perf_counter()
+        added = {"lap_rows": 0, "telemetry_rows": 0}
+
+        # laps first so a lap's telemetry never lands on a vehicle the resolver can't map yet
+        if self.lap_times is not None:
+            rows = self.lap_times.read_new()
+            if rows is not None:
+                added["lap_rows"] = self.processor.append_lap_times(rows)
+        if self.telemetry is not None:
+            rows = self.telemetry.read_new()
+            if rows is not None:
+                added["telemetry_rows"] = self.processor.append_telemetry(rows)
+
+        self.polls += 1
+        self.last_poll_ms = round((time.perf_counter() - started) * 1000, 2)
+        return added
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"⚠️ Live ingest failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pitgenius-live-ingest", daemon=True)
+        self._thread.start()
+        print(f"📡 Tailing live data every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "telemetry_file": str(self.telemetry.path) if self.telemetry else None,
+            "lap_times_file": str(self.lap_times.path) if self.lap_times else None,
+            "polls": self.polls,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_poll_ms": self.last_poll_ms,
+        }
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+# ------------------------------------------------------------------------------
+# Load state of one race, frame by frame. load_all_data marks each dataset
+# frame ready as soon as it (and its lookup indexes) can be served, so the API
+# can answer requests that only need the frames already loaded while the rest
+# (usually the large telemetry file) is still being read.
+# ------------------------------------------------------------------------------
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LoadProgress:
+    """Thread-safe load state: written by the loading thread, read by request handlers."""
+
+    def __init__(self, frames: Iterable[str]):
+        self.frames = tuple(frames)
+        self._lock = threading.Lock()
+        self.state = PENDING
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+        self._ready: set = set()
+        self._weights: Dict[str, float] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def start(self, weights: Optional[Dict[str, float]] = None):
+        """(Re)start a load; `weights` (e.g. file sizes) drive the reported percentage."""
+        with self._lock:
+            self.state = LOADING
+            self.current, self.error = None, None
+            self._ready = set()
+            self._weights = {f: max(float((weights or {}).get(f, 1)), 1.0) for f in self.frames}
+            self.started, self.finished = time.time(), None
+
+    def begin_frame(self, frame: str):
+        with self._lock:
+            self.current = frame
+
+    def frame_ready(self, frame: str):
+        with self._lock:
+            self._ready.add(frame)
+            if self.current == frame:
+                self.current = None
+
+    def finish(self):
+        with self._lock:
+            self.state = READY
+            self.current = None
+            self._ready = set(self.frames)
+            self.finished = time.time()
+
+    def fail(self, error: BaseException):
+        with self._lock:
+            self.state = FAILED
+            self.error = f"{type(error).__name__}: {error}"
+            self.finished = time.time()
+
+    def is_ready(self, *frames: str) -> bool:
+        """True when every given frame is loaded (no frames = the whole load)."""
+        with self._lock:
+            if not frames:
+                return self.state == READY
+            return all(f in self._ready for f in frames)
+
+    def describe(self) -> Dict:
+        with self._lock:
+            total = sum(self._weights.values()) or 1.0
+            done = sum(self._weights.get(f, 0.0) for f in self._ready)
+            end = self.finished or time.time()
+            return {
+                "state": self.state,
+                "percent": 100.0 if self.state == READY else round(100.0 * done / total, 1),
+                "frames_ready": [f for f in self.frames if f in self._ready],
+                "frames_pending": [f for f in self.frames if f not in self._ready],
+                "current_frame": self.current,
+                "elapsed_seconds": round(end - self.started, 3) if self.started else 0.0,
+                "error": self.error,
+            }
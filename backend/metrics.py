@@ -0,0 +1,311 @@
+import bisect
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ------------------------------------------------------------------------------
+# In-process metrics, rendered in the Prometheus text format on GET /metrics.
+#  - per-route request latency histograms (API middleware)
+#  - per-stage latency histograms (@timed_stage on processor / engine methods)
+#  - load phase timings per dataset file (load_all_data)
+#  - slow requests profiled by SamplingProfiler, per route template
+# Counters live in this process only; compute worker processes aren't included.
+# PITGENIUS_METRICS=0 turns the stage timers into no-ops at import time.
+# ------------------------------------------------------------------------------
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_TIMERS_ENABLED = os.environ.get("PITGENIUS_METRICS", "1") != "0"
+# slow-request profiles listed by SamplingProfiler.stats()
+RECENT_PROFILES = 20
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, object]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds)."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def render(self, name: str, labels: Tuple[Tuple[str, object], ...]) -> List[str]:
+        lines, running = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {running}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.total!r}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe store behind GET /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple, Histogram] = {}
+        self._stages: Dict[str, Histogram] = {}
+        self._load_phases: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._slow_requests: Counter = Counter()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, str(status))
+        with self._lock:
+            hist = self._requests.get(key)
+            if hist is None:
+                hist = self._requests[key] = Histogram(REQUEST_BUCKETS)
+            hist.observe(seconds)
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = Histogram(STAGE_BUCKETS)
+            hist.observe(seconds)
+
+    def set_load_phase(self, phase: str, source: str, seconds: float, rows: int = 0):
+        with self._lock:
+            self._load_phases[(phase, source)] = (seconds, rows)
+
+    def observe_slow_request(self, method: str, route: str):
+        with self._lock:
+            self._slow_requests[(method, route)] += 1
+
+    def stage_summary(self) -> Dict[str, Dict]:
+        """count / total / mean seconds per stage (for /debug views)."""
+        with self._lock:
+            return {
+                stage: {"count": h.count, "total_s": round(h.total, 6), "mean_ms": round(h.total / h.count * 1000, 3)}
+                for stage, h in self._stages.items() if h.count
+            }
+
+    def render(self, gauges: Optional[List[Tuple[str, str, Dict, float]]] = None) -> str:
+        """Prometheus text exposition; `gauges` = extra (name, help, labels, value) samples."""
+        out = []
+        with self._lock:
+            out += [
+                "# HELP pitgenius_request_duration_seconds HTTP request latency by route template.",
+                "# TYPE pitgenius_request_duration_seconds histogram",
+            ]
+            for (method, route, status), hist in sorted(self._requests.items()):
+                out += hist.render("pitgenius_request_duration_seconds",
+                                   (("method", method), ("route", route), ("status", status)))
+
+            out += [
+                "# HELP pitgenius_stage_duration_seconds Processor / strategy engine stage latency.",
+                "# TYPE pitgenius_stage_duration_seconds histogram",
+            ]
+            for stage, hist in sorted(self._stages.items()):
+                out += hist.render("pitgenius_stage_duration_seconds", (("stage", stage),))
+
+            out += [
+                "# HELP pitgenius_load_phase_seconds Time spent per load_all_data phase and file.",
+                "# TYPE pitgenius_load_phase_seconds gauge",
+            ]
+            for (phase, source), (seconds, _) in sorted(self._load_phases.items()):
+                out.append(f"pitgenius_load_phase_seconds{_labels((('phase', phase), ('file', source)))} {seconds!r}")
+            out += [
+                "# HELP pitgenius_load_phase_rows Rows loaded per load_all_data phase and file.",
+                "# TYPE pitgenius_load_phase_rows gauge",
+            ]
+            for (phase, source), (_, rows) in sorted(self._load_phases.items()):
+                out.append(f"pitgenius_load_phase_rows{_labels((('phase', phase), ('file', source)))} {rows}")
+
+            out += [
+                "# HELP pitgenius_slow_requests_total Requests over the profiler's slow_ms that got a profile.",
+                "# TYPE pitgenius_slow_requests_total counter",
+            ]
+            for (method, route), count in sorted(self._slow_requests.items()):
+                out.append(f"pitgenius_slow_requests_total{_labels((('method', method), ('route', route)))} {count}")
+
+        typed = set()
+        for name, help_text, labels, value in gauges or []:
+            if name not in typed:
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                typed.add(name)
+            out.append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+        return "\n".join(out) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def timed_stage(name: Optional[str] = None) -> Callable:
+    """
+    Record every call of the decorated function in the stage histogram
+    (default stage name: Class.method). Put it above @cached_result so
+    cache hits are counted as the cheap calls they are.
+    """
+    def decorate(fn: Callable) -> Callable:
+        if not STAGE_TIMERS_ENABLED:
+            return fn
+        stage = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.observe_stage(stage, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+class stage_timer:
+    """Context manager form of timed_stage for a block inside a function."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.started
+        if STAGE_TIMERS_ENABLED:
+            METRICS.observe_stage(self.stage, self.seconds)
+        return False
+
+
+# ------------------------------------------------------------------------------
+# Opt-in sampling profiler for slow requests
+# ------------------------------------------------------------------------------
+
+class SamplingProfiler:
+    """
+    While any request is in flight, a background thread samples every
+    thread's Python stack each `interval` seconds. A request slower than
+    `slow_ms` gets the stacks sampled during its lifetime written to
+    `out_dir` as collapsed stacks (`frame;frame;frame count`, readable by
+    flamegraph.pl / speedscope). Samples of concurrent requests overlap, so
+    a profile may include work done for other requests at the same time.
+    The latest dumps are listed by stats() (GET /debug/profiler).
+    """
+
+    def __init__(self, out_dir="profiles", slow_ms: float = 500.0, interval: float = 0.005, enabled: bool = False):
+        self.out_dir = Path(out_dir)
+        self.slow_ms = slow_ms
+        self.interval = interval
+        self.enabled = enabled
+        self.dumped = 0
+        self.recent: deque = deque(maxlen=RECENT_PROFILES)
+        # token -> stacks of one in-flight request (by token: concurrent requests
+        # often sample identical stacks, so their Counters compare equal)
+        self._sessions: Dict[int, Counter] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "SamplingProfiler":
+        """Enabled when PITGENIUS_PROFILE_SLOW_MS is set (dumps to PITGENIUS_PROFILE_DIR)."""
+        slow = os.environ.get("PITGENIUS_PROFILE_SLOW_MS")
+        return cls(
+            out_dir=os.environ.get("PITGENIUS_PROFILE_DIR", "profiles"),
+            slow_ms=float(slow) if slow else 500.0,
+            enabled=bool(slow),
+        )
+
+    def configure(self, enabled: bool, slow_ms: Optional[float] = None, interval: Optional[float] = None):
+        self.enabled = enabled
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if interval is not None:
+            self.interval = interval
+
+    def begin(self) -> int:
+        """Start sampling for a request; returns the token to pass to end()."""
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._sessions[token] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample, name="pitgenius-profiler", daemon=True)
+                self._thread.start()
+        return token
+
+    def end(self, token: int, seconds: float) -> Optional[Counter]:
+        """Stop sampling for a request; returns its stacks if it was slow enough to dump."""
+        with self._lock:
+            session = self._sessions.pop(token, None)
+        if session is None or seconds * 1000 < self.slow_ms or not session:
+            return None
+        return session
+
+    def dump(self, session: Counter, label: str, seconds: float) -> Path:
+        """Write a slow request's stacks as a collapsed-stack file (blocking I/O: call off the event loop)."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+        path = self.out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{int(seconds * 1000)}ms.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in session.most_common():
+                f.write(f"{stack} {count}\n")
+        self.dumped += 1
+        self.recent.append({"request": label, "ms": round(seconds * 1000, 1), "profile": str(path)})
+        return path
+
+    def _sample(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+            stacks = []
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(stack)))
+            # under the lock, so a session popped by end() is never written to again
+            with self._lock:
+                for session in self._sessions.values():
+                    session.update(stacks)
+            time.sleep(self.interval)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval * 1000,
+            "out_dir": str(self.out_dir),
+            "active_requests": len(self._sessions),
+            "profiles_written": self.dumped,
+            "recent_profiles": list(self.recent),
+        }
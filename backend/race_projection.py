@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.result_cache import cached_result
+
+
+class FieldProjection:
+    """
+    Projected finish time for every car in the field at a given lap.
+
+    Each car is projected from its own laps before `current_lap`: time
+    already raced, base lap time and degradation rate as the strategy engine
+    models them, and its best remaining stop plan. The result is what
+    `StrategyEngine._estimate_position` ranks a candidate strategy against,
+    as the competitors' `estimated_time`.
+
+    Memoized in the processor's result cache, so it is rebuilt only when
+    the data version changes (e.g. after live laps arrive).
+    """
+
+    def __init__(self, processor, engine):
+        self.processor = processor
+        self.engine = engine
+
+    @property
+    def result_cache(self):
+        return getattr(self.processor, "result_cache", None)
+
+    @property
+    def data_version(self) -> int:
+        return self.processor.data_version
+
+    @cached_result
+    def project_field(self, current_lap: int, total_laps: int) -> pd.DataFrame:
+        """
+        Frame indexed by vehicle_id with laps_done, elapsed, base_lap_time,
+        degradation_rate, projected_stops and estimated_time (NaN when the
+        car has no usable history).
+        """
+        deg_table = self.processor.get_all_tire_degradation()
+        vehicle_ids = list(deg_table.index)
+
+        laps_done = np.zeros(len(vehicle_ids), dtype=np.int64)
+        elapsed = np.zeros(len(vehicle_ids))
+        base = np.full(len(vehicle_ids), np.nan)
+        for i, vid in enumerate(vehicle_ids):
+            laps = self.processor.get_driver_lap_times(vid)
+            if len(laps) == 0:
+                continue
+            times = laps["lap_time_seconds"].to_numpy(dtype=np.float64)
+            times = times[laps["lap"].to_numpy() < current_lap]
+            laps_done[i] = len(times)
+            elapsed[i] = np.nansum(times)
+            history = times[~np.isnan(times)]
+            if len(history):
+                base[i] = self.engine.base_lap_time(history)
+
+        rates = deg_table["degradation_rate"].to_numpy(dtype=np.float64)
+        estimated, stops = self.engine.project_finish_times(
+            current_laps=np.minimum(laps_done + 1, total_laps),
+            total_laps=total_laps,
+            elapsed=elapsed,
+            base_lap_times=base,
+            degradation_rates=rates,
+        )
+
+        return pd.DataFrame(
+            {
+                "laps_done": laps_done,
+                "elapsed": elapsed,
+                "base_lap_time": base,
+                "degradation_rate": rates,
+                "projected_stops": stops,
+                "estimated_time": estimated,
+            },
+            index=pd.Index(vehicle_ids, name="vehicle_id"),
+        )
+
+    def elapsed_time(self, vehicle_id: str, current_lap: int, total_laps: int) -> float:
+        """Seconds `vehicle_id` has raced before current_lap (0 if unknown)."""
+        table = self.project_field(current_lap, total_laps)
+        return float(table["elapsed"].get(vehicle_id, 0.0))
+
+    def competitors(
+        self,
+        current_lap: int,
+        total_laps: int,
+        exclude_vehicle: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        get_all_drivers entries with vehicle_id and estimated_time filled in
+        (None when the car can't be projected). `exclude_vehicle` drops the
+        car whose strategy is being evaluated, so it isn't ranked against itself.
+        """
+        table = self.project_field(current_lap, total_laps)
+        estimates = table["estimated_time"]
+
+        competitors = []
+        for driver in self.processor.get_all_drivers():
+            vid = self.processor.resolve_vehicle(driver["number"])
+            if vid is not None and vid == exclude_vehicle:
+                continue
+            est = estimates.get(vid) if vid is not None else None
+            competitors.append({
+                **driver,
+                "vehicle_id": vid,
+                "estimated_time": None if est is None or est != est else round(float(est), 3),
+            })
+        return competitors
@@ -0,0 +1,341 @@
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.data_cache import CACHE_DIR_NAME
+from backend.data_processor import RaceDataProcessor
+
+
+# Bump when the manifest layout changes
+REGISTRY_VERSION = 1
+REGISTRY_MANIFEST = "races.json"
+# Directories never searched for race folders
+SKIP_DIRS = {
+    "node_modules", "__pycache__", "venv", ".venv", "env", "site-packages",
+    "dist", "build", "frontend", CACHE_DIR_NAME,
+}
+# "Race1", "Race 1", "race_2", ... (compared with spaces/underscores removed)
+RACE_DIR_PATTERN = re.compile(r"^race\d+$")
+DEFAULT_MEMORY_BUDGET_MB = 4096
+
+
+def race_key(track: str, race: str) -> str:
+    """URL-safe key for a track/race folder pair, e.g. ("COTA", "Race 1") -> "cota-race1"."""
+    def slug(s):
+        return re.sub(r"[^a-z0-9]+", "", s.lower())
+    return f"{slug(track)}-{slug(race)}"
+
+
+def is_race_dir(name: str) -> bool:
+    return bool(RACE_DIR_PATTERN.match(re.sub(r"[\s_]", "", name.lower())))
+
+
+@dataclass
+class RaceEntry:
+    key: str
+    track: str
+    race: str
+    folder: str
+    processor: Optional[RaceDataProcessor] = None
+    loading: Optional[RaceDataProcessor] = None  # set while load_all_data runs
+    nbytes: int = 0
+    last_used: float = 0.0
+    load_seconds: float = 0.0
+    # evicted processor, alive while in-flight requests still hold it
+    released: Optional["weakref.ReferenceType[RaceDataProcessor]"] = None
+    released_bytes: int = 0
+
+    def released_processor(self) -> Optional[RaceDataProcessor]:
+        processor = self.released() if self.released is not None else None
+        if processor is None:
+            self.released, self.released_bytes = None, 0
+        return processor
+
+    def describe(self) -> Dict:
+        return {
+            "key": self.key,
+            "track": self.track,
+            "race": self.race,
+            "folder": self.folder,
+            "loaded": self.processor is not None,
+            "load_progress": self.loading.load_progress.describe() if self.loading is not None else None,
+            "bytes": self.nbytes,
+            "load_seconds": self.load_seconds,
+        }
+
+
+class RaceRegistry:
+    """
+    Every track/race folder under a data root, loaded on first use.
+
+    The folder walk happens once and is saved to a small manifest
+    (`<root>/.pitgenius_cache/races.json`); later starts reuse it while the
+    directories it was built from are unchanged. Loaded races are kept in
+    LRU order and the least recently used ones are dropped once their frames
+    exceed `memory_budget` bytes. Pinned races (the default race, which the
+    live ingester and worker processes use) are never evicted.
+
+    An evicted processor stays in memory until its last in-flight request
+    releases it. Until then its bytes still count toward the budget, and a
+    request for that race picks the same processor back up instead of
+    loading a second copy.
+    """
+
+    def __init__(
+        self,
+        root,
+        memory_budget: Optional[int] = DEFAULT_MEMORY_BUDGET_MB * 1024 * 1024,
+        manifest_path=None,
+        factory: Optional[Callable[[str, str], RaceDataProcessor]] = None
+    ):
+        self.root = Path(root).resolve()
+        self.memory_budget = memory_budget
+        self.manifest_path = Path(manifest_path) if manifest_path else self.root / CACHE_DIR_NAME / REGISTRY_MANIFEST
+        self.factory = factory or self._default_factory
+        self._entries: Dict[str, RaceEntry] = {}
+        self._loaded: "OrderedDict[str, RaceEntry]" = OrderedDict()
+        self._pinned: set = set()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.evictions = 0
+        self.index_source = None
+
+    @classmethod
+    def from_env(cls, default_root) -> "RaceRegistry":
+        """PITGENIUS_DATA_ROOT / PITGENIUS_RACE_MEMORY_MB (0 = no limit) override the defaults."""
+        root = os.environ.get("PITGENIUS_DATA_ROOT") or default_root
+        budget_mb = float(os.environ.get("PITGENIUS_RACE_MEMORY_MB", DEFAULT_MEMORY_BUDGET_MB))
+        registry = cls(root, memory_budget=int(budget_mb * 1024 * 1024) if budget_mb > 0 else None)
+        registry.index()
+        return registry
+
+    @staticmethod
+    def _default_factory(key: str, folder: str) -> RaceDataProcessor:
+        # PITGENIUS_WIDE_TELEMETRY=1 adds the memory-mapped per-channel store,
+        # PITGENIUS_STREAM_TELEMETRY=1 leaves telemetry on disk (chunked reads)
+        return RaceDataProcessor(
+            folder,
+            wide_telemetry=os.environ.get("PITGENIUS_WIDE_TELEMETRY", "0") == "1",
+            stream_telemetry=os.environ.get("PITGENIUS_STREAM_TELEMETRY", "0") == "1"
+        )
+
+    # ------------------------------
+    # INDEX
+    # ------------------------------
+    def _scan(self) -> List[Dict]:
+        """Walk the root once, pruning SKIP_DIRS and hidden folders; race folders aren't descended into."""
+        races = []
+        for dirpath, dirnames, _ in os.walk(self.root):
+            keep = []
+            for name in sorted(dirnames):
+                if name in SKIP_DIRS or name.startswith("."):
+                    continue
+                if is_race_dir(name):
+                    races.append({"track": Path(dirpath).name, "race": name, "folder": os.path.join(dirpath, name)})
+                else:
+                    keep.append(name)
+            dirnames[:] = keep
+        return races
+
+    def _watched_dirs(self, races: List[Dict]) -> Dict[str, int]:
+        """mtimes of the root and every folder between it and a race folder (new races change one of them)."""
+        dirs = {str(self.root)}
+        for r in races:
+            parent = Path(r["folder"]).parent
+            while parent != self.root and self.root in parent.parents:
+                dirs.add(str(parent))
+                parent = parent.parent
+        return {d: os.stat(d).st_mtime_ns for d in sorted(dirs)}
+
+    def _read_manifest(self) -> Optional[List[Dict]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != REGISTRY_VERSION or manifest.get("root") != str(self.root):
+            return None
+        for d, mtime in manifest.get("dirs", {}).items():
+            try:
+                if os.stat(d).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        return manifest.get("races")
+
+    def _write_manifest(self, races: List[Dict]):
+        try:
+            # created before the mtimes are read: a new folder under root changes its mtime
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            manifest = {
+                "version": REGISTRY_VERSION,
+                "root": str(self.root),
+                "dirs": self._watched_dirs(races),
+                "races": races,
+            }
+            tmp = self.manifest_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, self.manifest_path)
+        except OSError as e:
+            print(f"⚠️ Could not write race manifest: {e}")
+
+    def index(self, rescan: bool = False) -> List[str]:
+        """Index race folders (from the manifest unless `rescan`); returns the race keys."""
+        races = None if rescan else self._read_manifest()
+        self.index_source = "manifest"
+        if races is None:
+            started = time.perf_counter()
+            races = self._scan()
+            self._write_manifest(races)
+            self.index_source = "scan"
+            print(f"🗂️ Indexed {len(races)} race folder(s) under {self.root} in {time.perf_counter() - started:.2f}s")
+
+        with self._lock:
+            entries = {}
+            for r in races:
+                key = race_key(r["track"], r["race"])
+                if key in entries:
+                    print(f"⚠️ Duplicate race key {key}: keeping {entries[key].folder}")
+                    continue
+                # keep already-loaded races across a rescan
+                old = self._entries.get(key)
+                entries[key] = old if old is not None and old.folder == r["folder"] else RaceEntry(key, r["track"], r["race"], r["folder"])
+            self._entries = entries
+            for key in [k for k in self._loaded if k not in entries]:
+                del self._loaded[key]
+        return list(self._entries)
+
+    # ------------------------------
+    # LOOKUP / LOAD
+    # ------------------------------
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def default_key(self) -> Optional[str]:
+        """First "Race1" folder (the single race the service used to serve), else the first race."""
+        keys = self.keys()
+        for key in keys:
+            if key.endswith("-race1"):
+                return key
+        return keys[0] if keys else None
+
+    def entry(self, key: str) -> RaceEntry:
+        entry = self._entries.get(key)
+        if entry is None:
+            raise KeyError(f"Unknown race: {key}")
+        return entry
+
+    def get(
+        self,
+        key: str,
+        pin: bool = False,
+        on_created: Optional[Callable[[RaceDataProcessor], None]] = None
+    ) -> RaceDataProcessor:
+        """
+        Processor for a race, loading it on first use. Raises KeyError for
+        unknown keys. `on_created` gets a processor this call loads before
+        its load starts (to watch its load_progress from other threads).
+        """
+        entry = self.entry(key)
+        with self._lock:
+            if pin:
+                self._pinned.add(key)
+            if entry.processor is None and entry.released_processor() is not None:
+                self._restore(entry)
+            if entry.processor is not None:
+                entry.last_used = time.time()
+                self._loaded.move_to_end(key)
+                return entry.processor
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # one loader per race; other requests for it wait instead of loading it again
+        with load_lock:
+            if entry.processor is None:
+                print(f"📂 Loading race {key} from {entry.folder}")
+                started = time.perf_counter()
+                processor = self.factory(key, entry.folder)
+                entry.loading = processor
+                try:
+                    if on_created is not None:
+                        on_created(processor)
+                    processor.load_all_data()
+                finally:
+                    entry.loading = None
+                entry.load_seconds = round(time.perf_counter() - started, 3)
+                entry.nbytes = processor.get_memory_report()["total"]["bytes_compact"]
+                with self._lock:
+                    entry.processor = processor
+                    self._loaded[key] = entry
+            with self._lock:
+                processor = entry.processor
+                entry.last_used = time.time()
+                self._loaded.move_to_end(key)
+                self._evict(keep=key)
+            return processor
+
+    def _restore(self, entry: RaceEntry):
+        """Put an evicted processor that is still in use back in the LRU (caller holds _lock)."""
+        print(f"♻️ Race {entry.key} still in use since its eviction, reusing it")
+        entry.processor = entry.released_processor()
+        entry.nbytes = entry.released_bytes
+        entry.released, entry.released_bytes = None, 0
+        self._loaded[entry.key] = entry
+        self._evict(keep=entry.key)
+
+    def _release(self, key: str) -> RaceEntry:
+        """Unload a race; its processor is tracked weakly until nothing uses it (caller holds _lock)."""
+        entry = self._loaded.pop(key)
+        entry.released = weakref.ref(entry.processor)
+        entry.released_bytes = entry.nbytes
+        entry.processor = None
+        entry.nbytes = 0
+        self.evictions += 1
+        return entry
+
+    def _released_bytes(self) -> int:
+        """Bytes of evicted processors that in-flight requests still hold."""
+        return sum(e.released_bytes for e in self._entries.values() if e.released_processor() is not None)
+
+    def _evict(self, keep: str):
+        """Drop least recently used, unpinned races until loaded (and still held) frames fit the budget."""
+        if self.memory_budget is None:
+            return
+        total = sum(e.nbytes for e in self._loaded.values()) + self._released_bytes()
+        for key in list(self._loaded):
+            if total <= self.memory_budget:
+                break
+            if key == keep or key in self._pinned:
+                continue
+            entry = self._release(key)
+            # counted as freed: its holders are requests, which finish
+            total -= entry.released_bytes
+            print(f"♻️ Evicting race {key} ({entry.released_bytes / 1e6:.1f} MB)")
+
+    def evict(self, key: str) -> bool:
+        """Unload a race now (pinned races stay); True if it was loaded."""
+        entry = self.entry(key)
+        with self._lock:
+            if key in self._pinned or key not in self._loaded:
+                return False
+            self._release(entry.key)
+            return True
+
+    def stats(self) -> Dict:
+        return {
+            "root": str(self.root),
+            "index_source": self.index_source,
+            "races": [dict(self._entries[k].describe(), pinned=k in self._pinned) for k in self._entries],
+            "loaded": list(self._loaded),
+            "loaded_bytes": sum(e.nbytes for e in self._loaded.values()),
+            "released_bytes": self._released_bytes(),
+            "memory_budget": self.memory_budget,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,210 @@
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+from backend.strategy_engine import StrategyEngine
+
+
+# Points for P1..P10, everything below scores nothing
+POINTS_TABLE = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+
+@dataclass
+class SimCar:
+    """One car in the simulated field, from the current lap to the flag"""
+    name: str
+    base_lap_time: float
+    degradation_rate: float
+    pit_laps: List[int] = field(default_factory=list)
+    gap: float = 0.0  # seconds behind the leader at the current lap
+
+
+@dataclass
+class SimConfig:
+    lap_noise_sd: float = 0.6  # seconds of random lap-to-lap variation
+    degradation_sd: float = 0.25  # relative uncertainty of each car's degradation rate
+    pit_loss_sd: float = 3.0  # seconds of pit-stop variation
+    safety_car_prob: float = 0.02  # chance a safety car starts on any given lap
+    safety_car_laps: int = 3
+    safety_car_slowdown: float = 1.35  # lap time multiplier behind the safety car
+    safety_car_pit_factor: float = 0.5  # pit loss multiplier under the safety car
+    safety_car_gap_factor: float = 0.3  # gaps to the leader shrink to this fraction
+
+
+@dataclass
+class StrategyOutcome:
+    pit_laps: List[int]
+    win_probability: float
+    mean_position: float
+    position_distribution: List[float]
+    expected_points: float
+    points_p10: float
+    points_p90: float
+    best_strategy_probability: float
+    race_time_p50: float
+    race_time_p90: float
+
+
+class RaceSimulator:
+    """
+    Monte Carlo race simulation for comparing candidate pit strategies.
+
+    Every batch samples lap noise, per-car degradation rates, pit losses and
+    safety-car periods for the whole field at once; the only Python loop is
+    over laps, each step an array operation over (strategy, race, car).
+    All candidates share the same random draws (common random numbers), so
+    differences between them come from the strategy, not the sampling.
+    Lap-time model, pit loss and fresh-tire behaviour come from StrategyEngine.
+    """
+
+    def __init__(self, engine: Optional[StrategyEngine] = None, config: Optional[SimConfig] = None):
+        self.engine = engine or StrategyEngine()
+        self.config = config or SimConfig()
+
+    def _stint_profile(self, current_lap: int, total_laps: int, pit_laps: List[int]):
+        """
+        Per remaining lap: deterministic offset from the base lap time, the
+        coefficient multiplying the degradation rate, and whether the car pits.
+        """
+        laps = np.arange(current_lap, total_laps)
+        pits = sorted(p for p in pit_laps if current_lap < p < total_laps)
+
+        stint = np.searchsorted(np.array(pits, dtype=np.int64), laps, side="right")
+        last_stop = np.where(stint > 0, np.array([current_lap] + pits)[stint], 0)
+        fresh = stint > 0
+        age = np.where(fresh, laps - last_stop, laps - 1)
+
+        offset = np.where(fresh, -self.engine.fresh_tire_advantage, 0.0)
+        deg_coef = np.where(fresh, self.engine.fresh_tire_deg_factor, 1.0) * age
+        pitting = np.isin(laps + 1, pits)  # pit loss is paid at the end of the in-lap
+        return offset, deg_coef, pitting
+
+    def simulate(
+        self,
+        target: SimCar,
+        strategies: List[List[int]],
+        field_cars: List[SimCar],
+        current_lap: int,
+        total_laps: int,
+        n_sims: int = 10000,
+        seed: int = 42,
+        time_budget_s: Optional[float] = None,
+        batch_size: int = 2000
+    ) -> Dict:
+        """
+        Race every candidate pit schedule for `target` against `field_cars`.
+
+        Runs up to n_sims races in batches, stopping early once time_budget_s
+        is spent (at least one batch always runs). With a fixed seed the first
+        k batches are identical between runs, so results are reproducible.
+        """
+        cfg = self.config
+        rng = np.random.default_rng(seed)
+        started = time.perf_counter()
+
+        n_laps = total_laps - current_lap
+        if n_laps <= 0 or not strategies:
+            return {"sims": 0, "truncated": False, "strategies": []}
+
+        cars = [target] + list(field_cars)
+        n_cars = len(cars)
+        n_strat = len(strategies)
+
+        # Deterministic lap components: candidates for car 0, own plan for the field
+        offsets = np.zeros((n_strat, n_cars, n_laps))
+        coefs = np.zeros((n_strat, n_cars, n_laps))
+        pitting = np.zeros((n_strat, n_cars, n_laps), dtype=bool)
+        for c, car in enumerate(cars[1:], start=1):
+            offsets[:, c], coefs[:, c], pitting[:, c] = self._stint_profile(current_lap, total_laps, car.pit_laps)
+        for s, plan in enumerate(strategies):
+            offsets[s, 0], coefs[s, 0], pitting[s, 0] = self._stint_profile(current_lap, total_laps, plan)
+
+        base = np.array([c.base_lap_time for c in cars])
+        rates = np.array([c.degradation_rate for c in cars], dtype=np.float32)
+        gaps = np.array([c.gap for c in cars])
+
+        # float32 keeps the per-lap arrays small; ~1 ms resolution on a race time
+        det = (base[None, :, None] + offsets).astype(np.float32)
+        coefs = coefs.astype(np.float32)
+        # (strategy, car) pairs pitting at the end of each lap
+        pit_events = [list(zip(*np.nonzero(pitting[:, :, lap]))) for lap in range(n_laps)]
+
+        positions, race_times, best = [], [], []
+        sims_done = 0
+
+        while sims_done < n_sims:
+            b = min(batch_size, n_sims - sims_done)
+
+            # (race, car) degradation draws shared by all strategies
+            rate = rates * (1 + cfg.degradation_sd * rng.standard_normal((b, n_cars), dtype=np.float32))
+            cum = np.broadcast_to(gaps.astype(np.float32), (n_strat, b, n_cars)).copy()
+            sc_left = np.zeros(b, dtype=np.int64)
+
+            for lap in range(n_laps):
+                sc_start = (sc_left == 0) & (rng.random(b) < cfg.safety_car_prob)
+                if sc_start.any():
+                    # field bunches up behind the safety car
+                    leader = cum[:, sc_start].min(axis=-1, keepdims=True)
+                    cum[:, sc_start] = leader + (cum[:, sc_start] - leader) * cfg.safety_car_gap_factor
+                sc_left[sc_start] = cfg.safety_car_laps
+                under_sc = sc_left > 0
+
+                lap_time = rate * coefs[:, None, :, lap]
+                lap_time += det[:, None, :, lap]
+                lap_time += cfg.lap_noise_sd * rng.standard_normal((b, n_cars), dtype=np.float32)
+                if under_sc.any():
+                    lap_time[:, under_sc] *= cfg.safety_car_slowdown
+                cum += lap_time
+
+                if pit_events[lap]:
+                    sc_factor = np.where(under_sc, cfg.safety_car_pit_factor, 1.0)
+                    losses = {}
+                    for s, c in pit_events[lap]:
+                        if c not in losses:  # one draw per car, shared across strategies
+                            loss = self.engine.pit_stop_time + cfg.pit_loss_sd * rng.standard_normal(b)
+                            losses[c] = np.maximum(loss, 0) * sc_factor
+                        cum[s, :, c] += losses[c]
+
+                sc_left = np.maximum(sc_left - 1, 0)
+
+            target_time = cum[:, :, 0]
+            positions.append(1 + (cum[:, :, 1:] < target_time[:, :, None]).sum(axis=-1))
+            race_times.append(target_time - gaps[0])
+            best.append(target_time == target_time.min(axis=0, keepdims=True))
+            sims_done += b
+
+            if time_budget_s is not None and time.perf_counter() - started >= time_budget_s:
+                break
+
+        positions = np.concatenate(positions, axis=1)
+        race_times = np.concatenate(race_times, axis=1)
+        best = np.concatenate(best, axis=1)
+
+        points_table = np.zeros(n_cars + 1)
+        table = POINTS_TABLE[:n_cars]
+        points_table[1:len(table) + 1] = table
+        points = points_table[positions]
+
+        outcomes = []
+        for s, plan in enumerate(strategies):
+            counts = np.bincount(positions[s], minlength=n_cars + 1)[1:]
+            outcomes.append(StrategyOutcome(
+                pit_laps=sorted(int(p) for p in plan),
+                win_probability=float(np.mean(positions[s] == 1)),
+                mean_position=float(positions[s].mean()),
+                position_distribution=(counts / sims_done).round(4).tolist(),
+                expected_points=float(points[s].mean()),
+                points_p10=float(np.percentile(points[s], 10)),
+                points_p90=float(np.percentile(points[s], 90)),
+                best_strategy_probability=float(best[s].mean()),
+                race_time_p50=float(np.percentile(race_times[s], 50)),
+                race_time_p90=float(np.percentile(race_times[s], 90)),
+            ))
+
+        return {
+            "sims": sims_done,
+            "truncated": sims_done < n_sims,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "strategies": outcomes,
+        }
@@ -0,0 +1,186 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.metrics import stage_timer
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# ------------------------------------------------------------------------------
+# Column-oriented table payloads for large lap / sector responses.
+# Non-finite floats become null with one array mask per column (no per-row
+# dicts), the result is encoded once by a fast encoder and returned as bytes,
+# so FastAPI's per-value jsonable_encoder walk is skipped. The wire format is
+# picked from the Accept header: JSON (default), MessagePack or Arrow IPC.
+# orjson and msgpack are in requirements.txt; without them JSON falls back to
+# the stdlib encoder and MessagePack requests get a 406.
+# ------------------------------------------------------------------------------
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+ENCODINGS = ("json", "msgpack", "arrow")
+
+
+class NotAcceptable(Exception):
+    """Requested encoding isn't available (missing package, or not offered by the endpoint)."""
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Encoding for an Accept header: "arrow", "msgpack" or "json" (the default, also for */*)."""
+    for part in (accept or "").split(","):
+        media = part.split(";", 1)[0].strip().lower()
+        if media == ARROW_TYPE:
+            return "arrow"
+        if media in MSGPACK_TYPES:
+            return "msgpack"
+        if media in (JSON_TYPE, "*/*", "application/*"):
+            return "json"
+    return "json"
+
+
+def column_values(values, decimals: Optional[int] = None) -> list:
+    """Python list of a column with NaN/inf (and missing values) as None."""
+    if isinstance(values, pd.Series):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+            text = values.dt.strftime("%Y-%m-%dT%H:%M:%S.%f").to_numpy(dtype=object)
+            text[values.isna().to_numpy()] = None
+            return text.tolist()
+        values = values.to_numpy()
+
+    if values.dtype.kind == "f":
+        if decimals is not None:
+            values = values.round(decimals)
+        bad = ~np.isfinite(values)
+        if not bad.any():
+            return values.tolist()
+        out = values.astype(object)
+        out[bad] = None
+        return out.tolist()
+    if values.dtype.kind in "iub":
+        return values.tolist()
+
+    out = values.astype(object)
+    bad = pd.isna(out) | (out == np.inf) | (out == -np.inf)
+    if bad.any():
+        out = out.copy()
+        out[bad] = None
+    return out.tolist()
+
+
+def select_fields(df: pd.DataFrame, fields: Optional[List[str]]) -> List[str]:
+    """Requested columns in request order (all columns when None); ValueError for unknown ones."""
+    if not fields:
+        return [str(c) for c in df.columns]
+    unknown = [f for f in fields if f not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(map(str, df.columns))}")
+    return list(dict.fromkeys(fields))
+
+
+def table_columns(df: pd.DataFrame, fields: Optional[List[str]] = None, decimals: Optional[int] = None) -> Dict[str, list]:
+    """{column: values} for the selected fields, sanitized column by column."""
+    return {name: column_values(df[name], decimals) for name in select_fields(df, fields)}
+
+
+def columns_to_records(columns: Dict[str, list]) -> List[Dict]:
+    """Row dicts from sanitized columns (for the records layout older clients read)."""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def paginate(
+    df: pd.DataFrame,
+    lap_column: Optional[str],
+    lap_start: Optional[int] = None,
+    lap_end: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Rows with lap_start <= lap <= lap_end, then `limit` rows from `offset`.
+    Lap tables are sorted by lap, so the range is two searchsorted calls;
+    unsorted (live) tables fall back to a mask. Returns (rows, page info).
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must be >= 0")
+
+    if lap_column is not None and lap_column in df.columns and (lap_start is not None or lap_end is not None):
+        laps = df[lap_column]
+        if laps.is_monotonic_increasing:
+            values = laps.to_numpy()
+            lo = np.searchsorted(values, lap_start, "left") if lap_start is not None else 0
+            hi = np.searchsorted(values, lap_end, "right") if lap_end is not None else len(values)
+            df = df.iloc[lo:hi]
+        else:
+            keep = np.ones(len(df), dtype=bool)
+            if lap_start is not None:
+                keep &= (laps >= lap_start).to_numpy()
+            if lap_end is not None:
+                keep &= (laps <= lap_end).to_numpy()
+            df = df[keep]
+
+    total = len(df)
+    stop = total if limit is None else min(total, offset + limit)
+    page = {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": stop if stop < total else None,
+    }
+    return df.iloc[offset:stop], page
+
+
+def encode_payload(payload, encoding: str) -> Tuple[bytes, str]:
+    """(body, media type) of a JSON-compatible payload as JSON or MessagePack."""
+    with stage_timer(f"api.encode[{encoding}]"):
+        if encoding == "msgpack":
+            if not HAS_MSGPACK:
+                raise NotAcceptable("MessagePack responses need the msgpack package")
+            return msgpack.packb(payload, use_bin_type=True), MSGPACK_TYPES[0]
+        if encoding != "json":
+            raise NotAcceptable(f"{encoding} is not available for this endpoint")
+        if HAS_ORJSON:
+            return orjson.dumps(payload), JSON_TYPE
+        return json.dumps(payload, separators=(",", ":"), allow_nan=False).encode("utf-8"), JSON_TYPE
+
+
+def encode_arrow(df: pd.DataFrame, fields: Optional[List[str]] = None) -> Tuple[bytes, str]:
+    """Selected columns as one Arrow IPC stream (record batch); nulls where values aren't finite."""
+    if not HAS_PYARROW:
+        raise NotAcceptable("Arrow responses need the pyarrow package")
+    with stage_timer("api.encode[arrow]"):
+        arrays = {}
+        for name in select_fields(df, fields):
+            col = df[name]
+            if col.dtype.kind == "f":
+                values = col.to_numpy()
+                arrays[name] = pa.array(values, mask=~np.isfinite(values))
+            else:
+                arrays[name] = pa.array(col, from_pandas=True)
+        table = pa.table(arrays)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_TYPE
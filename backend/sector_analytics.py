@@ -0,0 +1,121 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ------------------------------------------------------------------------------
+# Sector analytics, computed once for the whole field when the sector file
+# loads. Per lap: delta to the driver's own best per sector, its rolling mean
+# and the field rank on that lap. Per driver: best sectors, theoretical best
+# lap (sum of best sectors), best complete lap and field rank per sector.
+# ------------------------------------------------------------------------------
+
+SECTOR_COLUMNS = ("S1_SECONDS", "S2_SECONDS", "S3_SECONDS")
+# laps in the rolling mean of each sector delta
+SECTOR_ROLLING_LAPS = 3
+
+
+@dataclass
+class SectorTables:
+    laps: pd.DataFrame  # sorted by (NUMBER, LAP_NUMBER), numeric splits + derived columns
+    summary: pd.DataFrame  # one row per car number, ordered by theoretical best
+    offsets: Dict[int, Tuple[int, int]] = field(default_factory=dict)  # NUMBER -> row slice of `laps`
+
+
+def _sector_name(column: str) -> str:
+    return column.split("_", 1)[0]  # "S1_SECONDS" -> "S1"
+
+
+def normalize_sectors(df: pd.DataFrame) -> pd.DataFrame:
+    """Stripped column names, numeric splits (bad values -> NaN), rows sorted by car and lap."""
+    df = df.rename(columns=lambda c: str(c).strip())
+    if "NUMBER" not in df.columns:
+        raise ValueError("Sector file has no NUMBER column")
+    df = df.copy()
+    for col in SECTOR_COLUMNS + ("LAP_NUMBER", "NUMBER"):
+        if col in df.columns and df[col].dtype.kind not in "iuf":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df[df["NUMBER"].notna()]
+    order = ["NUMBER", "LAP_NUMBER"] if "LAP_NUMBER" in df.columns else ["NUMBER"]
+    df = df.sort_values(order, kind="stable").reset_index(drop=True)
+    if df["NUMBER"].dtype.kind == "f":
+        df["NUMBER"] = df["NUMBER"].astype(np.int64)
+    return df
+
+
+def _rolling_group_mean(values: np.ndarray, group_start: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last `window` finite values of each row's group (NaN when there are none)."""
+    finite = np.isfinite(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(finite, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(finite)))
+    idx = np.arange(len(values))
+    lo = np.maximum(idx - window + 1, group_start)
+    total = csum[idx + 1] - csum[lo]
+    count = ccount[idx + 1] - ccount[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def build_sector_tables(df: pd.DataFrame, rolling_laps: int = SECTOR_ROLLING_LAPS) -> SectorTables:
+    """
+    Every derived column for all cars in one grouped pass over the
+    (NUMBER, LAP_NUMBER)-sorted frame: per-group minima with
+    np.fmin.reduceat, rolling means from cumulative sums, per-lap ranks
+    with one groupby over LAP_NUMBER.
+    """
+    laps = normalize_sectors(df)
+    sectors = [c for c in SECTOR_COLUMNS if c in laps.columns]
+    numbers = laps["NUMBER"].to_numpy()
+    n = len(laps)
+
+    if n:
+        starts = np.concatenate(([0], np.flatnonzero(numbers[1:] != numbers[:-1]) + 1))
+    else:
+        starts = np.empty(0, dtype=np.int64)
+    stops = np.append(starts[1:], n)
+    group = np.repeat(np.arange(len(starts)), stops - starts)
+    group_start = starts[group]
+
+    summary = pd.DataFrame(index=pd.Index(numbers[starts], name="NUMBER"))
+    summary["LAPS"] = stops - starts
+    lap_total = np.zeros(n)
+
+    for col in sectors:
+        name = _sector_name(col)
+        values = laps[col].to_numpy(dtype=np.float64)
+        lap_total += values  # NaN for laps with a missing split
+        best = np.fmin.reduceat(values, starts) if n else np.empty(0)
+        delta = values - best[group]
+        laps[f"{name}_DELTA"] = delta
+        laps[f"{name}_ROLLING_DELTA"] = _rolling_group_mean(delta, group_start, rolling_laps)
+        if "LAP_NUMBER" in laps.columns:
+            laps[f"{name}_LAP_RANK"] = laps.groupby("LAP_NUMBER")[col].rank(method="min")
+        summary[f"{name}_BEST"] = best
+
+    best_cols = [f"{_sector_name(c)}_BEST" for c in sectors]
+    if best_cols:
+        summary["THEORETICAL_BEST"] = summary[best_cols].sum(axis=1, min_count=len(best_cols))
+        summary["BEST_LAP"] = np.fmin.reduceat(lap_total, starts) if n else np.empty(0)
+        summary["GAP_TO_THEORETICAL"] = summary["BEST_LAP"] - summary["THEORETICAL_BEST"]
+        # field rank of each car's best (1 = fastest; NaN when the car never set that split)
+        for col in best_cols + ["THEORETICAL_BEST"]:
+            summary[col.replace("_BEST", "_RANK")] = summary[col].rank(method="min")
+        summary = summary.sort_values("THEORETICAL_BEST", kind="stable")
+
+    offsets = {int(numbers[a]): (int(a), int(b)) for a, b in zip(starts, stops)}
+    return SectorTables(laps=laps, summary=summary, offsets=offsets)
+
+
+def sector_summary_row(tables: Optional[SectorTables], number: int) -> Optional[Dict]:
+    """One car's summary as a plain dict, None for splits it never set."""
+    if tables is None or number not in tables.summary.index:
+        return None
+    row = tables.summary.loc[number]
+    values = {k: float(v) for k, v in row.items()}
+    return {
+        "NUMBER": int(number),
+        **{k: (int(v) if k == "LAPS" or k.endswith("_RANK") else v) if math.isfinite(v) else None for k, v in values.items()},
+    }
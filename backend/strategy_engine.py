@@ -1,6 +1,9 @@
 import numpy as np
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from backend.metrics import timed_stage
+
 
 @dataclass
 class PitWindow:
@@ -11,11 +14,32 @@ class PitWindow:
     confidence: float
     reason: str
 
+@dataclass
+class PitSweep:
+    """Race time for every feasible pit lap, plus the best windows on that curve"""
+    pit_laps: np.ndarray
+    race_times: np.ndarray
+    windows: List[PitWindow] = field(default_factory=list)
+
+@dataclass
+class StopSchedule:
+    """A complete pit plan from the current lap to the flag"""
+    pit_laps: List[int]
+    race_time: float
+    stint_lengths: List[int]
+
+    @property
+    def stops(self) -> int:
+        return len(self.pit_laps)
+
 class StrategyEngine:
     def __init__(self):
         self.pit_stop_time = 45.0  # Average pit stop time in seconds
         self.tire_cliff_threshold = 0.5  # Degradation rate threshold
+        self.fresh_tire_advantage = 2.0  # Seconds per lap gained on new tires
+        self.fresh_tire_deg_factor = 0.3  # New tires degrade 70% slower
         
+    @timed_stage()
     def calculate_optimal_pit_window(
         self, 
         current_lap: int,
@@ -23,9 +47,26 @@ class StrategyEngine:
         lap_times: List[float],
         degradation_rate: float,
         competitors: List[Dict],
-        weather: Dict
+        weather: Dict,
+        mode: str = "fixed",
+        top_k: int = 3,
+        elapsed_time: float = 0.0
     ) -> List[PitWindow]:
-        """Calculate optimal pit stop windows"""
+        """
+        Calculate optimal pit stop windows.
+
+        mode="fixed" evaluates the three classic windows (laps 6, 10, 14);
+        mode="sweep" evaluates every feasible pit lap and returns the top_k.
+        elapsed_time (seconds raced before current_lap) puts the remaining
+        race time on the same clock as competitors' projected finish times.
+        """
+        
+        if mode == "sweep":
+            return self.sweep_pit_laps(
+                current_lap, total_laps, lap_times, degradation_rate, competitors, top_k, elapsed_time
+            ).windows
+        if mode != "fixed":
+            raise ValueError(f"Unknown pit window mode: {mode}")
         
         windows = []
         
@@ -38,6 +79,7 @@ class StrategyEngine:
                 lap_times=lap_times,
                 degradation_rate=degradation_rate,
                 competitors=competitors,
+                elapsed_time=elapsed_time,
                 strategy_name="Early Undercut"
             )
             windows.append(early_window)
@@ -51,6 +93,7 @@ class StrategyEngine:
                 lap_times=lap_times,
                 degradation_rate=degradation_rate,
                 competitors=competitors,
+                elapsed_time=elapsed_time,
                 strategy_name="Standard Strategy"
             )
             windows.append(mid_window)
@@ -64,6 +107,7 @@ class StrategyEngine:
                 lap_times=lap_times,
                 degradation_rate=degradation_rate,
                 competitors=competitors,
+                elapsed_time=elapsed_time,
                 strategy_name="Long First Stint"
             )
             windows.append(late_window)
@@ -81,61 +125,286 @@ class StrategyEngine:
         lap_times: List[float],
         degradation_rate: float,
         competitors: List[Dict],
-        strategy_name: str
+        strategy_name: str,
+        elapsed_time: float = 0.0
     ) -> PitWindow:
         """Evaluate a specific pit window"""
         
-        if len(lap_times) == 0:
-            base_lap_time = 150.0
-        else:
-            base_lap_time = np.median(lap_times[-5:]) if len(lap_times) >= 5 else np.median(lap_times)
-        
-        # Calculate time to pit lap
-        laps_to_pit = pit_lap - current_lap
-        time_to_pit = 0
+        base_lap_time = self.base_lap_time(lap_times)
         
-        for i in range(laps_to_pit):
-            lap_deg = degradation_rate * (current_lap + i - 1)
-            time_to_pit += base_lap_time + lap_deg
-        
-        # Add pit stop time
-        total_time_with_pit = time_to_pit + self.pit_stop_time
-        
-        # Calculate remaining laps on fresh tires
-        remaining_laps = total_laps - pit_lap
-        time_after_pit = 0
-        
-        for i in range(remaining_laps):
-            # Fresh tires, less degradation
-            lap_deg = (degradation_rate * 0.3) * i  # 70% less degradation on new tires
-            time_after_pit += base_lap_time - 2.0 + lap_deg  # 2 second advantage on fresh tires
-        
-        total_race_time = total_time_with_pit + time_after_pit
+        total_race_time = float(self._race_times(
+            np.array([pit_lap]), current_lap, total_laps, base_lap_time, degradation_rate
+        )[0])
         
         # Estimate position based on competitors
-        predicted_position = self._estimate_position(total_race_time, competitors)
+        predicted_position = self._estimate_position(elapsed_time + total_race_time, competitors)
         
         # Calculate confidence based on various factors
         confidence = self._calculate_confidence(
             pit_lap, current_lap, total_laps, degradation_rate
         )
         
+        lap_start, lap_end = self._window_bounds(pit_lap, current_lap, total_laps)
         return PitWindow(
-            lap_start=max(pit_lap - 1, current_lap + 1),
-            lap_end=min(pit_lap + 1, total_laps - 3),
+            lap_start=int(lap_start),
+            lap_end=int(lap_end),
             time_loss=self.pit_stop_time,
             predicted_position=predicted_position,
             confidence=confidence,
             reason=strategy_name
         )
     
+    def base_lap_time(self, lap_times: List[float]) -> float:
+        """Median of the last five laps (150s when there is no history)"""
+        if len(lap_times) == 0:
+            return 150.0
+        return float(np.median(lap_times[-5:]) if len(lap_times) >= 5 else np.median(lap_times))
+    
+    @staticmethod
+    def _window_bounds(pit_laps, current_lap: int, total_laps: int):
+        """
+        (lap_start, lap_end) of the window around each pit lap: one lap either
+        side, no earlier than the next lap and normally ending 3 laps before
+        the flag, but always containing the pit lap itself (late sweep laps).
+        """
+        pit_laps = np.asarray(pit_laps)
+        lap_start = np.maximum(pit_laps - 1, current_lap + 1)
+        lap_end = np.maximum(np.minimum(pit_laps + 1, total_laps - 3), pit_laps)
+        return lap_start, lap_end
+    
+    def _race_times(
+        self,
+        pit_laps: np.ndarray,
+        current_lap: int,
+        total_laps: int,
+        base_lap_time: float,
+        degradation_rate: float
+    ) -> np.ndarray:
+        """
+        Remaining race time for each candidate pit lap.
+        
+        Both stints are arithmetic series, so they are summed in closed form:
+        laps to the stop degrade from the current tire age (current_lap - 1),
+        laps after it start on fresh tires (faster, degrading more slowly).
+        """
+        pit_laps = np.asarray(pit_laps, dtype=np.float64)
+        
+        # Stint on current tires: laps current_lap .. pit_lap - 1
+        n1 = np.maximum(pit_laps - current_lap, 0)
+        first_stint = n1 * base_lap_time + degradation_rate * (n1 * (current_lap - 1) + n1 * (n1 - 1) / 2)
+        
+        # Stint on fresh tires: total_laps - pit_lap laps from age 0
+        n2 = np.maximum(total_laps - pit_laps, 0)
+        fresh_rate = degradation_rate * self.fresh_tire_deg_factor
+        second_stint = n2 * (base_lap_time - self.fresh_tire_advantage) + fresh_rate * n2 * (n2 - 1) / 2
+        
+        return first_stint + self.pit_stop_time + second_stint
+    
+    @timed_stage()
+    def sweep_pit_laps(
+        self,
+        current_lap: int,
+        total_laps: int,
+        lap_times: List[float],
+        degradation_rate: float,
+        competitors: List[Dict],
+        top_k: int = 3,
+        elapsed_time: float = 0.0
+    ) -> PitSweep:
+        """
+        Evaluate every feasible pit lap (current_lap + 1 .. total_laps - 1) in
+        one array pass and return the whole time-vs-pit-lap curve with the
+        top_k windows. Picked windows are at least two laps apart so they
+        don't all collapse onto neighbours of the optimum.
+        """
+        pit_laps = np.arange(current_lap + 1, total_laps)
+        if len(pit_laps) == 0:
+            return PitSweep(pit_laps=pit_laps, race_times=np.empty(0))
+        
+        base_lap_time = self.base_lap_time(lap_times)
+        race_times = self._race_times(pit_laps, current_lap, total_laps, base_lap_time, degradation_rate)
+        positions = self._estimate_positions(elapsed_time + race_times, competitors)
+        
+        picked = []
+        for idx in np.argsort(race_times, kind="stable"):
+            if len(picked) >= top_k:
+                break
+            if all(abs(int(pit_laps[idx]) - int(pit_laps[j])) >= 2 for j in picked):
+                picked.append(idx)
+        
+        lap_start, lap_end = self._window_bounds(pit_laps, current_lap, total_laps)
+        windows = []
+        for rank, idx in enumerate(picked, start=1):
+            pit_lap = int(pit_laps[idx])
+            windows.append(PitWindow(
+                lap_start=int(lap_start[idx]),
+                lap_end=int(lap_end[idx]),
+                time_loss=self.pit_stop_time,
+                predicted_position=int(positions[idx]),
+                confidence=self._calculate_confidence(pit_lap, current_lap, total_laps, degradation_rate),
+                reason=f"Sweep #{rank}: pit on lap {pit_lap}"
+            ))
+        
+        return PitSweep(pit_laps=pit_laps, race_times=race_times, windows=windows)
+    
+    # Classic windows of the fixed mode: (pit lap, latest current lap, name)
+    FIXED_WINDOWS = [
+        (6, 5, "Early Undercut"),
+        (10, 9, "Standard Strategy"),
+        (14, 13, "Long First Stint"),
+    ]
+    
+    @timed_stage()
+    def calculate_pit_windows_batch(
+        self,
+        current_lap: int,
+        total_laps: int,
+        lap_histories: List[List[float]],
+        degradation_rates: List[float],
+        competitors: List[Dict],
+        mode: str = "fixed",
+        top_k: int = 3,
+        elapsed_times: Optional[List[float]] = None,
+        own_estimates: Optional[List[Optional[float]]] = None
+    ) -> List[Optional[List[PitWindow]]]:
+        """
+        calculate_optimal_pit_window for a whole field at once.
+        
+        Base lap times and degradation rates become (cars, 1) columns, the
+        candidate pit laps a (1, laps) row, so race times, positions and
+        confidences for every car come out of one broadcast pass against the
+        shared competitor table. Cars whose inputs aren't finite get None
+        instead of windows; the rest of the field is unaffected.
+        
+        When the table holds the batch's own cars, own_estimates (each car's
+        estimated_time in it) keeps a car from being ranked against itself.
+        """
+        if mode not in ("fixed", "sweep"):
+            raise ValueError(f"Unknown pit window mode: {mode}")
+        
+        base = np.array([self.base_lap_time(h) for h in lap_histories], dtype=np.float64)
+        rates = np.asarray(degradation_rates, dtype=np.float64)
+        valid = np.isfinite(base) & np.isfinite(rates)
+        base_col = np.where(valid, base, 0.0)[:, None]
+        rate_col = np.where(valid, rates, 0.0)[:, None]
+        
+        if mode == "sweep":
+            pit_laps = np.arange(current_lap + 1, total_laps)
+            names = None
+        else:
+            fixed = [w for w in self.FIXED_WINDOWS if current_lap <= w[1]]
+            pit_laps = np.array([w[0] for w in fixed], dtype=np.int64)
+            names = [w[2] for w in fixed]
+        
+        results: List[Optional[List[PitWindow]]] = [None if not ok else [] for ok in valid]
+        if len(pit_laps) == 0 or not valid.any():
+            return results
+        
+        race_times = self._race_times(pit_laps[None, :], current_lap, total_laps, base_col, rate_col)
+        if elapsed_times is not None:
+            race_times = race_times + np.asarray(elapsed_times, dtype=np.float64)[:, None]
+        positions = self._estimate_positions(race_times, competitors)
+        if own_estimates is not None:
+            own = np.array([np.nan if t is None else t for t in own_estimates], dtype=np.float64)[:, None]
+            positions = positions - (own < race_times)
+        confidence = self._confidences(pit_laps[None, :], current_lap, total_laps, rate_col)
+        lap_start, lap_end = self._window_bounds(pit_laps, current_lap, total_laps)
+        
+        for car in np.flatnonzero(valid):
+            if mode == "sweep":
+                picked, labels = [], []
+                for idx in np.argsort(race_times[car], kind="stable"):
+                    if len(picked) >= top_k:
+                        break
+                    if all(abs(int(pit_laps[idx]) - int(pit_laps[j])) >= 2 for j in picked):
+                        picked.append(idx)
+                        labels.append(f"Sweep #{len(picked)}: pit on lap {int(pit_laps[idx])}")
+            else:
+                # same order as the single-car call: stable sort by predicted position
+                picked = list(np.argsort(positions[car], kind="stable"))
+                labels = [names[i] for i in picked]
+            
+            results[car] = [
+                PitWindow(
+                    lap_start=int(lap_start[i]),
+                    lap_end=int(lap_end[i]),
+                    time_loss=self.pit_stop_time,
+                    predicted_position=int(positions[car, i]),
+                    confidence=float(confidence[car, i]),
+                    reason=label
+                )
+                for i, label in zip(picked, labels)
+            ]
+        
+        return results
+    
+    def _confidences(self, pit_laps: np.ndarray, current_lap: int, total_laps: int, rates: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_confidence (broadcasts pit laps against rates)"""
+        confidence = 0.7 + np.where(rates > self.tire_cliff_threshold, 0.15, 0.0)
+        if current_lap < 3:
+            confidence = confidence - 0.2
+        confidence = confidence - np.where(pit_laps > total_laps - 3, 0.25, 0.0)
+        return np.clip(confidence, 0.3, 0.95)
+    
+    @timed_stage()
+    def project_finish_times(
+        self,
+        current_laps: np.ndarray,
+        total_laps: int,
+        elapsed: np.ndarray,
+        base_lap_times: np.ndarray,
+        degradation_rates: np.ndarray,
+        min_stops: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Projected finish time and remaining stops for every car at once.
+        
+        Each car runs from its own current lap on the same lap-time model as
+        _race_times, taking the faster of no further stop (unless min_stops
+        requires one) and its best single stop. Returns (elapsed + remaining
+        time, stops); NaN where the inputs are missing.
+        """
+        cur = np.asarray(current_laps, dtype=np.float64)[:, None]
+        base = np.asarray(base_lap_times, dtype=np.float64)[:, None]
+        rate = np.asarray(degradation_rates, dtype=np.float64)[:, None]
+        elapsed = np.asarray(elapsed, dtype=np.float64)
+        if len(elapsed) == 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        
+        n = np.maximum(total_laps - cur, 0)
+        no_stop = (n * base + rate * (n * (cur - 1) + n * (n - 1) / 2))[:, 0]
+        if min_stops > 0:
+            no_stop = np.full_like(no_stop, np.inf)
+        
+        pit_laps = np.arange(int(np.nanmin(cur)) + 1, total_laps)[None, :]
+        one_stop = np.full(len(elapsed), np.inf)
+        if pit_laps.size:
+            times = self._race_times(pit_laps, cur, total_laps, base, rate)
+            one_stop = np.where(pit_laps > cur, times, np.inf).min(axis=1)
+        
+        remaining = np.minimum(no_stop, one_stop)
+        stops = (one_stop < no_stop).astype(np.int64)
+        finished = n[:, 0] == 0
+        remaining = np.where(finished, 0.0, remaining)
+        stops = np.where(finished, 0, stops)
+        
+        projected = elapsed + remaining
+        projected[~np.isfinite(projected)] = np.nan
+        return projected, stops
+    
+    def _estimate_positions(self, race_times: np.ndarray, competitors: List[Dict]) -> np.ndarray:
+        """Vectorised _estimate_position for many candidate race times"""
+        race_times = np.asarray(race_times, dtype=np.float64)
+        known = np.sort(np.array(
+            [c['estimated_time'] for c in competitors if c.get('estimated_time') is not None],
+            dtype=np.float64
+        ))
+        # competitors without an estimate count as slower, like race_time + 10
+        return np.searchsorted(known, race_times, side="left") + 1
+    
     def _estimate_position(self, race_time: float, competitors: List[Dict]) -> int:
         """Estimate finishing position based on race time"""
-        position = 1
-        for comp in competitors:
-            if comp.get('estimated_time', race_time + 10) < race_time:
-                position += 1
-        return position
+        return int(self._estimate_positions(np.array([race_time]), competitors)[0])
     
     def _calculate_confidence(
         self, 
@@ -163,6 +432,121 @@ class StrategyEngine:
         
         return max(0.3, min(0.95, confidence))
     
+    @timed_stage()
+    def optimize_stop_schedule(
+        self,
+        current_lap: int,
+        total_laps: int,
+        lap_times: List[float],
+        degradation_rate: float,
+        max_stops: int = 3,
+        tire_life_laps: Optional[int] = None,
+        fuel_laps: Optional[int] = None,
+        current_fuel_laps: Optional[int] = None,
+        top_n: int = 5
+    ) -> List[StopSchedule]:
+        """
+        Best `top_n` stop schedules (0..max_stops stops) by dynamic programming.
+        
+        State is (lap, stops made); the stint age is carried by the transition,
+        since a stint's time depends only on its length (same model as
+        _race_times). Each state keeps its top_n partial schedules, so the
+        k-best search stays O(max_stops * laps^2 * top_n) array work.
+        
+        tire_life_laps caps laps on one set of tires (the current set is
+        already current_lap - 1 laps old), fuel_laps caps laps per fill and
+        current_fuel_laps caps the current stint.
+        """
+        if top_n < 1:
+            raise ValueError("top_n must be >= 1")
+        if max_stops < 0:
+            raise ValueError("max_stops must be >= 0")
+        remaining = total_laps - current_lap
+        if remaining <= 0:
+            return []
+        
+        base = self.base_lap_time(lap_times)
+        fresh_rate = degradation_rate * self.fresh_tire_deg_factor
+        n = np.arange(remaining + 1, dtype=np.float64)
+        
+        # Time for a stint of n laps on the current tires / on fresh tires
+        first_cost = n * base + degradation_rate * (n * (current_lap - 1) + n * (n - 1) / 2)
+        fresh_cost = n * (base - self.fresh_tire_advantage) + fresh_rate * n * (n - 1) / 2
+        
+        unlimited = remaining + 1
+        first_max = min(
+            tire_life_laps - (current_lap - 1) if tire_life_laps else unlimited,
+            current_fuel_laps if current_fuel_laps is not None else (fuel_laps or unlimited),
+        )
+        fresh_max = min(tire_life_laps or unlimited, fuel_laps or unlimited)
+        
+        finals = []  # (time, stops, position, rank)
+        if remaining <= first_max:
+            finals.append((float(first_cost[remaining]), 0, remaining, 0))
+        
+        # stop_cost[s][j, r]: r-th best time to reach position j (laps since
+        # current_lap) having just made stop s there; backpointers per state
+        pos = np.arange(remaining + 1)
+        stop_cost, back_pos, back_rank = [None], [None], [None]
+        
+        first = np.full((remaining + 1, top_n), np.inf)
+        reachable = (pos >= 1) & (pos <= min(first_max, remaining - 1))
+        first[reachable, 0] = first_cost[reachable] + self.pit_stop_time
+        stop_cost.append(first)
+        back_pos.append(np.zeros((remaining + 1, top_n), dtype=np.int64))
+        back_rank.append(np.zeros((remaining + 1, top_n), dtype=np.int64))
+        
+        # stint[j, i]: fresh stint from stop at i to stop at j
+        length = pos[:, None] - pos[None, :]
+        stint = np.where((length >= 1) & (length <= fresh_max), fresh_cost[np.clip(length, 0, remaining)], np.inf)
+        stint[remaining, :] = np.inf  # no stop on the final lap
+        
+        for stops in range(2, max_stops + 1):
+            prev = stop_cost[-1]
+            cand = (prev[None, :, :] + stint[:, :, None] + self.pit_stop_time).reshape(remaining + 1, -1)
+            k = min(top_n, cand.shape[1])
+            idx = np.argpartition(cand, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(cand, idx, axis=1), axis=1, kind="stable")
+            idx = np.take_along_axis(idx, order, axis=1)
+            
+            cost = np.full((remaining + 1, top_n), np.inf)
+            cost[:, :k] = np.take_along_axis(cand, idx, axis=1)
+            bp = np.zeros((remaining + 1, top_n), dtype=np.int64)
+            br = np.zeros((remaining + 1, top_n), dtype=np.int64)
+            bp[:, :k], br[:, :k] = np.divmod(idx, top_n)
+            
+            stop_cost.append(cost)
+            back_pos.append(bp)
+            back_rank.append(br)
+        
+        # Close every stop state with a final fresh stint to the flag
+        last_len = remaining - pos
+        last_ok = (last_len >= 1) & (last_len <= fresh_max)
+        for stops in range(1, max_stops + 1):
+            total = stop_cost[stops] + np.where(last_ok, fresh_cost[last_len], np.inf)[:, None]
+            for j, r in zip(*np.nonzero(np.isfinite(total))):
+                finals.append((float(total[j, r]), stops, int(j), int(r)))
+        
+        finals.sort(key=lambda f: f[0])
+        
+        schedules = []
+        for race_time, stops, j, r in finals[:top_n]:
+            stop_positions = []
+            while stops >= 1:
+                stop_positions.append(j)
+                j, r = int(back_pos[stops][j, r]), int(back_rank[stops][j, r])
+                stops -= 1
+            stop_positions.reverse()
+            bounds = [0] + stop_positions + [remaining]
+            schedules.append(StopSchedule(
+                pit_laps=[current_lap + p for p in stop_positions],
+                race_time=race_time,
+                stint_lengths=[b - a for a, b in zip(bounds, bounds[1:])]
+            ))
+        
+        return schedules
+    
+    @timed_stage()
     def should_pit_now(
         self,
         current_lap: int,
@@ -195,6 +579,7 @@ class StrategyEngine:
         
         return False, "Continue current stint"
     
+    @timed_stage()
     def calculate_fuel_strategy(
         self,
         current_lap: int,
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# ------------------------------------------------------------------------------
+# Chunked telemetry reads for files that don't fit in memory.
+# The long-format telemetry file is parsed `chunk_rows` rows at a time with
+# only the needed columns; each chunk is filtered by vehicle / channel / lap
+# range right away and dropped, so peak memory follows the chunk size and
+# the matching rows, not the file size. Matching rows can be spilled to an
+# Arrow IPC (Feather v2) file batch by batch, so a repeated query reads only
+# that small file.
+# ------------------------------------------------------------------------------
+
+DEFAULT_CHUNK_ROWS = int(os.environ.get("PITGENIUS_TELEMETRY_CHUNK_ROWS", 500_000))
+# Columns read from the file (others are never parsed)
+READ_COLUMNS = ("vehicle_id", "vehicle_number", "lap", "timestamp", "telemetry_name", "telemetry_value")
+# Parse dtypes inside a chunk: repeated keys as categoricals, NaN-tolerant numerics
+CHUNK_DTYPES = {
+    "vehicle_id": "category",
+    "telemetry_name": "category",
+    "telemetry_value": "float32",
+    "lap": "float64",
+    "vehicle_number": "float64",
+}
+# Bump when spilled files change layout
+SPILL_VERSION = 1
+# Query spills kept per spill directory; least recently used ones go first
+DEFAULT_SPILL_BUDGET = int(float(os.environ.get("PITGENIUS_SPILL_MB", 1024)) * 1024 * 1024)
+LAP_AGGREGATES_SUFFIX = "-lap-aggregates.feather"
+SPILL_TYPES = {
+    "vehicle_id": "string",
+    "vehicle_number": "float64",
+    "lap": "float64",
+    "timestamp": "string",
+    "telemetry_name": "string",
+    "telemetry_value": "float32",
+}
+
+
+@dataclass(frozen=True)
+class TelemetryQuery:
+    """Row predicate pushed into the chunked read; None = no filter on that key."""
+    vehicles: Optional[Tuple[str, ...]] = None
+    channels: Optional[Tuple[str, ...]] = None
+    lap_start: Optional[int] = None
+    lap_end: Optional[int] = None
+
+    @classmethod
+    def build(
+        cls,
+        vehicles: Optional[Sequence[str]] = None,
+        channels: Optional[Sequence[str]] = None,
+        lap_start: Optional[int] = None,
+        lap_end: Optional[int] = None
+    ) -> "TelemetryQuery":
+        """Normalized (sorted, de-duplicated) query, so equal filters share a spill file."""
+        return cls(
+            tuple(sorted(set(map(str, vehicles)))) if vehicles else None,
+            tuple(sorted(set(map(str, channels)))) if channels else None,
+            lap_start,
+            lap_end,
+        )
+
+    def key(self) -> str:
+        raw = json.dumps([self.vehicles, self.channels, self.lap_start, self.lap_end, SPILL_VERSION])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def mask(self, chunk: pd.DataFrame) -> Optional[np.ndarray]:
+        """Rows of `chunk` matching the query (None = all rows)."""
+        keep = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        if self.vehicles is not None:
+            keep = both(keep, chunk["vehicle_id"].isin(self.vehicles).to_numpy())
+        if self.channels is not None:
+            keep = both(keep, chunk["telemetry_name"].isin(self.channels).to_numpy())
+        if self.lap_start is not None or self.lap_end is not None:
+            laps = chunk["lap"].to_numpy()
+            if self.lap_start is not None:
+                keep = both(keep, laps >= self.lap_start)
+            if self.lap_end is not None:
+                keep = both(keep, laps <= self.lap_end)
+        return keep
+
+
+@dataclass
+class ReadStats:
+    chunks: int = 0
+    rows_read: int = 0
+    rows_kept: int = 0
+    peak_chunk_bytes: int = 0
+
+    def describe(self) -> str:
+        return (f"{self.rows_kept}/{self.rows_read} rows kept from {self.chunks} chunk(s), "
+                f"peak chunk {self.peak_chunk_bytes / 1e6:.1f} MB")
+
+
+class ChunkedTelemetryReader:
+    """
+    Filtered, bounded-memory reads of one telemetry source.
+
+    `source` is the CSV; `cached` may point to a full columnar cache entry
+    of it (Feather or Parquet), which is then read record batch by record
+    batch instead of re-parsing the CSV.
+    """
+
+    def __init__(self, source, chunk_rows: int = DEFAULT_CHUNK_ROWS, cached=None):
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be > 0")
+        self.source = Path(source)
+        self.chunk_rows = chunk_rows
+        self.cached = Path(cached) if cached else None
+        self.last_stats = ReadStats()
+
+    # ------------------------------
+    # RAW CHUNKS
+    # ------------------------------
+    def _csv_chunks(self) -> Iterator[pd.DataFrame]:
+        header = pd.read_csv(self.source, nrows=0).columns
+        columns = [c for c in READ_COLUMNS if c in header]
+        dtypes = {c: t for c, t in CHUNK_DTYPES.items() if c in columns}
+        with pd.read_csv(self.source, usecols=columns, dtype=dtypes, chunksize=self.chunk_rows) as reader:
+            yield from reader
+
+    def _cached_chunks(self) -> Iterator[pd.DataFrame]:
+        if self.cached.suffix == ".parquet":
+            import pyarrow.parquet as pq
+            parquet = pq.ParquetFile(self.cached)
+            columns = [c for c in READ_COLUMNS if c in parquet.schema_arrow.names]
+            for batch in parquet.iter_batches(batch_size=self.chunk_rows, columns=columns):
+                yield batch.to_pandas()
+            return
+
+        # Feather v2 = Arrow IPC file: memory-mapped, one record batch at a time
+        with pa.memory_map(str(self.cached)) as source:
+            reader = pa.ipc.open_file(source)
+            columns = [c for c in READ_COLUMNS if c in reader.schema.names]
+            pending: List = []
+            pending_rows = 0
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= self.chunk_rows:
+                    yield pa.Table.from_batches(pending).to_pandas()
+                    pending, pending_rows = [], 0
+            if pending:
+                yield pa.Table.from_batches(pending).to_pandas()
+
+    def chunks(self, query: Optional[TelemetryQuery] = None, stats: Optional[ReadStats] = None) -> Iterator[pd.DataFrame]:
+        """
+        Matching rows, one filtered frame per source chunk (file order).
+        Concurrent reads should pass their own `stats` (last_stats is shared).
+        """
+        query = query or TelemetryQuery()
+        stats = self.last_stats = stats or ReadStats()
+        use_cache = self.cached is not None and self.cached.exists() and HAS_PYARROW
+        for chunk in (self._cached_chunks() if use_cache else self._csv_chunks()):
+            stats.chunks += 1
+            stats.rows_read += len(chunk)
+            stats.peak_chunk_bytes = max(stats.peak_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+            keep = query.mask(chunk)
+            if keep is not None:
+                chunk = chunk[keep]
+            stats.rows_kept += len(chunk)
+            yield chunk
+
+    # ------------------------------
+    # RESULTS
+    # ------------------------------
+    def read(self, query: Optional[TelemetryQuery] = None) -> pd.DataFrame:
+        """All matching rows in memory (only the matches are ever concatenated)."""
+        parts = [_plain(c) for c in self.chunks(query)]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(READ_COLUMNS))
+
+    def spill(self, query: TelemetryQuery, path, stats: Optional[ReadStats] = None) -> int:
+        """
+        Write matching rows to `path` (Arrow IPC file) chunk by chunk; only
+        one chunk is in memory at a time. Returns the rows written.
+        """
+        if not HAS_PYARROW:
+            raise RuntimeError("Spilling telemetry needs pyarrow")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        writer, schema, rows = None, None, 0
+        try:
+            for chunk in self.chunks(query, stats):
+                if writer is None:
+                    # fixed types, so an all-missing column in one chunk can't change the schema
+                    schema = pa.schema([(c, pa.type_for_alias(SPILL_TYPES.get(c, "string"))) for c in chunk.columns])
+                    writer = pa.ipc.new_file(str(tmp), schema)
+                if len(chunk):
+                    writer.write_table(pa.Table.from_pandas(_plain(chunk), schema=schema, preserve_index=False))
+                    rows += len(chunk)
+            if writer is None:  # no chunks at all
+                writer = pa.ipc.new_file(str(tmp), pa.schema([(c, pa.type_for_alias(SPILL_TYPES[c])) for c in READ_COLUMNS]))
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp, path)
+        return rows
+
+
+def _plain(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Chunk-local categoricals as plain strings, so chunks share one schema."""
+    out = chunk.copy(deep=False)
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object).where(out[col].notna(), None)
+    return out
+
+
+def spill_path(spill_dir, source, source_key: str, query: TelemetryQuery) -> Path:
+    """`<spill_dir>/<source stem>-<source key>-<query key>.feather`."""
+    return Path(spill_dir) / f"{Path(source).stem}-{source_key}-{query.key()}.feather"
+
+
+def spills_over_budget(spill_dir, budget: int) -> List[Path]:
+    """
+    Query spills to drop, least recently used (oldest mtime; hits touch
+    the file) first, until the rest fit in `budget` bytes. The per-source
+    lap aggregates aren't query spills and are never listed.
+    """
+    files = []
+    for path in Path(spill_dir).glob("*.feather"):
+        if path.name.endswith(LAP_AGGREGATES_SUFFIX):
+            continue
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime_ns, st.st_size, path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    drop = []
+    for _, size, path in files:
+        if total <= budget:
+            break
+        drop.append(path)
+        total -= size
+    return drop
+
+
+def remove_stale_spills(spill_dir, source, source_key: str):
+    """Drop spills of older versions of `source` (other source keys)."""
+    spill_dir = Path(spill_dir)
+    if not spill_dir.exists():
+        return
+    stem = Path(source).stem
+    for path in spill_dir.glob(f"{stem}-*.feather"):
+        if not path.name.startswith(f"{stem}-{source_key}-"):
+            path.unlink()
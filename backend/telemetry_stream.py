@@ -0,0 +1,271 @@
+import asyncio
+import json
+import struct
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# ------------------------------------------------------------------------------
+# Telemetry streaming (replay of loaded data, push of live-ingested rows).
+# Every client gets its own downsampling state and a bounded frame queue, so a
+# slow reader can only ever hold `max_queue` frames on the server:
+#  - replay waits for the queue (the replay slows down to the client's pace)
+#  - live push drops the oldest queued frame and reports the count as `dropped`
+# ------------------------------------------------------------------------------
+
+STREAM_FORMATS = ("json", "binary")
+DEFAULT_CHANNELS = ("vcar_can", "accx_can", "pbrake_f", "aps")
+# sample rate assumed when a frame has no usable timestamp column
+FALLBACK_SAMPLE_HZ = 10.0
+# session seconds per frame when replaying unpaced (speed=0)
+UNPACED_WINDOW_S = 10.0
+
+# Binary frame: magic, seq, dropped, t0 (epoch s), channel count; then per
+# channel: name length, name, sample count, float32 t - t0, float32 values.
+FRAME_MAGIC = b"PGT1"
+_FRAME_HEADER = struct.Struct("<4sIIdH")
+_CHANNEL_HEADER = struct.Struct("<B")
+_COUNT = struct.Struct("<I")
+
+ChannelBatch = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+@dataclass
+class StreamOptions:
+    channels: Optional[List[str]] = None  # None = DEFAULT_CHANNELS
+    speed: float = 1.0  # replay speed multiplier; 0 = as fast as the client reads
+    max_hz: float = 10.0  # per-channel samples per second of session time (0 = no downsampling)
+    batch_ms: int = 200  # wall-clock time covered by one frame
+    fmt: str = "json"
+    lap_start: Optional[int] = None
+    lap_end: Optional[int] = None
+    max_queue: int = 16  # frames buffered per client
+
+    def channel_list(self) -> List[str]:
+        return list(self.channels) if self.channels else list(DEFAULT_CHANNELS)
+
+    def validate(self):
+        if self.fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unknown format: {self.fmt}")
+        if self.speed < 0 or self.max_hz < 0 or self.batch_ms <= 0 or self.max_queue <= 0:
+            raise ValueError("speed/max_hz must be >= 0, batch_ms and max_queue > 0")
+
+
+def to_epoch_seconds(df: pd.DataFrame) -> np.ndarray:
+    """Sample times in seconds; NaN where the timestamp doesn't parse."""
+    if "timestamp" not in df.columns:
+        # no clock: space each channel's samples at FALLBACK_SAMPLE_HZ
+        order = df.groupby("telemetry_name", observed=True).cumcount().to_numpy()
+        return order / FALLBACK_SAMPLE_HZ
+    ts = pd.to_datetime(df["timestamp"].astype(str), utc=True, format="ISO8601", errors="coerce")
+    seconds = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+    seconds[ts.isna().to_numpy()] = np.nan
+    return seconds
+
+
+class Downsampler:
+    """
+    Keeps at most one sample per channel per 1/max_hz seconds, remembering
+    the last bucket across batches so live frames don't re-emit it.
+    """
+
+    def __init__(self, max_hz: float):
+        self.max_hz = max_hz
+        self._last_bucket: Dict[str, int] = {}
+
+    def apply(self, channel: str, t: np.ndarray, v: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.max_hz <= 0 or len(t) == 0:
+            return t, v
+        bucket = np.floor(t * self.max_hz).astype(np.int64)
+        keep = np.empty(len(t), dtype=bool)
+        keep[0] = bucket[0] != self._last_bucket.get(channel)
+        keep[1:] = bucket[1:] != bucket[:-1]
+        self._last_bucket[channel] = int(bucket[-1])
+        return t[keep], v[keep]
+
+
+def channel_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(times, channel names, values) of a telemetry frame, parsed once."""
+    names = df["telemetry_name"].astype(str).to_numpy()
+    values = pd.to_numeric(df["telemetry_value"], errors="coerce").to_numpy(dtype=np.float64)
+    return to_epoch_seconds(df), names, values
+
+
+def split_channels(arrays: Tuple[np.ndarray, np.ndarray, np.ndarray], channels: List[str], downsampler: Downsampler) -> ChannelBatch:
+    """Time-sorted, downsampled (t, value) arrays per requested channel."""
+    t_all, names, values = arrays
+    batch = {}
+    for channel in channels:
+        mask = (names == channel) & ~np.isnan(t_all)
+        if not mask.any():
+            continue
+        t, v = t_all[mask], values[mask]
+        order = np.argsort(t, kind="stable")
+        t, v = downsampler.apply(channel, t[order], v[order])
+        if len(t):
+            batch[channel] = (t, v)
+    return batch
+
+
+def encode_frame(batch: ChannelBatch, fmt: str, seq: int, dropped: int = 0) -> Union[str, bytes]:
+    """One stream frame; times are sent relative to the frame's first sample."""
+    t0 = min((float(t[0]) for t, _ in batch.values()), default=0.0)
+
+    if fmt == "binary":
+        parts = [_FRAME_HEADER.pack(FRAME_MAGIC, seq, dropped, t0, len(batch))]
+        for name, (t, v) in batch.items():
+            raw = name.encode("utf-8")[:255]
+            parts += [
+                _CHANNEL_HEADER.pack(len(raw)), raw, _COUNT.pack(len(t)),
+                (t - t0).astype("<f4").tobytes(), v.astype("<f4").tobytes(),
+            ]
+        return b"".join(parts)
+
+    channels = {}
+    for name, (t, v) in batch.items():
+        v = np.where(np.isfinite(v), np.round(v, 4), np.nan)
+        channels[name] = {
+            "t": np.round(t - t0, 3).tolist(),
+            "v": [x if x == x else None for x in v.tolist()],
+        }
+    return json.dumps({"seq": seq, "dropped": dropped, "t0": t0, "channels": channels})
+
+
+class TelemetryReplay:
+    """A vehicle's loaded telemetry, pre-split and downsampled for one client."""
+
+    def __init__(self, batch: ChannelBatch, options: StreamOptions):
+        self.options = options
+        self.batch = batch
+        starts = [t[0] for t, _ in batch.values()]
+        ends = [t[-1] for t, _ in batch.values()]
+        self.t_start = min(starts) if starts else 0.0
+        self.t_end = max(ends) if ends else 0.0
+
+    @classmethod
+    def from_processor(cls, processor, vehicle_id: str, options: StreamOptions) -> Optional["TelemetryReplay"]:
+        """None if the vehicle has no loaded telemetry."""
+        df = processor.get_vehicle_telemetry(
+            vehicle_id, options.channel_list(), options.lap_start, options.lap_end
+        )
+        if df is None:
+            return None
+        batch = split_channels(channel_arrays(df), options.channel_list(), Downsampler(options.max_hz))
+        return cls(batch, options)
+
+    def windows(self):
+        """(session-time window batch, wall seconds to wait after it) until the end."""
+        opts = self.options
+        wall = opts.batch_ms / 1000
+        span = wall * opts.speed if opts.speed > 0 else UNPACED_WINDOW_S
+
+        t = self.t_start
+        while self.batch and t <= self.t_end:
+            window = {}
+            for name, (ts, vs) in self.batch.items():
+                lo, hi = np.searchsorted(ts, [t, t + span], side="left")
+                if hi > lo:
+                    window[name] = (ts[lo:hi], vs[lo:hi])
+            yield window, (wall if opts.speed > 0 else 0.0)
+            t += span
+
+
+class ClientStream:
+    """Bounded frame queue for one connected client."""
+
+    def __init__(self, options: StreamOptions):
+        self.options = options
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=options.max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+        self.sent = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def offer(self, batch: Optional[ChannelBatch]):
+        """Enqueue without waiting; when full the oldest frame is dropped."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(batch)
+
+    def start_replay(self, replay: TelemetryReplay):
+        async def produce():
+            for window, wait in replay.windows():
+                if window:
+                    await self.queue.put(window)  # blocks while the client is behind
+                if wait:
+                    await asyncio.sleep(wait)
+            await self.queue.put(None)
+
+        self._task = asyncio.create_task(produce())
+
+    async def frames(self) -> AsyncIterator[Union[str, bytes]]:
+        """Encoded frames until the replay ends (live streams never end)."""
+        while True:
+            batch = await self.queue.get()
+            if batch is None:
+                return
+            frame = encode_frame(batch, self.options.fmt, self.sent, self.dropped)
+            self.sent += 1
+            yield frame
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+class _Subscriber:
+    def __init__(self, client: ClientStream, vehicle_id: str):
+        self.client = client
+        self.vehicle_id = vehicle_id
+        self.channels = client.options.channel_list()
+        self.downsampler = Downsampler(client.options.max_hz)
+
+
+class TelemetryHub:
+    """
+    Fans live-ingested telemetry out to subscribed clients. Registered as a
+    RaceDataProcessor telemetry listener, so it runs on the ingest thread and
+    hands frames to each client's event loop without blocking on any of them.
+    """
+
+    def __init__(self):
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, client: ClientStream, vehicle_id: str) -> _Subscriber:
+        sub = _Subscriber(client, vehicle_id)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, rows: pd.DataFrame):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers or len(rows) == 0:
+            return
+
+        vehicle_ids = rows["vehicle_id"].astype(str)
+        for vid in set(s.vehicle_id for s in subscribers):
+            vehicle_rows = rows[(vehicle_ids == vid).to_numpy()]
+            if len(vehicle_rows) == 0:
+                continue
+            arrays = channel_arrays(vehicle_rows)
+            for sub in subscribers:
+                if sub.vehicle_id != vid:
+                    continue
+                batch = split_channels(arrays, sub.channels, sub.downsampler)
+                if batch:
+                    sub.client.loop.call_soon_threadsafe(sub.client.offer, batch)
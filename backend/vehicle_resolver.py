@@ -0,0 +1,104 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Vehicle IDs look like "GR86-022-2": <model>-<chassis>-<car number>
+VEHICLE_ID_PATTERN = re.compile(r"^(?P<model>.*?)-(?P<chassis>\d+)-(?P<number>\d+)$")
+
+
+def parse_vehicle_id(vehicle_id: str) -> Optional[Tuple[str, int]]:
+    """Split a vehicle ID into (chassis, car number), or None if it doesn't parse."""
+    match = VEHICLE_ID_PATTERN.match(str(vehicle_id).strip())
+    if not match:
+        return None
+    return match.group("chassis"), int(match.group("number"))
+
+
+class VehicleResolver:
+    """
+    Exact car-number <-> vehicle-ID lookups, built once at load.
+
+    Replaces `str(number) in vehicle_id` scans, which were O(vehicles) per call
+    and ambiguous (car 2 matched "GR86-022-2"). When one car number maps to
+    several vehicle IDs (chassis swap), the ID with the most laps wins.
+    """
+
+    def __init__(self):
+        self._by_number: Dict[int, List[str]] = {}
+        self._by_vehicle: Dict[str, Tuple[Optional[str], int]] = {}
+
+    @classmethod
+    def from_ids(
+        cls,
+        vehicle_ids: Iterable[str],
+        lap_counts: Optional[Dict[str, int]] = None,
+        fallback_numbers: Optional[Dict[str, int]] = None
+    ) -> "VehicleResolver":
+        """
+        Build from vehicle IDs. `fallback_numbers` supplies the car number for
+        IDs that don't follow the <model>-<chassis>-<number> pattern.
+        """
+        resolver = cls()
+        lap_counts = lap_counts or {}
+        fallback_numbers = fallback_numbers or {}
+
+        for vid in vehicle_ids:
+            vid = str(vid)
+            parsed = parse_vehicle_id(vid)
+            if parsed:
+                chassis, number = parsed
+            elif vid in fallback_numbers:
+                chassis, number = None, int(fallback_numbers[vid])
+            else:
+                continue
+
+            resolver._by_vehicle[vid] = (chassis, number)
+            resolver._by_number.setdefault(number, []).append(vid)
+
+        for ids in resolver._by_number.values():
+            ids.sort(key=lambda v: -lap_counts.get(v, 0))
+
+        return resolver
+
+    def add(self, vehicle_id: str, fallback_number: Optional[int] = None) -> bool:
+        """
+        Register a vehicle seen after the initial build (live ingest). A new ID
+        for an existing car number ranks after the IDs already known.
+        """
+        vid = str(vehicle_id)
+        if vid in self._by_vehicle:
+            return False
+        parsed = parse_vehicle_id(vid)
+        if parsed:
+            chassis, number = parsed
+        elif fallback_number is not None:
+            chassis, number = None, int(fallback_number)
+        else:
+            return False
+
+        self._by_vehicle[vid] = (chassis, number)
+        self._by_number.setdefault(number, []).append(vid)
+        return True
+
+    def vehicle_for(self, number: int) -> Optional[str]:
+        """Vehicle ID for a car number (the one with most laps), or None."""
+        ids = self._by_number.get(int(number))
+        return ids[0] if ids else None
+
+    def vehicles_for(self, number: int) -> List[str]:
+        """Every vehicle ID that ran under a car number."""
+        return list(self._by_number.get(int(number), []))
+
+    def number_for(self, vehicle_id: str) -> Optional[int]:
+        entry = self._by_vehicle.get(str(vehicle_id))
+        return entry[1] if entry else None
+
+    def chassis_for(self, vehicle_id: str) -> Optional[str]:
+        entry = self._by_vehicle.get(str(vehicle_id))
+        return entry[0] if entry else None
+
+    def numbers(self) -> List[int]:
+        return sorted(self._by_number)
+
+    def __len__(self) -> int:
+        return len(self._by_vehicle)
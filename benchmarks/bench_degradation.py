@@ -0,0 +1,116 @@
+"""
+Per-vehicle polyfit vs grouped and incremental tire degradation on a synthetic full grid.
+
+    python -m benchmarks.bench_degradation --cars 40 --laps 100
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.data_processor import (
+    RaceDataProcessor, DEGRADATION_BAND, DEGRADATION_MIN_LAPS, DEGRADATION_MIN_FILTERED
+)
+
+
+def synthetic_lap_times(cars: int, laps: int, seed: int = 0) -> pd.DataFrame:
+    """Lap-time frame shaped like COTA_lap_time_R1.csv, with a few pit/yellow outliers."""
+    rng = np.random.default_rng(seed)
+    vehicle_ids = [f"GR86-{i:03d}-{n}" for i, n in enumerate(rng.choice(np.arange(2, 100), cars, replace=False))]
+
+    lap = np.tile(np.arange(1, laps + 1), cars)
+    base = np.repeat(rng.normal(150, 2, cars), laps)
+    rate = np.repeat(rng.uniform(0, 0.4, cars), laps)
+    seconds = base + rate * lap + rng.normal(0, 0.5, cars * laps)
+    outliers = rng.random(cars * laps) < 0.05
+    seconds[outliers] *= 1.4
+
+    return pd.DataFrame({
+        "vehicle_id": pd.Categorical(np.repeat(vehicle_ids, laps)),
+        "lap": lap.astype(np.int16),
+        "value": seconds * 1000,
+    })
+
+
+def polyfit_rate(lap_times: np.ndarray) -> float:
+    """Reference fit: one np.polyfit over the median-band laps."""
+    if len(lap_times) < DEGRADATION_MIN_LAPS:
+        return 0.0
+    median = np.median(lap_times)
+    low, high = DEGRADATION_BAND
+    filtered = lap_times[(lap_times < median * high) & (lap_times > median * low)]
+    if len(filtered) < DEGRADATION_MIN_FILTERED:
+        return 0.0
+    return float(np.polyfit(np.arange(len(filtered)), filtered, 1)[0])
+
+
+def run(cars: int, laps: int, repeat: int = 5) -> dict:
+    processor = RaceDataProcessor(".", use_cache=False)
+    processor.lap_times_df = synthetic_lap_times(cars, laps)
+    processor._build_indexes()
+    vehicles = list(processor._lap_offsets)
+
+    def per_vehicle():
+        return {
+            v: polyfit_rate(processor.get_driver_lap_times(v)["lap_time_seconds"].to_numpy())
+            for v in vehicles
+        }
+
+    def batch():
+        return processor._seed_degradation()
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    expected = per_vehicle()
+    batch()
+    table = processor.get_all_tire_degradation()
+    max_diff = max(abs(expected[v] - table.at[v, "degradation_rate"]) for v in vehicles)
+
+    t_loop = best_of(per_vehicle)
+    t_batch = best_of(batch)
+
+    # live path: one new lap per car folded into the running sums
+    next_lap = pd.DataFrame({
+        "vehicle_id": vehicles,
+        "lap": laps + 1,
+        "value": table["intercept"].reindex(vehicles).fillna(150).to_numpy() * 1000,
+    })
+    t0 = time.perf_counter()
+    processor.append_lap_times(next_lap)
+    t_append = time.perf_counter() - t0
+
+    return {
+        "cars": cars,
+        "laps": laps,
+        "per_vehicle_ms": t_loop * 1000,
+        "batch_ms": t_batch * 1000,
+        "append_lap_ms": t_append * 1000,
+        "speedup": t_loop / t_batch if t_batch else float("inf"),
+        "max_abs_diff": float(max_diff),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=40)
+    parser.add_argument("--laps", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    r = run(args.cars, args.laps, args.repeat)
+    print(f"🏁 {r['cars']} cars x {r['laps']} laps")
+    print(f"   per-vehicle polyfit: {r['per_vehicle_ms']:.2f} ms")
+    print(f"   batch closed-form:   {r['batch_ms']:.2f} ms  ({r['speedup']:.1f}x)")
+    print(f"   append 1 lap / car:  {r['append_lap_ms']:.2f} ms")
+    print(f"   max |rate diff|:     {r['max_abs_diff']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Timed, memory-tracked benchmarks of the processor, strategy engine and API on a synthetic race.
+
+    python -m benchmarks.run_benchmarks --cars 20 --laps 17 --hz 5 --out bench_results.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json   # exit 1 on regressions
+
+Memoized processor results are cleared before every timed run, so each case
+measures the uncached path.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.data_cache import ColumnarCache
+from backend.data_processor import RaceDataProcessor
+from backend.race_projection import FieldProjection
+from backend.strategy_engine import StrategyEngine
+from benchmarks.synthetic_race import FILE_NAMES, generate_race
+
+
+# A case regresses when its median time (or peak memory) grows by more than
+# the threshold AND by more than the noise floor below.
+DEFAULT_THRESHOLD = 0.20
+MIN_DELTA_MS = 1.0
+MIN_DELTA_KB = 256
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+    setup: Optional[Callable[[], None]] = None  # untimed, before every run
+
+
+def race_dir(data_dir: Optional[str], cars: int, laps: int, hz: float, seed: int) -> Path:
+    """Folder for the synthetic race, generated once per size/seed and reused."""
+    root = Path(data_dir) if data_dir else Path(tempfile.gettempdir()) / "pitgenius-bench"
+    folder = root / f"c{cars}-l{laps}-h{hz:g}-s{seed}" / "COTA" / "Race1"
+    if not all((folder / name).exists() for name in FILE_NAMES.values()):
+        print(f"📝 Generating synthetic race in {folder}")
+        generate_race(folder, cars, laps, hz, seed)
+    return folder
+
+
+def measure(case: Case, repeat: int) -> Dict:
+    """Per-run wall times, then one extra run under tracemalloc for the peak."""
+    times = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        case.run()
+        times.append((time.perf_counter() - started) * 1000)
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    case.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def build_cases(folder: Path, cache_dir: Path) -> List[Case]:
+    # loads
+    cases = [
+        Case("load_all_data[csv]", lambda: RaceDataProcessor(str(folder), use_cache=False).load_all_data()),
+    ]
+    ColumnarCache(cache_dir).clear()
+    RaceDataProcessor(str(folder), cache=ColumnarCache(cache_dir)).load_all_data()  # warm the cache
+    cases.append(Case(
+        "load_all_data[columnar]",
+        lambda: RaceDataProcessor(str(folder), cache=ColumnarCache(cache_dir)).load_all_data(),
+    ))
+
+    processor = RaceDataProcessor(str(folder), cache=ColumnarCache(cache_dir)).load_all_data()
+    engine = StrategyEngine()
+    vehicles = list(processor._lap_offsets)
+    lap_keys = list(processor._telemetry_lap_offsets)
+    histories = {v: processor.get_driver_lap_times(v)["lap_time_seconds"].tolist() for v in vehicles}
+    rates = {v: processor.get_tire_degradation(v)["degradation_rate"] for v in vehicles}
+    total_laps = int(max(processor.lap_times_df["lap"].max(), 3))
+    current_lap = max(2, total_laps // 3)
+    # projected field, so position ranking works against real estimated_time values
+    drivers = FieldProjection(processor, engine).competitors(current_lap, total_laps)
+    cold = processor.bump_data_version
+
+    cases += [
+        Case("get_tire_degradation[all cars]", lambda: [processor.get_tire_degradation(v) for v in vehicles], cold),
+        Case("get_telemetry_summary[all laps]", lambda: [processor.get_telemetry_summary(v, lap) for v, lap in lap_keys], cold),
+        Case(
+            "calculate_optimal_pit_window[fixed, all cars]",
+            lambda: [
+                engine.calculate_optimal_pit_window(current_lap, total_laps, histories[v], rates[v], drivers, {})
+                for v in vehicles
+            ],
+        ),
+        Case(
+            "calculate_optimal_pit_window[sweep, all cars]",
+            lambda: [
+                engine.calculate_optimal_pit_window(current_lap, total_laps, histories[v], rates[v], drivers, {}, mode="sweep")
+                for v in vehicles
+            ],
+        ),
+    ]
+    return cases + build_api_cases(processor, current_lap, total_laps)
+
+
+def build_api_cases(processor: RaceDataProcessor, current_lap: int, total_laps: int) -> List[Case]:
+    """Endpoints through an in-process client (no startup event, no worker pool)."""
+    from fastapi.testclient import TestClient
+    from backend import api
+
+    api.processor = processor
+    api.executor = None
+    client = TestClient(api.app)
+    number = processor.get_all_drivers()[0]["number"]
+    vid = processor.resolve_vehicle(number)
+
+    def call(method, url, **kwargs):
+        def run():
+            response = client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        return run
+
+    cold = processor.bump_data_version
+    strategy = {"vehicle_id": vid, "current_lap": current_lap, "total_laps": total_laps}
+    return [
+        Case("api GET /drivers", call("GET", "/drivers"), cold),
+        Case("api GET /driver/{n}/performance", call("GET", f"/driver/{number}/performance"), cold),
+        Case("api POST /strategy/calculate", call("POST", "/strategy/calculate", json=strategy), cold),
+        Case("api POST /strategy/calculate-batch", call("POST", "/strategy/calculate-batch",
+                                                        json={"current_lap": current_lap, "total_laps": total_laps}), cold),
+        Case("api GET /race/summary", call("GET", "/race/summary"), cold),
+        Case("api GET /telemetry/{vid}/series", call("GET", f"/telemetry/{vid}/series",
+                                                     params={"channels": "vcar_can", "points": 500}), cold),
+    ]
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Cases slower (median) or hungrier (peak) than the baseline beyond threshold and noise."""
+    regressions = []
+    for name, current in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, floor in (("median_ms", MIN_DELTA_MS), ("peak_kb", MIN_DELTA_KB)):
+            old, new = base[metric], current[metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append({
+                    "case": name, "metric": metric, "baseline": old, "current": new,
+                    "ratio": round(new / old, 3) if old else float("inf"),
+                })
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--laps", type=int, default=17)
+    parser.add_argument("--hz", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default=None, help="Where synthetic races are generated (default: system temp)")
+    parser.add_argument("--only", default=None, help="Run only cases whose name contains this text")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    folder = race_dir(args.data_dir, args.cars, args.laps, args.hz, args.seed)
+    cases = build_cases(folder, folder.parent / "bench_cache")
+    if args.only:
+        cases = [c for c in cases if args.only in c.name]
+
+    results = {
+        "meta": {
+            "cars": args.cars, "laps": args.laps, "hz": args.hz, "seed": args.seed, "repeat": args.repeat,
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for case in cases:
+        r = measure(case, args.repeat)
+        results["results"][case.name] = r
+        print(f"⏱️ {case.name:<48} median {r['median_ms']:>10.2f} ms   min {r['min_ms']:>10.2f} ms   peak {r['peak_kb'] / 1024:>8.1f} MB")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.out}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    shape = ("cars", "laps", "hz", "seed")
+    if any(baseline.get("meta", {}).get(k) != results["meta"][k] for k in shape):
+        print("⚠️ Baseline was recorded on a different synthetic race size; ratios are not comparable")
+
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"❌ {r['case']}: {r['metric']} {r['baseline']} -> {r['current']} ({r['ratio']}x)")
+    if regressions:
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
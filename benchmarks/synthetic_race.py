@@ -0,0 +1,194 @@
+"""
+Seeded synthetic race shaped like the COTA exports (same file names and columns).
+
+    python -m benchmarks.synthetic_race out/COTA/Race1 --cars 20 --laps 17 --hz 10
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+RACE_START = np.datetime64("2025-04-27T16:00:00", "us")
+FILE_NAMES = {
+    "telemetry": "R1_cota_telemetry_data.csv",
+    "lap_times": "COTA_lap_time_R1.csv",
+    "weather": "26_Weather_Race 1_Anonymized.CSV",
+    "sectors": "23_AnalysisEnduranceWithSections_Race 1_Anonymized.CSV",
+    "results": "99_Best 10 Laps By Driver_Race 1_Anonymized.CSV",
+}
+CHANNELS = ("vcar_can", "accx_can", "pbrake_f", "pbrake_r", "aps", "nmot")
+SECTOR_SHARE = (0.33, 0.40, 0.27)
+PIT_LOSS_S = 45.0
+
+
+def _lap_clock(seconds: float) -> str:
+    return f"{int(seconds // 60)}:{seconds % 60:06.3f}"
+
+
+def _iso(times: np.ndarray) -> np.ndarray:
+    return np.char.add(np.datetime_as_string(times, unit="us"), "Z")
+
+
+def synthetic_laps(cars: int, laps: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    One row per car and lap: base pace + tire-age degradation + noise, a
+    slow opening lap, one pit stop per car (age resets) and a few
+    field-wide yellow laps.
+    """
+    numbers = rng.choice(np.arange(2, 100), cars, replace=False)
+    vehicle_ids = np.array([f"GR86-{i:03d}-{n}" for i, n in enumerate(numbers)])
+
+    lap = np.tile(np.arange(1, laps + 1), cars)
+    car = np.repeat(np.arange(cars), laps)
+    pit_lap = rng.integers(max(2, laps // 3), max(3, 2 * laps // 3 + 1), cars)
+    age = np.where(lap <= pit_lap[car], lap - 1, lap - pit_lap[car] - 1)
+
+    seconds = (
+        rng.normal(150, 2, cars)[car]
+        + rng.uniform(0, 0.4, cars)[car] * age
+        + rng.normal(0, 0.5, cars * laps)
+    )
+    seconds[lap == 1] *= 1.3
+    seconds[lap == pit_lap[car]] += PIT_LOSS_S
+    yellow = rng.choice(np.arange(2, laps + 1), size=min(2, laps - 1), replace=False) if laps > 2 else []
+    seconds[np.isin(lap, yellow)] *= 1.15
+
+    return pd.DataFrame({
+        "car": car,
+        "lap": lap,
+        "seconds": seconds,
+        "vehicle_id": vehicle_ids[car],
+        "vehicle_number": numbers[car],
+    })
+
+
+def synthetic_telemetry(laps_df: pd.DataFrame, hz: float, rng: np.random.Generator) -> pd.DataFrame:
+    """Long-format telemetry: every channel sampled at `hz` along each lap."""
+    seconds = laps_df["seconds"].to_numpy()
+    lap_end = RACE_START + np.rint(laps_df.groupby("car")["seconds"].cumsum().to_numpy() * 1e6).astype("timedelta64[us]")
+    samples = np.maximum(np.rint(seconds * hz).astype(np.int64), 1)
+
+    row = np.repeat(np.arange(len(laps_df)), samples)
+    within = np.arange(len(row)) - np.repeat(np.cumsum(samples) - samples, samples)
+    progress = within / samples[row]  # 0..1 around the lap
+    stamp = lap_end[row] - np.rint((1 - progress) * seconds[row] * 1e6).astype("timedelta64[us]")
+
+    n = len(row)
+    speed = 150 + 45 * np.sin(2 * np.pi * 4 * progress) + rng.normal(0, 3, n)
+    accel = np.gradient(speed) * hz / 30
+    brake = np.clip(-accel, 0, None) * 40 + rng.normal(0, 0.5, n).clip(0)
+    values = {
+        "vcar_can": speed,
+        "accx_can": accel,
+        "pbrake_f": brake,
+        "pbrake_r": brake * 0.6,
+        "aps": np.clip(50 + accel * 80, 0, 100),
+        "nmot": 4000 + speed * 20 + rng.normal(0, 50, n),
+    }
+
+    lap = laps_df["lap"].to_numpy()[row]
+    vehicle_id = laps_df["vehicle_id"].to_numpy()[row]
+    number = laps_df["vehicle_number"].to_numpy()[row]
+    timestamp = _iso(stamp)
+    return pd.concat(
+        [
+            pd.DataFrame({
+                "lap": lap,
+                "telemetry_name": name,
+                "telemetry_value": values[name],
+                "timestamp": timestamp,
+                "vehicle_id": vehicle_id,
+                "vehicle_number": number,
+            })
+            for name in CHANNELS
+        ],
+        ignore_index=True,
+    )
+
+
+def generate_race(out_dir, cars: int = 20, laps: int = 17, hz: float = 10.0, seed: int = 0) -> Dict[str, Path]:
+    """Write the five race CSVs to `out_dir`; returns {kind: path}."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {kind: out / name for kind, name in FILE_NAMES.items()}
+
+    laps_df = synthetic_laps(cars, laps, rng)
+    seconds = laps_df["seconds"].to_numpy()
+    lap_end = RACE_START + np.rint(laps_df.groupby("car")["seconds"].cumsum().to_numpy() * 1e6).astype("timedelta64[us]")
+
+    pd.DataFrame({
+        "lap": laps_df["lap"],
+        "timestamp": _iso(lap_end),
+        "value": seconds * 1000,
+        "vehicle_id": laps_df["vehicle_id"],
+        "vehicle_number": laps_df["vehicle_number"],
+        "outing": 0,
+    }).to_csv(paths["lap_times"], index=False)
+
+    synthetic_telemetry(laps_df, hz, rng).to_csv(paths["telemetry"], index=False)
+
+    # weather once a minute over the race, slowly drifting
+    minutes = int(np.ceil(laps_df.groupby("car")["seconds"].sum().max() / 60)) + 1
+    epoch = int(RACE_START.astype("datetime64[s]").astype(np.int64)) + 60 * np.arange(minutes)
+    pd.DataFrame({
+        "TIME_UTC_SECONDS": epoch,
+        "TIME_UTC_STR": pd.to_datetime(epoch, unit="s").strftime("%m/%d/%Y %I:%M:%S %p"),
+        "AIR_TEMP": 25 + np.cumsum(rng.normal(0.02, 0.05, minutes)),
+        "TRACK_TEMP": 35 + np.cumsum(rng.normal(0.05, 0.1, minutes)),
+        "HUMIDITY": 50 + np.cumsum(rng.normal(0, 0.2, minutes)),
+        "PRESSURE": 1000.0,
+        "WIND_SPEED": np.abs(10 + np.cumsum(rng.normal(0, 0.3, minutes))),
+        "WIND_DIRECTION": 90,
+        "RAIN": 0,
+    }).to_csv(paths["weather"], index=False)
+
+    # sector splits add up to the lap time; a few S1 timing gaps are left blank
+    share = np.array(SECTOR_SHARE) + rng.normal(0, 0.005, (len(seconds), 3))
+    sectors = seconds[:, None] * share / share.sum(axis=1, keepdims=True)
+    s1 = pd.Series(sectors[:, 0])
+    s1[rng.random(len(s1)) < 0.02] = np.nan
+    pd.DataFrame({
+        "NUMBER": laps_df["vehicle_number"],
+        "DRIVER_NUMBER": 1,
+        "LAP_NUMBER": laps_df["lap"],
+        "LAP_TIME": [_lap_clock(s) for s in seconds],
+        "S1_SECONDS": s1,
+        "S2_SECONDS": sectors[:, 1],
+        "S3_SECONDS": sectors[:, 2],
+        "KPH": 5.513 * 3600 / seconds,
+    }).to_csv(paths["sectors"], index=False)
+
+    totals = laps_df.groupby("vehicle_number", sort=False)["seconds"].agg(["sum", "min", "size"])
+    totals = totals.sort_values("sum")
+    pd.DataFrame({
+        "POSITION": np.arange(1, len(totals) + 1),
+        "NUMBER": totals.index,
+        "VEHICLE": "Toyota GR86",
+        "CLASS": "Am",
+        "TOTAL_DRIVER_LAPS": totals["size"].to_numpy(),
+        "BESTLAP_1": [_lap_clock(s) for s in totals["min"]],
+    }).to_csv(paths["results"], index=False)
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--laps", type=int, default=17)
+    parser.add_argument("--hz", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_race(args.out_dir, args.cars, args.laps, args.hz, args.seed)
+    for kind, path in paths.items():
+        print(f"📝 {kind}: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import pytest
+
+from backend.data_processor import RaceDataProcessor
+from benchmarks.bench_degradation import synthetic_lap_times
+
+
+@pytest.fixture
+def processor():
+    """Processor over a seeded 12-car, 30-lap synthetic lap-time table."""
+    proc = RaceDataProcessor(".", use_cache=False)
+    proc.lap_times_df = synthetic_lap_times(cars=12, laps=30, seed=1)
+    proc._build_indexes()
+    return proc
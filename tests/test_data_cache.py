@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+from backend.data_cache import ColumnarCache, HAS_PYARROW
+
+
+pytestmark = pytest.mark.skipif(not HAS_PYARROW, reason="columnar cache needs pyarrow")
+
+
+def test_cache_hits_until_the_source_changes(tmp_path):
+    source = tmp_path / "laps.csv"
+    pd.DataFrame({"lap": [1, 2], "value": [150.0, 151.0]}).to_csv(source, index=False)
+    cache = ColumnarCache(tmp_path / "cache")
+
+    assert list(cache.load_csv(source)["value"]) == [150.0, 151.0]
+    assert (cache.hits, cache.misses) == (0, 1)
+    cache.load_csv(source)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # new size
+    pd.DataFrame({"lap": [1, 2, 3], "value": [150.0, 151.0, 152.0]}).to_csv(source, index=False)
+    assert list(cache.load_csv(source)["value"]) == [150.0, 151.0, 152.0]
+    assert cache.misses == 2
+
+    # same size, only the mtime moves
+    pd.DataFrame({"lap": [1, 2, 3], "value": [160.0, 161.0, 162.0]}).to_csv(source, index=False)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert list(cache.load_csv(source)["value"]) == [160.0, 161.0, 162.0]
+    assert cache.misses == 3
+
+    cache.load_csv(source)
+    assert cache.hits == 2
+
+
+def test_tag_change_and_unreadable_entry_reparse(tmp_path):
+    source = tmp_path / "laps.csv"
+    pd.DataFrame({"lap": [1, 2], "value": [150.0, 151.0]}).to_csv(source, index=False)
+    cache = ColumnarCache(tmp_path / "cache")
+
+    cache.load_csv(source, tag="a")
+    cache.load_csv(source, tag="b")
+    assert cache.misses == 2
+
+    for entry in (tmp_path / "cache").glob("*.feather"):
+        entry.write_bytes(b"not a feather file")
+    assert list(cache.load_csv(source, tag="a")["lap"]) == [1, 2]
+    assert cache.misses == 3
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from backend.data_processor import DEGRADATION_BAND, DEGRADATION_MIN_LAPS, DEGRADATION_MIN_FILTERED
+
+
+def reference_fit(lap_times: np.ndarray):
+    """(rate, intercept) of one np.polyfit over the median-band laps; (0, NaN) when too few."""
+    if len(lap_times) < DEGRADATION_MIN_LAPS:
+        return 0.0, np.nan
+    median = np.median(lap_times)
+    low, high = DEGRADATION_BAND
+    filtered = lap_times[(lap_times < median * high) & (lap_times > median * low)]
+    if len(filtered) < DEGRADATION_MIN_FILTERED:
+        return 0.0, np.nan
+    rate, intercept = np.polyfit(np.arange(len(filtered)), filtered, 1)
+    return float(rate), float(intercept)
+
+
+def assert_matches_polyfit(processor):
+    fits = processor.get_all_tire_degradation()
+    assert set(fits.index) == set(processor._degradation)
+    for vid, row in fits.iterrows():
+        laps = processor.get_driver_lap_times(vid)["lap_time_seconds"].to_numpy()
+        rate, intercept = reference_fit(laps)
+        assert row["degradation_rate"] == pytest.approx(rate, abs=1e-9)
+        if np.isnan(intercept):
+            assert row["degradation_rate"] == 0
+        else:
+            assert row["intercept"] == pytest.approx(intercept, abs=1e-6)
+        assert processor.get_tire_degradation(vid)["degradation_rate"] == pytest.approx(rate, abs=1e-9)
+
+
+def test_batch_fit_matches_polyfit(processor):
+    assert_matches_polyfit(processor)
+
+
+def test_live_appends_match_polyfit(processor):
+    vehicles = sorted(processor._lap_offsets)
+    rows = []
+    for i, vid in enumerate(vehicles):
+        laps = processor.get_driver_lap_times(vid)
+        median = float(np.median(laps["lap_time_seconds"]))
+        for k, lap in enumerate(range(int(laps["lap"].max()) + 1, int(laps["lap"].max()) + 6)):
+            # mostly in-band laps plus one pit-lap outlier per car
+            seconds = median * 1.5 if k == 2 else median + 0.1 * k + 0.05 * i
+            rows.append({"vehicle_id": vid, "lap": lap, "value": seconds * 1000})
+    # a vehicle first seen live, short at first and then long enough to fit
+    rows += [{"vehicle_id": "GR86-999-98", "lap": lap, "value": (140 + 0.3 * lap) * 1000} for lap in range(1, 4)]
+
+    assert processor.append_lap_times(rows) == len(rows)
+    assert_matches_polyfit(processor)
+
+    more = [{"vehicle_id": "GR86-999-98", "lap": lap, "value": (140 + 0.3 * lap) * 1000} for lap in range(4, 9)]
+    assert processor.append_lap_times(more) == len(more)
+    assert_matches_polyfit(processor)
+    assert processor.get_all_tire_degradation().loc["GR86-999-98", "degradation_rate"] == pytest.approx(0.3)
+
+
+def test_duplicate_live_laps_are_ignored(processor):
+    vid = sorted(processor._lap_offsets)[0]
+    before = processor.get_all_tire_degradation().loc[vid].copy()
+    assert processor.append_lap_times([{"vehicle_id": vid, "lap": 1, "value": 999_000}]) == 0
+    after = processor.get_all_tire_degradation().loc[vid]
+    assert after["degradation_rate"] == before["degradation_rate"]
+    assert after["filtered_laps"] == before["filtered_laps"]
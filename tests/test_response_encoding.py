@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.response_encoding import paginate
+
+
+def lap_table(laps):
+    return pd.DataFrame({"lap": laps, "value": np.arange(len(laps), dtype=float)})
+
+
+@pytest.mark.parametrize("lap_start,lap_end", [(None, None), (3, None), (None, 4), (2, 4), (6, 9), (4, 2)])
+def test_sorted_and_unsorted_tables_select_the_same_laps(lap_start, lap_end):
+    laps = [1, 2, 2, 3, 4, 4, 5]
+    sorted_rows, sorted_page = paginate(lap_table(laps), "lap", lap_start, lap_end)
+    shuffled = lap_table(laps).sample(frac=1, random_state=0)
+    unsorted_rows, unsorted_page = paginate(shuffled, "lap", lap_start, lap_end)
+
+    assert sorted_page == unsorted_page
+    assert sorted(sorted_rows["value"]) == sorted(unsorted_rows["value"])
+    expected = [i for i, lap in enumerate(laps)
+                if (lap_start is None or lap >= lap_start) and (lap_end is None or lap <= lap_end)]
+    assert list(sorted_rows["value"]) == expected
+
+
+def test_offset_and_limit_pages():
+    df = lap_table(list(range(1, 11)))
+    rows, page = paginate(df, "lap", 3, 8, offset=2, limit=3)
+    assert list(rows["lap"]) == [5, 6, 7]
+    assert page == {"total": 6, "offset": 2, "limit": 3, "next_offset": 5}
+
+    rows, page = paginate(df, "lap", 3, 8, offset=5, limit=3)
+    assert list(rows["lap"]) == [8]
+    assert page["next_offset"] is None
+
+    rows, page = paginate(df, None, 3, 8, offset=8)
+    assert list(rows["lap"]) == [9, 10]
+    assert page == {"total": 10, "offset": 8, "limit": None, "next_offset": None}
+
+
+def test_negative_offset_or_limit_rejected():
+    with pytest.raises(ValueError):
+        paginate(lap_table([1, 2]), "lap", offset=-1)
+    with pytest.raises(ValueError):
+        paginate(lap_table([1, 2]), "lap", limit=-1)
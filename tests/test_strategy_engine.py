@@ -0,0 +1,118 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from backend.strategy_engine import StrategyEngine
+
+
+LAP_TIMES = [151.2, 150.8, 151.5, 150.9, 151.1, 151.4]
+
+
+def brute_force_schedules(engine, current_lap, total_laps, lap_times, rate, max_stops,
+                          tire_life_laps=None, fuel_laps=None, current_fuel_laps=None):
+    """Every legal stop plan, timed stint by stint: [(race_time, pit_laps)]."""
+    base = engine.base_lap_time(lap_times)
+    remaining = total_laps - current_lap
+
+    def first_stint(n):
+        return n * base + rate * (n * (current_lap - 1) + n * (n - 1) / 2)
+
+    def fresh_stint(n):
+        return n * (base - engine.fresh_tire_advantage) + rate * engine.fresh_tire_deg_factor * n * (n - 1) / 2
+
+    first_cap = min(
+        tire_life_laps - (current_lap - 1) if tire_life_laps else remaining,
+        current_fuel_laps if current_fuel_laps is not None else (fuel_laps or remaining),
+    )
+    fresh_cap = min(tire_life_laps or remaining, fuel_laps or remaining)
+
+    plans = []
+    for stops in range(max_stops + 1):
+        for positions in combinations(range(1, remaining), stops):
+            bounds = (0,) + positions + (remaining,)
+            stints = [b - a for a, b in zip(bounds, bounds[1:])]
+            if stints[0] > first_cap or any(n > fresh_cap for n in stints[1:]):
+                continue
+            time = first_stint(stints[0]) + sum(fresh_stint(n) for n in stints[1:]) + stops * engine.pit_stop_time
+            plans.append((time, [current_lap + p for p in positions]))
+    plans.sort(key=lambda p: p[0])
+    return plans
+
+
+@pytest.mark.parametrize("current_lap,total_laps,rate,max_stops,caps", [
+    (1, 17, 0.4, 3, {}),
+    (5, 30, 1.2, 3, {}),
+    (3, 25, 0.8, 4, {"tire_life_laps": 10}),
+    (2, 20, 0.1, 2, {"fuel_laps": 12, "current_fuel_laps": 8}),
+    (10, 12, 0.5, 3, {}),
+])
+def test_stop_schedule_matches_brute_force(current_lap, total_laps, rate, max_stops, caps):
+    engine = StrategyEngine()
+    schedules = engine.optimize_stop_schedule(current_lap, total_laps, LAP_TIMES, rate, max_stops=max_stops, top_n=5, **caps)
+    expected = brute_force_schedules(engine, current_lap, total_laps, LAP_TIMES, rate, max_stops, **caps)
+
+    assert len(schedules) == min(5, len(expected))
+    assert [s.race_time for s in schedules] == pytest.approx([t for t, _ in expected[:5]])
+
+    by_laps = {tuple(laps): t for t, laps in expected}
+    for s in schedules:
+        assert by_laps[tuple(s.pit_laps)] == pytest.approx(s.race_time)
+        assert s.stops == len(s.pit_laps)
+        assert sum(s.stint_lengths) == total_laps - current_lap
+
+
+def test_stop_schedule_infeasible_and_invalid():
+    engine = StrategyEngine()
+    assert engine.optimize_stop_schedule(17, 17, LAP_TIMES, 0.5) == []
+    # 16 laps to go on 5-lap fuel fills cannot be done in one stop
+    assert engine.optimize_stop_schedule(1, 17, LAP_TIMES, 0.5, max_stops=1, fuel_laps=5) == []
+    with pytest.raises(ValueError):
+        engine.optimize_stop_schedule(1, 17, LAP_TIMES, 0.5, top_n=0)
+    with pytest.raises(ValueError):
+        engine.optimize_stop_schedule(1, 17, LAP_TIMES, 0.5, max_stops=-1)
+
+
+def test_sweep_matches_per_lap_race_times():
+    engine = StrategyEngine()
+    competitors = [{"estimated_time": t} for t in (1700.0, 1750.0, 1800.0)] + [{"estimated_time": None}]
+    sweep = engine.sweep_pit_laps(4, 20, LAP_TIMES, 0.6, competitors, top_k=3, elapsed_time=450.0)
+
+    assert list(sweep.pit_laps) == list(range(5, 20))
+    base = engine.base_lap_time(LAP_TIMES)
+    for pit_lap, race_time in zip(sweep.pit_laps, sweep.race_times):
+        single = engine._race_times(np.array([pit_lap]), 4, 20, base, 0.6)[0]
+        assert race_time == pytest.approx(single)
+
+    best = int(sweep.pit_laps[np.argmin(sweep.race_times)])
+    assert sweep.windows[0].reason == f"Sweep #1: pit on lap {best}"
+    picked = [int(w.reason.rsplit(" ", 1)[1]) for w in sweep.windows]
+    assert all(abs(a - b) >= 2 for a, b in combinations(picked, 2))
+
+
+@pytest.mark.parametrize("mode", ["fixed", "sweep"])
+def test_batch_windows_match_single_car(mode):
+    engine = StrategyEngine()
+    rng = np.random.default_rng(3)
+    histories = [list(rng.normal(150 + i, 0.5, 6)) for i in range(6)]
+    rates = list(rng.uniform(0, 1.0, 6))
+    elapsed = list(rng.normal(600, 5, 6))
+    competitors = [{"estimated_time": t} for t in rng.normal(2700, 20, 8)]
+
+    batch = engine.calculate_pit_windows_batch(
+        4, 20, histories, rates, competitors, mode=mode, top_k=3, elapsed_times=elapsed
+    )
+    for history, rate, t0, windows in zip(histories, rates, elapsed, batch):
+        single = engine.calculate_optimal_pit_window(
+            4, 20, history, rate, competitors, {}, mode=mode, top_k=3, elapsed_time=t0
+        )
+        assert windows == single
+
+
+def test_batch_skips_cars_without_finite_inputs():
+    engine = StrategyEngine()
+    batch = engine.calculate_pit_windows_batch(2, 20, [LAP_TIMES, LAP_TIMES], [np.nan, 0.4], [])
+    assert batch[0] is None
+    assert batch[1] == engine.calculate_optimal_pit_window(2, 20, LAP_TIMES, 0.4, [], {})
+    with pytest.raises(ValueError):
+        engine.calculate_pit_windows_batch(2, 20, [LAP_TIMES], [0.4], [], mode="bogus")
@@ -0,0 +1,32 @@
+from backend.vehicle_resolver import VehicleResolver, parse_vehicle_id
+
+
+def test_car_numbers_match_exactly():
+    resolver = VehicleResolver.from_ids(["GR86-022-2", "GR86-010-22", "GR86-002-13"])
+    # "2" is a substring of all three IDs; only the car-number field counts
+    assert resolver.vehicle_for(2) == "GR86-022-2"
+    assert resolver.vehicle_for(22) == "GR86-010-22"
+    assert resolver.vehicle_for(13) == "GR86-002-13"
+    assert resolver.vehicle_for(10) is None
+    assert resolver.number_for("GR86-010-22") == 22
+    assert resolver.chassis_for("GR86-010-22") == "010"
+
+
+def test_chassis_swap_prefers_most_laps():
+    resolver = VehicleResolver.from_ids(
+        ["GR86-030-7", "GR86-031-7"], lap_counts={"GR86-030-7": 3, "GR86-031-7": 14}
+    )
+    assert resolver.vehicle_for(7) == "GR86-031-7"
+    assert resolver.vehicles_for(7) == ["GR86-031-7", "GR86-030-7"]
+
+    # a live ID for a known number ranks after the loaded ones
+    assert resolver.add("GR86-032-7")
+    assert not resolver.add("GR86-032-7")
+    assert resolver.vehicle_for(7) == "GR86-031-7"
+
+
+def test_fallback_numbers_for_unparsed_ids():
+    assert parse_vehicle_id("car-seven") is None
+    resolver = VehicleResolver.from_ids(["car-seven", "mystery"], fallback_numbers={"car-seven": 7})
+    assert resolver.vehicle_for(7) == "car-seven"
+    assert len(resolver) == 1
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from backend.data_processor import RaceDataProcessor
+
+
+def weather_processor(times):
+    proc = RaceDataProcessor(".", use_cache=False)
+    proc.weather_df = pd.DataFrame({"TIME_UTC_SECONDS": times, "AIR_TEMP": np.arange(len(times), dtype=float)})
+    proc._build_weather_index()
+    return proc
+
+
+def test_weather_rows_as_of_lookup():
+    # unsorted observations, one without a time
+    proc = weather_processor([160.0, 100.0, np.nan, 130.0])
+    assert list(proc.weather_df["TIME_UTC_SECONDS"].iloc[:3]) == [100.0, 130.0, 160.0]
+
+    seconds = np.array([50.0, 100.0, 129.9, 130.0, 145.0, 160.0, 999.0, np.nan])
+    rows = proc._weather_rows_at(seconds)
+    # before the first observation -> first row; exact hits -> that row; NaN -> last row
+    assert list(rows) == [0, 0, 0, 1, 1, 2, 2, 3]
+
+
+def test_weather_rows_without_clock_use_last_row():
+    proc = RaceDataProcessor(".", use_cache=False)
+    proc.weather_df = pd.DataFrame({"AIR_TEMP": [20.0, 21.0, 22.0]})
+    proc._build_weather_index()
+    assert list(proc._weather_rows_at(np.array([0.0, np.nan]))) == [2, 2]